@@ -0,0 +1,225 @@
+# Performance benchmarks for the rules and AI hot paths
+# Measures fixed position sets per mode and board size, and compares against a stored baseline
+# (benchmark_baseline.json is the committed one; timings only compare on the machine that made it)
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional, Tuple
+
+from gameai import AIFactory, Board, Difficulty, GameMode, GameRules, Player, RulesFactory, TicTacToeGame
+
+BOARD_SIZES = (3, 4, 5)
+
+# Seed of the position generator; changing it invalidates stored baselines
+POSITION_SEED = 20240601
+
+# Default relative change that counts as a regression
+DEFAULT_THRESHOLD = 0.25
+
+# A benchmark position: the board, the side to move and the move that led to it
+Position = Tuple[Board, Player, Optional[Tuple[int, ...]]]
+
+def make_positions(mode: GameMode, size: int, count: int, seed: int = POSITION_SEED) -> Tuple[GameRules, List[Position]]:
+    """
+    Return the rules and a fixed set of unfinished positions for mode and size.
+
+    Positions are random playouts from the empty board, stopped after 0 to
+    half the cells have been played, so the set covers openings and middle
+    games. The same seed always gives the same positions.
+    """
+    rules = RulesFactory.create_rules(mode)
+    rng = random.Random(f"{seed}:{mode.name}:{size}")
+    positions: List[Position] = []
+    while len(positions) < count:
+        board = rules.create_board(size)
+        player, last_move = Player.X, None
+        for _ in range(rng.randrange(size * size // 2 + 1)):
+            moves = rules.get_valid_moves(board, player)
+            if not moves:
+                break
+            move = rng.choice(moves)
+            board.play(move, player)
+            if rules.check_winner(board, move[:2]) is not None:
+                board.undo_move()
+                break
+            player, last_move = (Player.O if player == Player.X else Player.X), move
+        if rules.get_valid_moves(board, player):
+            positions.append((board, player, last_move))
+    return rules, positions
+
+def percentile(samples: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of samples."""
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))]
+
+def bench_check_winner(rules: GameRules, positions: List[Position], min_time: float) -> float:
+    """check_winner calls per second, with and without the last move as a hint."""
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        for board, _, last_move in positions:
+            rules.check_winner(board, last_move[:2] if last_move else None)
+            rules.check_winner(board)
+        calls += 2 * len(positions)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return calls / elapsed
+
+def hard_options(mode: GameMode, size: int, node_limit: int) -> Dict[str, Any]:
+    """
+    HardAI options for a benchmark: always searched rather than looked up
+    in a tablebase or opening book, and bounded by nodes where a full
+    search takes seconds (boards above 3x3 and Numerical).
+    """
+    options: Dict[str, Any] = {"use_tablebase": False, "use_book": False}
+    if size > 3 or mode == GameMode.NUMERICAL:
+        options["node_limit"] = node_limit
+    return options
+
+def bench_get_move(difficulty: Difficulty, rules: GameRules, positions: List[Position],
+                   options: Dict[str, Any], rounds: int = 1) -> Tuple[List[float], int]:
+    """
+    Time get_move on every position, rounds times, each with a fresh AI.
+
+    Returns the latencies in milliseconds and the total search nodes (zero
+    for AIs that do not search).
+    """
+    samples = []
+    nodes = 0
+    for _ in range(rounds):
+        for board, player, _ in positions:
+            ai = AIFactory.create_ai(difficulty, **options)
+            board = board.copy()
+            start = time.perf_counter()
+            ai.get_move(board, player, rules)
+            samples.append((time.perf_counter() - start) * 1000.0)
+            nodes += getattr(ai, "nodes_searched", 0)
+    return samples, nodes
+
+def bench_session_memory(mode: GameMode, size: int, difficulty: Difficulty, sessions: int) -> float:
+    """Traced bytes per idle TicTacToeGame."""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        games = [TicTacToeGame(mode, difficulty, size) for _ in range(sessions)]
+        used = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    del games
+    return used / sessions
+
+def run_suite(modes: List[GameMode], sizes: List[int], positions_per_set: int = 20,
+              min_time: float = 0.2, node_limit: int = 5000, sessions: int = 2000,
+              fast_rounds: int = 20, log=None) -> Dict[str, Dict[str, Any]]:
+    """
+    Run every benchmark and return {name: {"value", "unit", "higher_is_better"}}.
+
+    Names are "<metric>/<mode>/<size>x<size>", with the difficulty appended
+    for latency and memory metrics. Search speed comes from the Hard
+    latency runs; Easy and Medium run every position fast_rounds times so
+    their p99 is not just the slowest of a handful of samples.
+    """
+    results: Dict[str, Dict[str, Any]] = {}
+
+    def record(name: str, value: float, unit: str, higher_is_better: bool):
+        results[name] = {"value": value, "unit": unit, "higher_is_better": higher_is_better}
+        if log:
+            log(f"{name}: {value:,.3f} {unit}")
+
+    for mode in modes:
+        for size in sizes:
+            # Numerical boards above 3x3 have too many moves per ply for a useful Hard search
+            if mode == GameMode.NUMERICAL and size > 3:
+                continue
+            rules, positions = make_positions(mode, size, positions_per_set)
+            tag = f"{mode.name.lower()}/{size}x{size}"
+            record(f"check_winner/{tag}", bench_check_winner(rules, positions, min_time), "calls/s", True)
+            for difficulty in Difficulty:
+                name = difficulty.name.lower()
+                if difficulty == Difficulty.HARD:
+                    options = hard_options(mode, size, node_limit)
+                    samples, nodes = bench_get_move(difficulty, rules, positions, options)
+                    record(f"search/{tag}", nodes / (sum(samples) / 1000.0), "nodes/s", True)
+                else:
+                    samples, _ = bench_get_move(difficulty, rules, positions, {}, fast_rounds)
+                record(f"get_move_p50/{tag}/{name}", percentile(samples, 0.5), "ms", False)
+                record(f"get_move_p99/{tag}/{name}", percentile(samples, 0.99), "ms", False)
+                record(f"session_memory/{tag}/{name}",
+                       bench_session_memory(mode, size, difficulty, sessions), "bytes", False)
+    return results
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]],
+            threshold: float = DEFAULT_THRESHOLD) -> List[str]:
+    """
+    Return a description of every result that regressed past threshold.
+
+    A throughput regresses when it drops below (1 - threshold) x baseline,
+    a latency or memory figure when it rises above (1 + threshold) x
+    baseline. Results missing from either side are ignored.
+    """
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None or not base["value"]:
+            continue
+        ratio = result["value"] / base["value"]
+        if result["higher_is_better"]:
+            regressed = ratio < 1 - threshold
+        else:
+            regressed = ratio > 1 + threshold
+        if regressed:
+            regressions.append(f"{name}: {result['value']:,.3f} {result['unit']} "
+                               f"vs baseline {base['value']:,.3f} ({ratio - 1:+.0%})")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the rules and AI hot paths.")
+    parser.add_argument("--mode", choices=[mode.name.lower() for mode in GameMode], action="append",
+                        help="Game mode to benchmark (repeatable, default: all modes)")
+    parser.add_argument("--size", type=int, choices=BOARD_SIZES, action="append",
+                        help="Board size to benchmark (repeatable, default: 3, 4 and 5)")
+    parser.add_argument("--positions", type=int, default=20, help="Positions per mode and board size")
+    parser.add_argument("--node-limit", type=int, default=5000, help="Hard AI node budget on boards above 3x3")
+    parser.add_argument("--sessions", type=int, default=2000, help="Games created for the memory measurement")
+    parser.add_argument("--output", default="benchmark_results.json", help="File to write the results to")
+    parser.add_argument("--baseline", default=None,
+                        help="Results file to compare against, e.g. the committed benchmark_baseline.json")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Relative change that counts as a regression (default: 0.25)")
+    args = parser.parse_args()
+
+    modes = [GameMode[name.upper()] for name in args.mode] if args.mode else list(GameMode)
+    sizes = args.size or list(BOARD_SIZES)
+    results = run_suite(modes, sizes, args.positions, node_limit=args.node_limit,
+                        sessions=args.sessions, log=print)
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "position_seed": POSITION_SEED,
+        "results": results,
+    }
+    with open(args.output, "w") as handle:
+        json.dump(report, handle, indent=2, sort_keys=True)
+    print(f"wrote {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as handle:
+            baseline = json.load(handle)
+        if baseline.get("position_seed") != POSITION_SEED:
+            sys.exit(f"{args.baseline} was measured on a different position set")
+        regressions = compare(results, baseline["results"], args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regressions past {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"no regressions past {args.threshold:.0%} against {args.baseline}")
+
+if __name__ == "__main__":
+    main()
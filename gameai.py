@@ -1,11 +1,19 @@
 # Tic-Tac-Toe AI with Multiple Difficulty Levels
 # Compatible with various game modes
 
+import mmap
+import multiprocessing
+import os
 import random
 import math
+import struct
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from collections import OrderedDict
 from abc import ABC, abstractmethod
 from enum import Enum
-from typing import List, Tuple, Optional, Dict, Any
+from typing import List, Tuple, Optional, Dict, Any, NamedTuple, Callable
 
 # Enums for game configuration
 class Player(Enum):
@@ -18,27 +26,434 @@ class Difficulty(Enum):
     MEDIUM = "Medium"
     HARD = "Hard"
 
+class SearchAlgorithm(Enum):
+    MINIMAX = "Minimax"
+    MCTS = "MCTS"  # Monte Carlo Tree Search, for large boards and Feral mode
+
 class GameMode(Enum):
     TRADITIONAL = "Traditional"
     MISERE = "Misere"  # Win by avoiding three in a row
     NUMERICAL = "Numerical"  # Use numbers instead of X/O
     FERAL = "Feral"  # Special rule variations
 
+# Width of a single Zobrist hash; boards keep one per symmetry packed side by side
+HASH_BITS = 64
+HASH_MASK = (1 << HASH_BITS) - 1
+
+# Precomputed win lines for a given board size
+class LineTable:
+    """
+    Bitmask lookup tables for one board size and win length.
+
+    Cell (row, col) maps to bit ``row * size + col``. Every win line is
+    stored as a single integer mask, so a win check is one AND and one
+    comparison per line. With the default win length the lines are the
+    rows, columns and both diagonals; a shorter win length k gives every
+    run of k cells along them instead (k-in-a-row). Tables are built once
+    per (size, win length) and shared by every board that uses them.
+
+    The table also holds the 8 rotations/reflections of the square as cell
+    permutations, and Zobrist keys for hashing positions (per player, and per
+    number for Numerical mode). Each key packs the 64-bit key of the cell's
+    image under all 8 symmetries into one integer, so a board updates the
+    hashes of all of its symmetric forms with one XOR.
+    """
+    def __init__(self, size: int, win_length: Optional[int] = None):
+        if win_length is None:
+            win_length = size
+        if not 1 <= win_length <= size:
+            raise ValueError(f"Win length must be between 1 and the board size {size}, not {win_length}")
+        self.size = size
+        self.num_cells = size * size
+        self.full_mask = (1 << self.num_cells) - 1
+        self.coords = [divmod(index, size) for index in range(self.num_cells)]
+
+        # Every run of win_length cells along a row, column, diagonal or anti-diagonal
+        def run(row: int, col: int, d_row: int, d_col: int) -> int:
+            return sum(1 << ((row + i * d_row) * size + col + i * d_col) for i in range(win_length))
+
+        last_start = size - win_length
+        lines = []
+        for row in range(size):
+            lines.extend(run(row, col, 0, 1) for col in range(last_start + 1))
+        for col in range(size):
+            lines.extend(run(row, col, 1, 0) for row in range(last_start + 1))
+        lines.extend(run(row, col, 1, 1) for row in range(last_start + 1) for col in range(last_start + 1))
+        lines.extend(run(row, col, 1, -1) for row in range(last_start + 1) for col in range(win_length - 1, size))
+        self.line_masks = tuple(lines)
+
+        self.line_length = win_length
+
+        # Line potential weights by number of marks on a line, growing 4x per
+        # mark; potential_gains[c] is the change when a line's c-th mark becomes c+1
+        self.potential_weights = (0,) + tuple(4 ** (count - 1) for count in range(1, win_length + 1))
+        self.potential_gains = tuple(
+            self.potential_weights[count + 1] - self.potential_weights[count] for count in range(win_length)
+        )
+
+        # Lines passing through each cell, used for checks around a single move
+        self.lines_through = tuple(
+            tuple(mask for mask in self.line_masks if mask >> index & 1)
+            for index in range(self.num_cells)
+        )
+        self.line_ids_through = tuple(
+            tuple(line for line, mask in enumerate(self.line_masks) if mask >> index & 1)
+            for index in range(self.num_cells)
+        )
+
+        # Cell permutations for the 8 symmetries of the square, and their inverses
+        last = size - 1
+        transforms = [
+            lambda r, c: (r, c),
+            lambda r, c: (c, last - r),
+            lambda r, c: (last - r, last - c),
+            lambda r, c: (last - c, r),
+            lambda r, c: (r, last - c),
+            lambda r, c: (last - r, c),
+            lambda r, c: (c, r),
+            lambda r, c: (last - c, last - r),
+        ]
+        self.symmetries = tuple(
+            tuple(transform(r, c)[0] * size + transform(r, c)[1] for r, c in self.coords)
+            for transform in transforms
+        )
+        self.inverse_symmetries = tuple(
+            tuple(sorted(range(self.num_cells), key=lambda index: perm[index]))
+            for perm in self.symmetries
+        )
+
+        # Zobrist keys indexed by [player][cell]; seeded per size so hashes are reproducible
+        rng = random.Random(size)
+        base_keys = [[rng.getrandbits(HASH_BITS) for _ in range(self.num_cells)] for _ in range(2)]
+        self.zobrist_keys = tuple(
+            tuple(
+                sum(base_keys[side][perm[index]] << (HASH_BITS * sym) for sym, perm in enumerate(self.symmetries))
+                for index in range(self.num_cells)
+            )
+            for side in range(2)
+        )
+
+        # Keys for Numerical mode indexed by [cell][number], number 1..num_cells (0 is unused)
+        number_keys = [[rng.getrandbits(HASH_BITS) for _ in range(self.num_cells + 1)] for _ in range(self.num_cells)]
+        self.number_zobrist_keys = tuple(
+            (0,) + tuple(
+                sum(number_keys[perm[index]][number] << (HASH_BITS * sym) for sym, perm in enumerate(self.symmetries))
+                for number in range(1, self.num_cells + 1)
+            )
+            for index in range(self.num_cells)
+        )
+
+_LINE_TABLES: Dict[Tuple[int, int], LineTable] = {}
+
+def get_line_table(size: int, win_length: Optional[int] = None) -> LineTable:
+    """Return the shared line table for a board size and win length (default: the size), building it on first use."""
+    key = (size, size if win_length is None else win_length)
+    table = _LINE_TABLES.get(key)
+    if table is None:
+        table = _LINE_TABLES[key] = LineTable(size, win_length)
+    return table
+
+def popcount(bits: int) -> int:
+    """Count the set bits in a bitmask."""
+    return bin(bits).count("1")
+
+# Row and grid views so code written against nested lists keeps working
+class _BoardRow:
+    __slots__ = ("_board", "_row")
+
+    def __init__(self, board: "Board", row: int):
+        self._board = board
+        self._row = row
+
+    def __getitem__(self, col: int) -> Player:
+        if col < 0:
+            col += self._board.size
+        return self._board.get_cell(self._row, col)
+
+    def __setitem__(self, col: int, player: Player):
+        if col < 0:
+            col += self._board.size
+        self._board.set_cell(self._row, col, player)
+
+    def __len__(self) -> int:
+        return self._board.size
+
+    def __iter__(self):
+        for col in range(self._board.size):
+            yield self._board.get_cell(self._row, col)
+
+    def count(self, player: Player) -> int:
+        return sum(1 for cell in self if cell == player)
+
+class _BoardCells:
+    __slots__ = ("_board",)
+
+    def __init__(self, board: "Board"):
+        self._board = board
+
+    def __getitem__(self, row: int) -> _BoardRow:
+        if row < 0:
+            row += self._board.size
+        if not 0 <= row < self._board.size:
+            raise IndexError("board row out of range")
+        return _BoardRow(self._board, row)
+
+    def __len__(self) -> int:
+        return self._board.size
+
+    def __iter__(self):
+        for row in range(self._board.size):
+            yield _BoardRow(self._board, row)
+
 # Base Game Board Class
 class Board:
-    def __init__(self, size: int = 3):
+    """
+    Game board stored as one bitmask per player.
+
+    ``x_bits`` and ``o_bits`` hold the occupied cells of each player. The
+    ``cells`` attribute is a row/column view over those bitmasks, so
+    ``board.cells[row][col]`` reads and writes work as before.
+
+    Moves applied with ``apply_move`` are recorded on an undo stack together
+    with the previous occupant of the cell, so a search can play and take
+    back moves (including Feral overwrites) on a single board.
+
+    ``zobrist`` is the incrementally updated hash of the position under all
+    8 board symmetries (see ``LineTable``); ``canonical_hash`` picks one
+    representative per symmetry class.
+
+    ``x_line_counts`` and ``o_line_counts`` hold, for every line in
+    ``lines.line_masks``, how many of its cells each player occupies. They
+    are updated on every placement, so wins can be detected from the lines
+    through the last move only. Along with them the board keeps two line
+    potentials, X's minus O's, weighted by ``lines.potential_weights``:
+    ``open_potential`` sums only lines the opponent has no mark on, and
+    ``mark_potential`` sums every line. ``win_length`` picks the lines that are
+    tracked (see ``LineTable``); ``LineRules.create_board`` passes the one
+    its rules need.
+    """
+    def __init__(self, size: int = 3, win_length: Optional[int] = None):
         self.size = size
+        self.lines = get_line_table(size, win_length)
         self.reset()
     
     def reset(self):
         """Reset the board to an empty state."""
-        self.cells = [[Player.EMPTY for _ in range(self.size)] for _ in range(self.size)]
+        self.x_bits = 0
+        self.o_bits = 0
+        self.zobrist = 0
+        num_lines = len(self.lines.line_masks)
+        self.x_line_counts = [0] * num_lines
+        self.o_line_counts = [0] * num_lines
+        self.open_potential = 0
+        self.mark_potential = 0
+        self._history = []
+
+    @property
+    def cells(self) -> _BoardCells:
+        """Row/column view of the board: ``cells[row][col]`` is a Player."""
+        return _BoardCells(self)
+
+    @cells.setter
+    def cells(self, rows):
+        self.reset()
+        for row, values in enumerate(rows):
+            for col, player in enumerate(values):
+                self.set_cell(row, col, player)
+
+    def bits(self, player: Player) -> int:
+        """Return the bitmask of cells held by player (or the empty cells for Player.EMPTY)."""
+        if player is Player.X:
+            return self.x_bits
+        if player is Player.O:
+            return self.o_bits
+        return self.lines.full_mask & ~(self.x_bits | self.o_bits)
+
+    def get_cell(self, row: int, col: int) -> Player:
+        """Return the player occupying (row, col)."""
+        bit = 1 << (row * self.size + col)
+        if self.x_bits & bit:
+            return Player.X
+        if self.o_bits & bit:
+            return Player.O
+        return Player.EMPTY
+
+    def set_cell(self, row: int, col: int, player: Player):
+        """Place player at (row, col) without any validation."""
+        if not (0 <= row < self.size and 0 <= col < self.size):
+            raise IndexError("board cell out of range")
+        self._place(row * self.size + col, player)
+
+    def _place(self, index: int, player: Player):
+        """Put player (or Player.EMPTY) on the cell with the given bit index."""
+        bit = 1 << index
+        lines = self.lines
+        keys = lines.zobrist_keys
+        line_ids = lines.line_ids_through[index]
+        gains = lines.potential_gains
+        weights = lines.potential_weights
+        # Potential changes from X's point of view: a mark on a line gains its
+        # owner potential_gains[count], and the first mark on a line also
+        # takes the opponent's potential on it away
+        open_change = mark_change = 0
+        if self.x_bits & bit or self.o_bits & bit:
+            if self.x_bits & bit:
+                self.x_bits ^= bit
+                self.zobrist ^= keys[0][index]
+                counts, other_counts, sign = self.x_line_counts, self.o_line_counts, -1
+            else:
+                self.o_bits ^= bit
+                self.zobrist ^= keys[1][index]
+                counts, other_counts, sign = self.o_line_counts, self.x_line_counts, 1
+            open_sum = mark_sum = 0
+            for line in line_ids:
+                count = counts[line] - 1
+                counts[line] = count
+                gain = gains[count]
+                mark_sum += gain
+                other = other_counts[line]
+                if not other:
+                    open_sum += gain
+                elif not count:
+                    open_sum += weights[other]
+            open_change = sign * open_sum
+            mark_change = sign * mark_sum
+        if player is Player.X or player is Player.O:
+            if player is Player.X:
+                self.x_bits |= bit
+                self.zobrist ^= keys[0][index]
+                counts, other_counts, sign = self.x_line_counts, self.o_line_counts, 1
+            else:
+                self.o_bits |= bit
+                self.zobrist ^= keys[1][index]
+                counts, other_counts, sign = self.o_line_counts, self.x_line_counts, -1
+            open_sum = mark_sum = 0
+            for line in line_ids:
+                count = counts[line]
+                counts[line] = count + 1
+                gain = gains[count]
+                mark_sum += gain
+                other = other_counts[line]
+                if not other:
+                    open_sum += gain
+                elif not count:
+                    open_sum += weights[other]
+            open_change += sign * open_sum
+            mark_change += sign * mark_sum
+        self.open_potential += open_change
+        self.mark_potential += mark_change
+
+    def apply_move(self, row: int, col: int, player: Player):
+        """
+        Play player at (row, col) without validation and push it on the undo stack.
+
+        The previous occupant is remembered, so Feral overwrites are restored
+        correctly by ``undo_move``.
+        """
+        index = row * self.size + col
+        bit = 1 << index
+        if self.x_bits & bit:
+            previous = Player.X
+        elif self.o_bits & bit:
+            previous = Player.O
+        else:
+            previous = Player.EMPTY
+        self._history.append((index, previous))
+        self._place(index, player)
+
+    def undo_move(self) -> Tuple[int, int]:
+        """Take back the most recent applied move and return its (row, col)."""
+        index, previous = self._history.pop()
+        self._place(index, previous)
+        return self.lines.coords[index]
+
+    def play(self, move: Tuple[int, ...], player: Player):
+        """Apply a move as returned by ``GameRules.get_valid_moves``; see ``apply_move``."""
+        self.apply_move(move[0], move[1], player)
+
+    @property
+    def last_move(self) -> Optional[Tuple[int, int]]:
+        """The (row, col) of the most recent move on the undo stack, or None."""
+        if not self._history:
+            return None
+        return self.lines.coords[self._history[-1][0]]
+
+    def line_counts(self, player: Player) -> List[int]:
+        """Return the per-line occupancy counters for player."""
+        return self.x_line_counts if player is Player.X else self.o_line_counts
+
+    def completing_cells(self, player: Player, overwrite: bool = False) -> int:
+        """
+        Bitmask of the cells where a mark of player would complete a line.
+
+        One pass over the line counters: a line qualifies when player holds
+        all but one of its cells and the opponent holds none, or with
+        overwrite, any number of them.
+        """
+        if player is Player.X:
+            own_counts, other_counts, own_bits = self.x_line_counts, self.o_line_counts, self.x_bits
+        else:
+            own_counts, other_counts, own_bits = self.o_line_counts, self.x_line_counts, self.o_bits
+        needed = self.lines.line_length - 1
+        masks = self.lines.line_masks
+        cells = 0
+        for line, count in enumerate(own_counts):
+            if count == needed and (overwrite or not other_counts[line]):
+                cells |= masks[line]
+        return cells & ~own_bits
+
+    @classmethod
+    def from_bits(cls, size: int, x_bits: int, o_bits: int, win_length: Optional[int] = None) -> "Board":
+        """Build a board of the given size (and win length) from the two player bitmasks."""
+        board = cls(size, win_length)
+        for row, col in board.cells_in(x_bits):
+            board.set_cell(row, col, Player.X)
+        for row, col in board.cells_in(o_bits):
+            board.set_cell(row, col, Player.O)
+        return board
+
+    def copy(self) -> "Board":
+        """Return an independent copy of this board."""
+        new_board = self.__class__.__new__(self.__class__)
+        new_board.size = self.size
+        new_board.lines = self.lines
+        new_board.x_bits = self.x_bits
+        new_board.o_bits = self.o_bits
+        new_board.zobrist = self.zobrist
+        new_board.x_line_counts = list(self.x_line_counts)
+        new_board.o_line_counts = list(self.o_line_counts)
+        new_board.open_potential = self.open_potential
+        new_board.mark_potential = self.mark_potential
+        new_board._history = list(self._history)
+        return new_board
+
+    def canonical_hash(self) -> Tuple[int, int]:
+        """
+        Return (hash, symmetry) for the canonical form of this position.
+
+        The hash is the smallest of the 8 symmetric hashes, so all rotations
+        and reflections of a position share it. ``symmetry`` indexes
+        ``lines.symmetries`` and maps this board's cells onto the canonical form.
+        """
+        packed = self.zobrist
+        best = packed & HASH_MASK
+        best_sym = 0
+        for sym in range(1, 8):
+            value = (packed >> (HASH_BITS * sym)) & HASH_MASK
+            if value < best:
+                best = value
+                best_sym = sym
+        return best, best_sym
+
+    def count(self, player: Player) -> int:
+        """Return the number of cells held by player."""
+        return popcount(self.bits(player))
         
     def make_move(self, row: int, col: int, player: Player, game_mode: GameMode = GameMode.TRADITIONAL) -> bool:
         """Place a move on the board. Returns True if successful."""
         if not self.is_valid_move(row, col, player, game_mode):
             return False
-        self.cells[row][col] = player
+        self.apply_move(row, col, player)
         return True
     
     def is_valid_move(self, row: int, col: int, player: Player = None, game_mode: GameMode = GameMode.TRADITIONAL) -> bool:
@@ -51,45 +466,201 @@ class Board:
         # First check if move is in bounds
         if not (0 <= row < self.size and 0 <= col < self.size):
             return False
+
+        bit = 1 << (row * self.size + col)
+        occupied = self.x_bits | self.o_bits
             
         # For traditional mode (and most others), cell must be empty
         if game_mode != GameMode.FERAL:
-            return self.cells[row][col] == Player.EMPTY
+            return not occupied & bit
             
         # Feral mode logic - must provide player to validate
         if player is None:
             return False
             
         # In Feral mode, you can play in empty cells OR overwrite opponent's moves
-        current_cell = self.cells[row][col]
-        return (current_cell == Player.EMPTY or 
-                (current_cell != player and current_cell != Player.EMPTY))
+        return player is Player.EMPTY or not self.bits(player) & bit
     
     def get_empty_cells(self) -> List[Tuple[int, int]]:
         """Return a list of coordinates for all empty cells."""
-        empty_cells = []
-        for row in range(self.size):
-            for col in range(self.size):
-                if self.cells[row][col] == Player.EMPTY:
-                    empty_cells.append((row, col))
-        return empty_cells
+        return self.cells_in(self.lines.full_mask & ~(self.x_bits | self.o_bits))
+
+    def cells_in(self, mask: int) -> List[Tuple[int, int]]:
+        """Return the (row, col) coordinates of the cells in mask, in row-major order."""
+        coords = self.lines.coords
+        cells = []
+        while mask:
+            low_bit = mask & -mask
+            cells.append(coords[low_bit.bit_length() - 1])
+            mask ^= low_bit
+        return cells
     
     def is_full(self) -> bool:
         """Check if the board is completely filled."""
-        return len(self.get_empty_cells()) == 0
+        return (self.x_bits | self.o_bits) == self.lines.full_mask
     
     def display(self):
         """Print the current state of the board."""
         for row in range(self.size):
             row_str = "|"
             for col in range(self.size):
-                row_str += f" {self.cells[row][col].value} |"
+                row_str += f" {self.get_cell(row, col).value} |"
             print(row_str)
             if row < self.size - 1:
                 print("-" * (4 * self.size + 1))
 
+# Board for Numerical mode
+class NumericalBoard(Board):
+    """
+    Board whose cells hold the numbers 1 to size*size instead of marks.
+
+    X plays the odd numbers and O the even ones, and every number can be
+    played once. Each cell also records its owner in ``x_bits``/``o_bits``,
+    so ``cells``, ``get_empty_cells`` and ``is_full`` work as on a Board.
+
+    ``values`` holds the number on each cell (0 when empty) and bit k of
+    ``used_numbers`` is set once k has been played. ``line_sums`` and
+    ``line_filled`` hold the running sum and the filled cell count of every
+    line in ``lines.line_masks``; they are updated on every placement, so a
+    full line summing to ``target`` is found from the lines through the last
+    move only. ``target`` is the magic constant size*(size*size+1)/2, which
+    is 15 on the 3x3 board.
+
+    Moves are (row, col, number) tuples. ``apply_number`` pushes them on the
+    undo stack, and the Zobrist hash covers the numbers, so the search code
+    and transposition table work on this board unchanged.
+    """
+    def __init__(self, size: int = 3):
+        self.target = size * (size * size + 1) // 2
+        self.max_number = size * size
+        super().__init__(size)
+
+    def reset(self):
+        """Reset the board to an empty state."""
+        super().reset()
+        num_lines = len(self.lines.line_masks)
+        self.values = [0] * self.lines.num_cells
+        self.used_numbers = 0
+        self.line_sums = [0] * num_lines
+        self.line_filled = [0] * num_lines
+
+    @staticmethod
+    def owner(number: int) -> Player:
+        """Return the player who plays number: X has the odd numbers, O the even ones."""
+        return Player.X if number % 2 else Player.O
+
+    def numbers_for(self, player: Player) -> List[int]:
+        """Return the numbers player has not played yet, in increasing order."""
+        first = 1 if player is Player.X else 2
+        used = self.used_numbers
+        return [number for number in range(first, self.max_number + 1, 2) if not used >> number & 1]
+
+    def is_available(self, number: int, player: Player) -> bool:
+        """Whether number belongs to player and has not been played."""
+        return (1 <= number <= self.max_number and self.owner(number) is player
+                and not self.used_numbers >> number & 1)
+
+    def get_number(self, row: int, col: int) -> int:
+        """Return the number on (row, col), or 0 if the cell is empty."""
+        return self.values[row * self.size + col]
+
+    def set_number(self, row: int, col: int, number: int):
+        """Place number (0 clears the cell) at (row, col) without any validation."""
+        if not (0 <= row < self.size and 0 <= col < self.size):
+            raise IndexError("board cell out of range")
+        self._put(row * self.size + col, number)
+
+    def set_cell(self, row: int, col: int, player: Player):
+        """Only clearing a cell is supported; numbers are placed with set_number."""
+        if player is not Player.EMPTY:
+            raise ValueError("Numerical board cells hold numbers; use set_number")
+        self.set_number(row, col, 0)
+
+    def _put(self, index: int, number: int):
+        """Put number (or 0 for empty) on the cell with the given bit index."""
+        previous = self.values[index]
+        if previous == number:
+            return
+        keys = self.lines.number_zobrist_keys[index]
+        line_ids = self.lines.line_ids_through[index]
+        sums = self.line_sums
+        filled = self.line_filled
+        if previous:
+            self.used_numbers ^= 1 << previous
+            self.zobrist ^= keys[previous]
+            for line in line_ids:
+                sums[line] -= previous
+                filled[line] -= 1
+        if number:
+            self.used_numbers |= 1 << number
+            self.zobrist ^= keys[number]
+            for line in line_ids:
+                sums[line] += number
+                filled[line] += 1
+        self.values[index] = number
+        self._place(index, self.owner(number) if number else Player.EMPTY)
+
+    def apply_number(self, row: int, col: int, number: int):
+        """Play number at (row, col) without validation and push it on the undo stack."""
+        index = row * self.size + col
+        self._history.append((index, self.values[index]))
+        self._put(index, number)
+
+    def apply_move(self, row: int, col: int, player: Player):
+        raise TypeError("Numerical moves need a number; use apply_number or play")
+
+    def play(self, move: Tuple[int, int, int], player: Player):
+        """Apply a (row, col, number) move; the number decides who plays it."""
+        self.apply_number(move[0], move[1], move[2])
+
+    def undo_move(self) -> Tuple[int, int]:
+        """Take back the most recent applied move and return its (row, col)."""
+        index, previous = self._history.pop()
+        self._put(index, previous)
+        return self.lines.coords[index]
+
+    @classmethod
+    def from_bits(cls, size: int, x_bits: int, o_bits: int, win_length: Optional[int] = None) -> "Board":
+        raise TypeError("A Numerical board cannot be rebuilt from player bitmasks")
+
+    def copy(self) -> "NumericalBoard":
+        """Return an independent copy of this board."""
+        new_board = super().copy()
+        new_board.target = self.target
+        new_board.max_number = self.max_number
+        new_board.values = list(self.values)
+        new_board.used_numbers = self.used_numbers
+        new_board.line_sums = list(self.line_sums)
+        new_board.line_filled = list(self.line_filled)
+        return new_board
+
+    def make_move(self, row: int, col: int, player: Player, game_mode: GameMode = GameMode.NUMERICAL,
+                  number: Optional[int] = None) -> bool:
+        """Place player's number at (row, col). Returns True if successful."""
+        if number is None or not self.is_valid_move(row, col, player, game_mode):
+            return False
+        if not self.is_available(number, player):
+            return False
+        self.apply_number(row, col, number)
+        return True
+
+    def display(self):
+        """Print the current state of the board."""
+        width = len(str(self.max_number))
+        for row in range(self.size):
+            row_str = "|"
+            for col in range(self.size):
+                number = self.get_number(row, col)
+                row_str += f" {number if number else ' ':>{width}} |"
+            print(row_str)
+            if row < self.size - 1:
+                print("-" * ((width + 3) * self.size + 1))
+
 # Abstract Game Rules Interface
 class GameRules(ABC):
+    # Whether a player may play over the opponent's marks (Feral)
+    allows_overwrite = False
+
     @abstractmethod
     def check_winner(self, board: Board, last_move: Tuple[int, int] = None) -> Optional[Player]:
         """Check if there's a winner. Returns the winning player or None."""
@@ -105,162 +676,457 @@ class GameRules(ABC):
         """Check if making a move at (row, col) would result in a win for player."""
         pass
 
-# Traditional Tic-Tac-Toe Rules
-class TraditionalRules(GameRules):
+    def get_valid_moves(self, board: Board, player: Player) -> List[Tuple[int, int]]:
+        """Return every cell player may play in. Most modes only allow empty cells."""
+        return board.get_empty_cells()
+
+    def create_board(self, size: int = 3) -> Board:
+        """Return an empty board of the given size for these rules."""
+        return Board(size)
+
+# Declarative description of a line-based rule variant
+class RuleSpec(NamedTuple):
+    """
+    What a line-based mode changes, compiled by LineRules.
+
+    Attributes:
+        board_size: The only board size the rules allow; None allows any size
+        win_length: Marks in a row that complete a line; None means the board size
+        overwrite: Whether a player may play over the opponent's marks
+        inverted: Whether completing a line loses instead of winning
+        eval_sign: +1 if holding marks is good for a player, -1 if it is a liability
+        control_weight: Evaluation bonus per mark more than the opponent,
+            multiplied by eval_sign
+    """
+    board_size: Optional[int] = None
+    win_length: Optional[int] = None
+    overwrite: bool = False
+    inverted: bool = False
+    eval_sign: int = 1
+    control_weight: float = 0.0
+
+# Rules for every mode that is decided by completing lines
+class LineRules(GameRules):
+    """
+    Shared win/evaluate kernel for rules described by a RuleSpec.
+
+    For a board size the spec compiles to a LineTable holding the masks of
+    its win lines. Boards created by ``create_board`` track per-line
+    counters for exactly those lines, so a win is found from the counters
+    of the lines through the last move. A board built for another win
+    length is checked against the compiled masks instead, which is still a
+    handful of bit operations per line.
+    """
+    spec = RuleSpec()
+
+    def __init__(self, spec: Optional[RuleSpec] = None):
+        if spec is not None:
+            self.spec = spec
+        self.allows_overwrite = self.spec.overwrite
+        if self.spec.overwrite:
+            self.game_mode = GameMode.FERAL
+        elif self.spec.inverted:
+            self.game_mode = GameMode.MISERE
+        else:
+            self.game_mode = GameMode.TRADITIONAL
+
+    def compile(self, size: int) -> LineTable:
+        """Return the line table of these rules for a board size."""
+        if self.spec.board_size is not None and size != self.spec.board_size:
+            raise ValueError(f"These rules are for {self.spec.board_size}x{self.spec.board_size} boards, not {size}x{size}")
+        return get_line_table(size, self.spec.win_length)
+
+    def create_board(self, size: Optional[int] = None) -> Board:
+        """Return an empty board that tracks the lines of these rules."""
+        if size is None:
+            size = self.spec.board_size or 3
+        return Board(size, self.compile(size).line_length)
+
     def check_winner(self, board: Board, last_move: Tuple[int, int] = None) -> Optional[Player]:
-        """Check if there's a winner in traditional rules (3 in a row)."""
-        # Check rows
-        for row in range(board.size):
-            if board.cells[row][0] != Player.EMPTY and all(board.cells[row][0] == board.cells[row][col] for col in range(board.size)):
-                return board.cells[row][0]
-                
-        # Check columns
-        for col in range(board.size):
-            if board.cells[0][col] != Player.EMPTY and all(board.cells[0][col] == board.cells[row][col] for row in range(board.size)):
-                return board.cells[0][col]
-                
-        # Check main diagonal
-        if board.cells[0][0] != Player.EMPTY and all(board.cells[0][0] == board.cells[i][i] for i in range(board.size)):
-            return board.cells[0][0]
-            
-        # Check other diagonal
-        if board.cells[0][board.size-1] != Player.EMPTY and all(board.cells[0][board.size-1] == board.cells[i][board.size-1-i] for i in range(board.size)):
-            return board.cells[0][board.size-1]
-            
+        """
+        Return the winner: the owner of a completed line, or its opponent
+        when the spec is inverted.
+
+        When last_move is given, the position before it is assumed to have
+        had no winner, so only the lines through last_move are checked.
+        """
+        owner = self._line_owner(board, last_move)
+        if owner is None or not self.spec.inverted:
+            return owner
+        return Player.O if owner == Player.X else Player.X
+
+    def _line_owner(self, board: Board, last_move: Optional[Tuple[int, int]]) -> Optional[Player]:
+        """Return the player who has completed a line, or None."""
+        lines = board.lines
+        counted = lines.line_length == (self.spec.win_length or board.size)
+        if not counted:
+            lines = self.compile(board.size)
+        
+        if last_move is not None:
+            row, col = last_move
+            player = board.get_cell(row, col)
+            if player is Player.EMPTY:
+                return None
+            index = row * board.size + col
+            if counted:
+                counts = board.line_counts(player)
+                length = lines.line_length
+                for line in lines.line_ids_through[index]:
+                    if counts[line] == length:
+                        return player
+                return None
+            bits = board.bits(player)
+            for mask in lines.lines_through[index]:
+                if bits & mask == mask:
+                    return player
+            return None
+        
+        # Rows, columns and diagonals are precomputed masks, checked in that order
+        x_bits = board.x_bits
+        o_bits = board.o_bits
+        for mask in lines.line_masks:
+            if x_bits & mask == mask:
+                return Player.X
+            if o_bits & mask == mask:
+                return Player.O
         return None
-    
-    def evaluate_board(self, board: Board, player: Player) -> int:
+
+    def evaluate_board(self, board: Board, player: Player) -> float:
         """
         Evaluate the board state for the given player.
-        Returns: 10 for win, -10 for loss, 0 for neutral/draw
+        Returns: 10 for win, -10 for loss, otherwise the line potential
+        (see ``line_potential``), plus the spec's control bonus for holding
+        more cells than the opponent
         """
         winner = self.check_winner(board)
         
         if winner == player:
-            return 10
+            score = 10
         elif winner is not None:  # Other player won
-            return -10
+            score = -10
+        else:
+            score = self.line_potential(board, player)
+        
+        spec = self.spec
+        if spec.control_weight:
+            opponent = Player.O if player == Player.X else Player.X
+            score += spec.eval_sign * spec.control_weight * (board.count(player) - board.count(opponent))
+        return score
+
+    def line_potential(self, board: Board, player: Player) -> float:
+        """
+        Score player's lines against the opponent's, strictly between -9 and 9.
+
+        Each line is weighted 4x more per mark on it (``potential_weights``).
+        Lines holding any opponent mark are dead and score nothing, except
+        with overwrites, where a mark can be taken over and every line
+        counts. With eval_sign -1 (Misere) lines are liabilities, so the
+        sign flips. Boards tracking these rules' lines keep the sum up to
+        date on every move; others are scored from the compiled masks.
+        """
+        spec = self.spec
+        lines = board.lines
+        if lines.line_length == (spec.win_length or board.size):
+            potential = board.mark_potential if spec.overwrite else board.open_potential
         else:
+            lines = self.compile(board.size)
+            weights = lines.potential_weights
+            potential = 0
+            for mask in lines.line_masks:
+                x_count = popcount(board.x_bits & mask)
+                o_count = popcount(board.o_bits & mask)
+                if spec.overwrite or not o_count:
+                    potential += weights[x_count]
+                if spec.overwrite or not x_count:
+                    potential -= weights[o_count]
+        score = spec.eval_sign * 9.0 * potential / (len(lines.line_masks) * lines.potential_weights[-1])
+        return score if player is Player.X else -score
+
+    def is_valid_move(self, board: Board, row: int, col: int, player: Player) -> bool:
+        """Whether player may play (row, col): an empty cell, or any cell but their own when overwriting."""
+        if not (0 <= row < board.size and 0 <= col < board.size):
+            return False
+        if self.spec.overwrite:
+            return not board.bits(player) >> (row * board.size + col) & 1
+        return not (board.x_bits | board.o_bits) >> (row * board.size + col) & 1
+
+    def get_valid_moves(self, board: Board, player: Player) -> List[Tuple[int, int]]:
+        """Return every cell player may play in."""
+        if self.spec.overwrite:
+            return board.cells_in(board.lines.full_mask & ~board.bits(player))
+        return board.get_empty_cells()
+
+    def winning_cells(self, board: Board, player: Player) -> int:
+        """
+        Bitmask of the cells where player wins by playing now.
+
+        This is the board's completing_cells index, so it costs one pass over
+        the lines however many cells there are. With inverted rules completing
+        a line never wins, so there are none.
+        """
+        if self.spec.inverted:
             return 0
-    
+        if board.lines.line_length == (self.spec.win_length or board.size):
+            return board.completing_cells(player, self.spec.overwrite)
+        
+        # The board tracks other lines; count marks on the compiled masks
+        lines = self.compile(board.size)
+        opponent = Player.O if player == Player.X else Player.X
+        own_bits = board.bits(player)
+        other_bits = board.bits(opponent)
+        needed = lines.line_length - 1
+        cells = 0
+        for mask in lines.line_masks:
+            if popcount(own_bits & mask) == needed and (self.spec.overwrite or not other_bits & mask):
+                cells |= mask
+        return cells & ~own_bits
+
     def is_winning_move(self, board: Board, row: int, col: int, player: Player) -> bool:
         """Check if making a move at (row, col) would result in a win for player."""
-        # Create a temporary board with the move
-        temp_board = Board(board.size)
-        for r in range(board.size):
-            for c in range(board.size):
-                temp_board.cells[r][c] = board.cells[r][c]
-        
-        # Make the move
-        temp_board.make_move(row, col, player)
+        if not self.is_valid_move(board, row, col, player):
+            return self.check_winner(board) == player
         
-        # Check if this results in a win
-        winner = self.check_winner(temp_board)
+        # Try the move in place and take it back
+        board.apply_move(row, col, player)
+        winner = self.check_winner(board, (row, col))
+        board.undo_move()
         return winner == player
 
+# Traditional Tic-Tac-Toe Rules
+class TraditionalRules(LineRules):
+    """Complete a line of your marks to win. win_length gives k-in-a-row variants."""
+    game_mode = GameMode.TRADITIONAL
+    spec = RuleSpec()
+
+    def __init__(self, win_length: Optional[int] = None):
+        super().__init__(self.spec._replace(win_length=win_length))
+
 # Misere Rules: Win by avoiding three in a row
-class MisereRules extends TraditionalRules {
-  evaluateBoard(board: GameBoard, player: Player): number {
-    // In Misere, the evaluation is flipped - you want the opponent to get 3 in a row
-    const traditionalEval = super.evaluateBoard(board, player);
-    return -traditionalEval;  // Flip the evaluation
-  }
-  
-  isWinningMove(board: GameBoard, row: number, col: number, player: Player): boolean {
-    // In Misere, a "winning" move is actually one that would make you lose in traditional rules
-    // So we need to invert the result of the traditional check
-    const wouldFormLine = super.isWinningMove(board, row, col, player);
-    return !wouldFormLine; // In Misere, NOT forming a line is a "winning" move
-  }
-}
+class MisereRules(TraditionalRules):
+    """
+    In Misere, completing a line loses, so the winner is the opponent of
+    the player who owns the line. A move that completes your own line
+    scores as a loss and is never a "winning" move.
+    """
+    game_mode = GameMode.MISERE
+    spec = RuleSpec(inverted=True, eval_sign=-1)
 
 # Numerical Rules: Uses numbers (1-9) instead of X/O
 class NumericalRules(GameRules):
+    """
+    X plays odd and O even numbers, each at most once; whoever completes a
+    line summing to the board's target (15 on 3x3) wins, whatever numbers
+    the line already held. These rules need a NumericalBoard, whose
+    per-line sums and filled counts make every check below a scan over the
+    lines rather than a trial of every (cell, number) pair.
+    """
+    game_mode = GameMode.NUMERICAL
+
     def __init__(self):
         self.x_values = [1, 3, 5, 7, 9]  # Odd numbers for X
         self.o_values = [2, 4, 6, 8]     # Even numbers for O
         
-    def check_winner(self, board: Board, last_move: Tuple[int, int] = None) -> Optional[Player]:
-        """Check for magic square (sum of 15) in any row, column, or diagonal."""
-        # This is a placeholder. In a real implementation, you would track
-        # the numerical values and check for lines that sum to 15.
-        return None
-    
-    def evaluate_board(self, board: Board, player: Player) -> int:
-        """Evaluate based on potential to form magic squares."""
-        # Placeholder for a more sophisticated evaluation function
-        return 0
-    
-    def is_winning_move(self, board: Board, row: int, col: int, player: Player) -> bool:
-        """Check if making a move would create a line summing to 15."""
-        # Placeholder implementation
-        return False
+    def check_winner(self, board: NumericalBoard, last_move: Tuple[int, int] = None) -> Optional[Player]:
+        """
+        Check for magic square (sum of 15) in any row, column, or diagonal.
 
-# Feral Rules: Allows overwriting opponent's moves
-class FeralRules(TraditionalRules):
-    def __init__(self):
-        super().__init__()
-        self.game_mode = GameMode.FERAL
+        The winner is the player who filled the line. When last_move is
+        given, the position before it is assumed to have had no winner, so
+        only the lines through last_move are checked.
+        """
+        sums = board.line_sums
+        filled = board.line_filled
+        target = board.target
+        length = board.lines.line_length
+        if last_move is not None:
+            index = last_move[0] * board.size + last_move[1]
+            number = board.values[index]
+            if not number:
+                return None
+            for line in board.lines.line_ids_through[index]:
+                if filled[line] == length and sums[line] == target:
+                    return board.owner(number)
+            return None
+
+        for line in range(len(sums)):
+            if filled[line] == length and sums[line] == target:
+                # Without a move history the last mover follows from the count, as X moves first
+                if board.last_move is not None:
+                    row, col = board.last_move
+                    return board.owner(board.get_number(row, col))
+                return Player.X if popcount(board.used_numbers) % 2 else Player.O
+        return None
     
-    def check_winner(self, board: Board, last_move: Tuple[int, int] = None) -> Optional[Player]:
+    def evaluate_board(self, board: NumericalBoard, player: Player) -> int:
         """
-        Check for winner using traditional win conditions.
-        The win conditions are the same, but the ability to overwrite opponent's moves
-        creates very different gameplay dynamics.
+        Evaluate based on potential to form magic squares.
+        Returns 10 for a win, -10 for a loss, and otherwise the number of
+        winning moves player has minus the number the opponent has.
         """
-        # Use the same win conditions as traditional Tic-Tac-Toe
-        return super().check_winner(board, last_move)
+        winner = self.check_winner(board)
+        if winner == player:
+            return 10
+        elif winner is not None:
+            return -10
+        opponent = Player.O if player == Player.X else Player.X
+        return len(self.winning_moves(board, player)) - len(self.winning_moves(board, opponent))
     
-    def is_valid_move(self, board: Board, row: int, col: int, player: Player) -> bool:
+    def is_winning_move(self, board: NumericalBoard, row: int, col: int, player: Player) -> bool:
+        """Check if player has a number that completes a line summing to 15 at (row, col)."""
+        if not board.is_valid_move(row, col, player, self.game_mode):
+            return self.check_winner(board) == player
+        return any(move[0] == row and move[1] == col for move in self.winning_moves(board, player))
+
+    def create_board(self, size: int = 3) -> NumericalBoard:
+        """Return an empty board that holds numbers."""
+        return NumericalBoard(size)
+
+    def get_valid_moves(self, board: NumericalBoard, player: Player) -> List[Tuple[int, int, int]]:
+        """Return every (row, col, number) player may play: each empty cell with each unused number."""
+        numbers = board.numbers_for(player)
+        return [(row, col, number) for row, col in board.get_empty_cells() for number in numbers]
+
+    def winning_moves(self, board: NumericalBoard, player: Player) -> List[Tuple[int, int, int]]:
         """
-        In Feral mode, moves are valid if:
-        1. The cell is empty, OR
-        2. The cell contains the opponent's mark (you can overwrite)
-        
-        You cannot overwrite your own marks.
+        Return every (row, col, number) that wins at once for player, in
+        row-major order.
+
+        Only a line with one empty cell can be completed, and only by the
+        number target - sum, so each line is checked once.
         """
-        # Check if the move is in bounds
-        if not (0 <= row < board.size and 0 <= col < board.size):
-            return False
-            
-        # Get current cell value
-        current = board.cells[row][col]
-        
-        # Valid if empty or contains opponent's mark
-        return current == Player.EMPTY or (current != player and current != Player.EMPTY)
-    
-    def evaluate_board(self, board: Board, player: Player) -> int:
+        sums = board.line_sums
+        filled = board.line_filled
+        needed_filled = board.lines.line_length - 1
+        empty = board.bits(Player.EMPTY)
+        moves = set()
+        for line, mask in enumerate(board.lines.line_masks):
+            if filled[line] == needed_filled:
+                number = board.target - sums[line]
+                if board.is_available(number, player):
+                    cell = mask & empty
+                    moves.add((cell.bit_length() - 1, number))
+        coords = board.lines.coords
+        return [coords[index] + (number,) for index, number in sorted(moves)]
+
+    def blocking_moves(self, board: NumericalBoard, player: Player) -> List[Tuple[int, int, int]]:
         """
-        Evaluate the board state for Feral mode.
-        Similar to traditional evaluation but with awareness of overwrite possibility.
+        Return every (row, col, number) after which the opponent has no
+        winning move, when the opponent currently has one.
+
+        Filling the opponent's winning cell blocks it, so all of the
+        opponent's wins must share one cell. The number placed there must
+        not leave another line through the cell one short of the target with
+        an opponent number. Returns an empty list if there is nothing to
+        block or the threats cannot all be blocked.
         """
-        # Get basic evaluation
-        basic_eval = super().evaluate_board(board, player)
-        
-        # In Feral mode, having more pieces on the board is slightly less valuable
-        # since they can be overwritten, but controlling key positions still matters
-        
-        # Count player's pieces vs opponent's pieces to determine board control
         opponent = Player.O if player == Player.X else Player.X
-        player_count = sum(row.count(player) for row in board.cells)
-        opponent_count = sum(row.count(opponent) for row in board.cells)
-        
-        # Give a small bonus for controlling more of the board
-        control_bonus = (player_count - opponent_count) * 0.5
-        
-        return basic_eval + control_bonus
+        threats = self.winning_moves(board, opponent)
+        cells = {(row, col) for row, col, _ in threats}
+        if len(cells) != 1:
+            return []
+        row, col = cells.pop()
+        index = row * board.size + col
+        sums = board.line_sums
+        filled = board.line_filled
+        needed_filled = board.lines.line_length - 2
+        line_ids = [line for line in board.lines.line_ids_through[index] if filled[line] == needed_filled]
+        moves = []
+        for number in board.numbers_for(player):
+            if not any(board.is_available(board.target - sums[line] - number, opponent) for line in line_ids):
+                moves.append((row, col, number))
+        return moves
+
+# Feral Rules: Allows overwriting opponent's moves
+class FeralRules(TraditionalRules):
+    """
+    The win conditions are the same as Traditional, but a player may play
+    any cell except their own, overwriting the opponent's mark. That makes
+    for very different gameplay dynamics.
+
+    In Feral mode, having more pieces on the board is slightly less valuable
+    since they can be overwritten, but controlling key positions still
+    matters: the evaluation gives a small bonus per extra piece.
+    """
+    game_mode = GameMode.FERAL
+    spec = RuleSpec(overwrite=True, control_weight=0.5)
 
 # Abstract AI Strategy Interface
 class AIStrategy(ABC):
+    # Whether get_moves may answer all symmetric copies of a position with one
+    # search. Strategies whose moves are random answer every request instead.
+    deduplicate_batches = False
+
     @abstractmethod
     def get_move(self, board: Board, player: Player, rules: GameRules) -> Tuple[int, int]:
         """Determine the next move for the AI."""
         pass
 
+    def get_moves(self, requests: List[Tuple[Board, Player, GameRules]]) -> List[Optional[Tuple[int, ...]]]:
+        """
+        Answer a batch of (board, player, rules) requests, in order.
+
+        With deduplicate_batches, requests are grouped by rules, side to move
+        and canonical position. The canonical form is the orientation that
+        ``Board.canonical_hash`` picks, compared cell by cell, so two
+        positions whose hashes collide are never merged. Each group is
+        searched once, on its first board, and the move is mapped back to the
+        orientation of every other board in the group. Groups with the same
+        rules run back to back, so a transposition table is not cleared
+        between them.
+        """
+        if not self.deduplicate_batches:
+            return [self.get_move(board, player, rules) for board, player, rules in requests]
+
+        contexts: Dict[Tuple, Dict[Tuple[Player, Tuple[int, ...]], List[Tuple[int, int]]]] = {}
+        for index, (board, player, rules) in enumerate(requests):
+            _, symmetry = board.canonical_hash()
+            context = (type(rules), getattr(rules, "spec", None), board.size, board.lines.line_length)
+            position = self._canonical_cells(board, symmetry)
+            contexts.setdefault(context, {}).setdefault((player, position), []).append((index, symmetry))
+
+        moves: List[Optional[Tuple[int, ...]]] = [None] * len(requests)
+        for groups in contexts.values():
+            for members in groups.values():
+                first, first_symmetry = members[0]
+                board, player, rules = requests[first]
+                move = self.get_move(board, player, rules)
+                for index, symmetry in members:
+                    moves[index] = self._map_move(move, board.lines, first_symmetry, symmetry)
+        return moves
+
+    @staticmethod
+    def _canonical_cells(board: Board, symmetry: int) -> Tuple[int, ...]:
+        """Cells of board mapped by symmetry: 0 empty, 1 X, 2 O, or the number on a Numerical cell."""
+        lines = board.lines
+        mapping = lines.symmetries[symmetry]
+        cells = [0] * lines.num_cells
+        if isinstance(board, NumericalBoard):
+            for index, number in enumerate(board.values):
+                cells[mapping[index]] = number
+        else:
+            x_bits = board.x_bits
+            o_bits = board.o_bits
+            for index in range(lines.num_cells):
+                cells[mapping[index]] = (x_bits >> index & 1) | (o_bits >> index & 1) << 1
+        return tuple(cells)
+
+    @staticmethod
+    def _map_move(move: Optional[Tuple[int, ...]], lines: LineTable, from_symmetry: int,
+                  to_symmetry: int) -> Optional[Tuple[int, ...]]:
+        """Carry a move between two boards whose canonical forms are reached by the given symmetries."""
+        if move is None or from_symmetry == to_symmetry:
+            return move
+        canonical = lines.symmetries[from_symmetry][move[0] * lines.size + move[1]]
+        # Numerical moves keep their number, which no symmetry changes
+        return lines.coords[lines.inverse_symmetries[to_symmetry][canonical]] + tuple(move[2:])
+
 # Easy AI: Random Moves
 class EasyAI(AIStrategy):
     def get_move(self, board: Board, player: Player, rules: GameRules) -> Tuple[int, int]:
         """Simply choose a random valid move."""
+        if isinstance(rules, NumericalRules):
+            valid_moves = rules.get_valid_moves(board, player)
+            return random.choice(valid_moves) if valid_moves else None
         empty_cells = board.get_empty_cells()
         if not empty_cells:
             return None  # No valid moves
@@ -278,24 +1144,34 @@ class MediumAI(AIStrategy):
         # Find opponent player
         opponent = Player.O if player == Player.X else Player.X
         
-        # Handle Feral mode specially
-        if isinstance(rules, FeralRules):
+        # Handle Feral and Numerical modes specially
+        if rules.allows_overwrite:
             return self._get_feral_move(board, player, rules, opponent)
+        if isinstance(rules, NumericalRules):
+            return self._get_numerical_move(board, player, rules)
         
         # Standard mode logic
         empty_cells = board.get_empty_cells()
         if not empty_cells:
             return None
-            
-        # Check for winning moves
-        for row, col in empty_cells:
-            if rules.is_winning_move(board, row, col, player):
-                return (row, col)
         
-        # Check for blocking moves
-        for row, col in empty_cells:
-            if rules.is_winning_move(board, row, col, opponent):
-                return (row, col)
+        if isinstance(rules, LineRules):
+            # Win, else block: the first such cell from the rules' threat index
+            empty = board.lines.full_mask & ~(board.x_bits | board.o_bits)
+            for threats in (rules.winning_cells(board, player), rules.winning_cells(board, opponent)):
+                threats &= empty
+                if threats:
+                    return board.lines.coords[(threats & -threats).bit_length() - 1]
+        else:
+            # Check for winning moves
+            for row, col in empty_cells:
+                if rules.is_winning_move(board, row, col, player):
+                    return (row, col)
+            
+            # Check for blocking moves
+            for row, col in empty_cells:
+                if rules.is_winning_move(board, row, col, opponent):
+                    return (row, col)
         
         # Take center if available (basic strategy)
         center = board.size // 2
@@ -314,51 +1190,19 @@ class MediumAI(AIStrategy):
     def _get_feral_move(self, board: Board, player: Player, rules: FeralRules, opponent: Player) -> Tuple[int, int]:
         """Special strategy for Feral mode that considers overwriting."""
         # Get all valid moves (including overwrites)
-        valid_moves = []
-        for row in range(board.size):
-            for col in range(board.size):
-                if rules.is_valid_move(board, row, col, player):
-                    valid_moves.append((row, col))
+        valid_moves = rules.get_valid_moves(board, player)
                     
         if not valid_moves:
             return None
-            
-        # 1. Check for winning moves
-        for row, col in valid_moves:
-            # Create a temporary board with this move
-            temp_board = Board(board.size)
-            for r in range(board.size):
-                for c in range(board.size):
-                    temp_board.cells[r][c] = board.cells[r][c]
-            
-            temp_board.make_move(row, col, player, GameMode.FERAL)
-            
-            # Check if this results in a win
-            winner = rules.check_winner(temp_board)
-            if winner == player:
-                return (row, col)
         
-        # 2. Check for opponent's winning moves to block
-        opponent_valid_moves = []
-        for row in range(board.size):
-            for col in range(board.size):
-                if rules.is_valid_move(board, row, col, opponent):
-                    opponent_valid_moves.append((row, col))
-                    
-        for row, col in opponent_valid_moves:
-            # Create a temporary board with opponent's move
-            temp_board = Board(board.size)
-            for r in range(board.size):
-                for c in range(board.size):
-                    temp_board.cells[r][c] = board.cells[r][c]
-            
-            temp_board.make_move(row, col, opponent, GameMode.FERAL)
-            
-            # Check if this results in a win for opponent
-            winner = rules.check_winner(temp_board)
-            if winner == opponent:
-                # Block by overwriting this position
-                return (row, col)
+        # 1. Win, 2. block the opponent's win by taking (or overwriting) the
+        # cell they need. A cell of our own they could overwrite cannot be
+        # blocked by playing there, so only cells we may play count.
+        playable = board.lines.full_mask & ~board.bits(player)
+        for threats in (rules.winning_cells(board, player), rules.winning_cells(board, opponent)):
+            threats &= playable
+            if threats:
+                return board.lines.coords[(threats & -threats).bit_length() - 1]
         
         # 3. Overwrite opponent's pieces in strategic positions
         # First check if there are any opponent pieces to overwrite
@@ -392,70 +1236,1146 @@ class MediumAI(AIStrategy):
         # 5. Take a random valid move
         return random.choice(valid_moves)
 
-# Hard AI: Minimax Algorithm
-class HardAI(AIStrategy):
-    def get_move(self, board: Board, player: Player, rules: GameRules) -> Tuple[int, int]:
-        """Use minimax algorithm with alpha-beta pruning to find optimal move."""
-        opponent = Player.O if player == Player.X else Player.X
-        best_score = -math.inf
-        best_move = None
-        
-        # Get valid moves based on game mode
-        valid_moves = self._get_valid_moves(board, player, rules)
-        if not valid_moves:
+    def _get_numerical_move(self, board: NumericalBoard, player: Player,
+                            rules: NumericalRules) -> Tuple[int, int, int]:
+        """Numerical mode: the same plan as get_move, played with a number."""
+        numbers = board.numbers_for(player)
+        if not numbers or board.is_full():
             return None
         
-        # Apply alpha-beta pruning for efficiency
-        alpha = -math.inf
-        beta = math.inf
+        # 1. Win, 2. block the opponent's only winning cell
+        winning_moves = rules.winning_moves(board, player)
+        if winning_moves:
+            return winning_moves[0]
+        blocking_moves = rules.blocking_moves(board, player)
+        if blocking_moves:
+            return random.choice(blocking_moves)
         
-        # Try each possible move
-        for row, col in valid_moves:
-            # Create a new board with this move
-            new_board = self._create_new_board_with_move(board, row, col, player, rules)
-            
-            # Evaluate using minimax with alpha-beta pruning
-            # Limit depth to avoid excessive computation in complex games
-            max_depth = 9 if isinstance(rules, FeralRules) else 9
-            score = self._minimax(new_board, 0, max_depth, False, player, opponent, rules, alpha, beta)
-            
-            if score > best_score:
-                best_score = score
-                best_move = (row, col)
-                
-            # Update alpha
-            alpha = max(alpha, best_score)
-                
-        return best_move
-    
-    def _get_valid_moves(self, board: Board, player: Player, rules: GameRules) -> List[Tuple[int, int]]:
-        """Get all valid moves based on the game rules."""
-        if isinstance(rules, FeralRules):
-            # For Feral mode, we need to check each cell individually
-            valid_moves = []
-            for row in range(board.size):
-                for col in range(board.size):
-                    if rules.is_valid_move(board, row, col, player):
-                        valid_moves.append((row, col))
-            return valid_moves
+        # 3. Center, then a corner, then any cell, with a random number
+        center = board.size // 2
+        corners = [(0, 0), (0, board.size-1), (board.size-1, 0), (board.size-1, board.size-1)]
+        if board.is_valid_move(center, center, player, rules.game_mode):
+            cell = (center, center)
         else:
-            # For traditional modes, only empty cells are valid
-            return board.get_empty_cells()
-    
-    def _create_new_board_with_move(self, board: Board, row: int, col: int, player: Player, rules: GameRules) -> Board:
-        """Create a new board with the specified move applied."""
-        new_board = Board(board.size)
-        for r in range(board.size):
-            for c in range(board.size):
-                new_board.cells[r][c] = board.cells[r][c]
-        
-        # Apply the move using the appropriate game mode
-        if isinstance(rules, FeralRules):
-            new_board.make_move(row, col, player, GameMode.FERAL)
+            available_corners = [corner for corner in corners if board.is_valid_move(corner[0], corner[1], player, rules.game_mode)]
+            cell = random.choice(available_corners or board.get_empty_cells())
+        return cell + (random.choice(numbers),)
+
+# Perfect-play tablebases for small boards, written by tablebase.py
+TABLEBASE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tablebases")
+
+class Tablebase:
+    """
+    Read-only, memory-mapped table of perfect-play results.
+
+    The file is a 32-byte header (magic, version, board size, number of
+    sides, mode name) followed by one little-endian uint16 per position.
+    Positions are indexed by their base-3 number (empty = 0, X = 1, O = 2,
+    cell 0 least significant), so a lookup needs no symmetry transform.
+    One-sided tables (Traditional, Misere) rely on X moving first to know
+    the side to move; two-sided tables (Feral, where overwrites break that)
+    store all X-to-move entries followed by all O-to-move entries. Each
+    entry packs:
+
+        bits 0-8    best moves for the side to move, as a cell bitmask
+        bits 9-10   game value for the side to move (WIN, DRAW or LOSS)
+        bits 11-14  plies to the end of the game with perfect play
+
+    Finished and unreachable positions are stored as 0.
+    """
+    MAGIC = b"TTTB"
+    VERSION = 2
+    HEADER = struct.Struct("<4sBBB25s")
+    ENTRY = struct.Struct("<H")
+
+    WIN = 1
+    DRAW = 2
+    LOSS = 3
+
+    def __init__(self, path: str):
+        with open(path, "rb") as table_file:
+            self._map = mmap.mmap(table_file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, size, sides, mode = self.HEADER.unpack_from(self._map, 0)
+        if magic != self.MAGIC or version != self.VERSION:
+            self._map.close()
+            raise ValueError(f"Not a tablebase file: {path}")
+        self.size = size
+        self.sides = sides
+        self._side_offset = 3 ** (size * size)
+        self.mode = GameMode(mode.rstrip(b"\0").decode("ascii"))
+        self._x_digits, self._o_digits = self.digit_tables(size)
+
+    @staticmethod
+    def digit_tables(size: int) -> Tuple[List[int], List[int]]:
+        """Return lookup tables mapping a player bitmask to its base-3 contribution."""
+        num_cells = size * size
+        x_digits = [0] * (1 << num_cells)
+        for mask in range(1, 1 << num_cells):
+            low_bit = mask & -mask
+            x_digits[mask] = x_digits[mask ^ low_bit] + 3 ** (low_bit.bit_length() - 1)
+        return x_digits, [2 * value for value in x_digits]
+
+    @classmethod
+    def encode_entry(cls, value: int, plies: int, move_mask: int) -> int:
+        """Pack a value, distance and best-move mask into one table entry."""
+        return move_mask | value << 9 | plies << 11
+
+    def index(self, board: Board) -> int:
+        """Return the table index of the board position."""
+        return self._x_digits[board.x_bits] + self._o_digits[board.o_bits]
+
+    def lookup(self, board: Board, player: Player = Player.X) -> Optional[Tuple[int, int, int]]:
+        """
+        Return (value, plies, best-move mask) for the side to move, or None if not stored.
+
+        player is the side to move; one-sided tables ignore it.
+        """
+        index = self.index(board)
+        if self.sides == 2 and player is Player.O:
+            index += self._side_offset
+        offset = self.HEADER.size + self.ENTRY.size * index
+        entry = self.ENTRY.unpack_from(self._map, offset)[0]
+        if not entry:
+            return None
+        return entry >> 9 & 0x3, entry >> 11 & 0xF, entry & 0x1FF
+
+    def close(self):
+        self._map.close()
+
+_TABLEBASES: Dict[Tuple[GameMode, int], Optional[Tablebase]] = {}
+
+def tablebase_path(mode: GameMode, size: int = 3, directory: str = TABLEBASE_DIR) -> str:
+    """Return the file name used for the tablebase of a mode and board size."""
+    return os.path.join(directory, f"{mode.name.lower()}_{size}x{size}.ttb")
+
+def get_tablebase(mode: GameMode, size: int = 3) -> Optional[Tablebase]:
+    """Return the shared tablebase for mode and size, or None if it has not been built."""
+    key = (mode, size)
+    if key not in _TABLEBASES:
+        path = tablebase_path(mode, size)
+        _TABLEBASES[key] = Tablebase(path) if os.path.exists(path) else None
+    return _TABLEBASES[key]
+
+class OpeningBook:
+    """
+    Read-only, memory-mapped book of deep-searched opening moves, written
+    by openingbook.py for one mode, board size and win length.
+
+    The file is a 32-byte header (magic, version, board size, win length,
+    plies covered, mode name, entry count) followed by 12-byte entries
+    sorted by key: the little-endian uint64 canonical position hash (see
+    ``Board.canonical_hash``), the side to move (1 for X, 2 for O), the
+    best move's cell in the canonical orientation, and the depth in plies
+    it was searched to. A lookup is a binary search over the map, and the
+    cell is mapped back through the board's symmetry.
+    """
+    MAGIC = b"TTOB"
+    VERSION = 1
+    HEADER = struct.Struct("<4sBBBB20sI")
+    ENTRY = struct.Struct("<QBBH")
+
+    def __init__(self, path: str):
+        with open(path, "rb") as book_file:
+            self._map = mmap.mmap(book_file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, size, win_length, plies, mode, count = self.HEADER.unpack_from(self._map, 0)
+        if magic != self.MAGIC or version != self.VERSION:
+            self._map.close()
+            raise ValueError(f"Not an opening book file: {path}")
+        self.size = size
+        self.win_length = win_length
+        self.plies = plies
+        self.mode = GameMode(mode.rstrip(b"\0").decode("ascii"))
+        self.count = count
+
+    def __len__(self) -> int:
+        return self.count
+
+    @classmethod
+    def key(cls, position_hash: int, player: Player) -> Tuple[int, int]:
+        """Sort key of an entry."""
+        return position_hash, 1 if player is Player.X else 2
+
+    def lookup(self, board: Board, player: Player) -> Optional[Tuple[Tuple[int, int], int]]:
+        """Return ((row, col), searched depth) for player to move on board, or None if not in the book."""
+        position_hash, symmetry = board.canonical_hash()
+        target = self.key(position_hash, player)
+        entry = self.ENTRY
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            found_hash, side, cell, depth = entry.unpack_from(self._map, self.HEADER.size + entry.size * middle)
+            found = (found_hash, side)
+            if found == target:
+                lines = board.lines
+                return lines.coords[lines.inverse_symmetries[symmetry][cell]], depth
+            if found < target:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def close(self):
+        self._map.close()
+
+_OPENING_BOOKS: Dict[Tuple[GameMode, int, int], Optional[OpeningBook]] = {}
+
+def opening_book_path(mode: GameMode, size: int, win_length: Optional[int] = None,
+                      directory: str = TABLEBASE_DIR) -> str:
+    """Return the file name used for the opening book of a mode, board size and win length."""
+    suffix = "" if win_length in (None, size) else f"_k{win_length}"
+    return os.path.join(directory, f"{mode.name.lower()}_{size}x{size}{suffix}.book")
+
+def get_opening_book(mode: GameMode, size: int, win_length: Optional[int] = None) -> Optional[OpeningBook]:
+    """Return the shared opening book, opened on first use, or None if it has not been built."""
+    key = (mode, size, size if win_length is None else win_length)
+    if key not in _OPENING_BOOKS:
+        path = opening_book_path(mode, size, win_length)
+        _OPENING_BOOKS[key] = OpeningBook(path) if os.path.exists(path) else None
+    return _OPENING_BOOKS[key]
+
+class _SearchBudgetExceeded(Exception):
+    """Raised inside HardAI's search when the per-move time or node budget is used up."""
+
+# Transposition table for HardAI's search
+class TranspositionTable:
+    """
+    Bounded cache of search results keyed by canonical position hash.
+
+    Each entry stores (draft, flag, value, move): the remaining search depth
+    the value is valid for, whether the value is exact or a lower/upper
+    bound from an alpha-beta cutoff, the value itself, and the best move as
+    a cell index in the canonical orientation (or None).
+
+    When the table is full the least recently stored entry is evicted.
+    Storing a key again keeps the deeper result.
+    """
+    EXACT = 0
+    LOWER_BOUND = 1
+    UPPER_BOUND = 2
+
+    def __init__(self, max_entries: int = 100000):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[int, Tuple[int, int, float, Optional[int]]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, key: int) -> Optional[Tuple[int, int, float, Optional[int]]]:
+        """Return the (draft, flag, value, move) entry for key, or None."""
+        return self._entries.get(key)
+
+    def store(self, key: int, draft: int, flag: int, value: float, move: Optional[int]):
+        """Store a search result, keeping an existing entry if it was searched deeper."""
+        entries = self._entries
+        existing = entries.get(key)
+        if existing is not None:
+            if existing[0] > draft:
+                return
+            entries.move_to_end(key)
+        elif len(entries) >= self.max_entries:
+            entries.popitem(last=False)
+        entries[key] = (draft, flag, value, move)
+
+    def clear(self):
+        """Remove all entries."""
+        self._entries.clear()
+
+# Move ordering for HardAI's alpha-beta search
+class MoveOrdering:
+    """
+    Decides the order in which HardAI tries moves at each node.
+
+    The base class only moves the transposition table's best move to the
+    front and keeps the rest in generation (row-major) order. Subclasses
+    can use the cutoff notifications to learn good moves during a search.
+    """
+    def new_search(self):
+        """Called at the start of every get_move."""
+        pass
+
+    def order(self, board: Board, moves: List[Tuple[int, int]], mover: Player, rules: GameRules,
+              ply: int, hash_move: Optional[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        """Return moves in the order they should be searched."""
+        if hash_move is not None and hash_move in moves:
+            moves.remove(hash_move)
+            moves.insert(0, hash_move)
+        return moves
+
+    def record_cutoff(self, board: Board, move: Tuple[int, int], mover: Player, ply: int, draft: int):
+        """Called when move caused an alpha-beta cutoff at ply with draft plies left to search."""
+        pass
+
+class KillerHistoryOrdering(MoveOrdering):
+    """
+    Orders moves by, in turn: the transposition table move, immediate wins,
+    forced blocks, the killer moves of the ply, the history heuristic and
+    finally a static priority for cells on many lines (center, then corners).
+
+    Killer moves are the last two moves that caused a cutoff at the same
+    ply. The history table adds draft^2 for every cutoff a move causes; it
+    is halved between moves so that old results fade.
+    """
+    KILLERS_PER_PLY = 2
+
+    def __init__(self):
+        self.killers: List[List[Tuple[int, int]]] = []
+        self.history: Dict[Player, Dict[Tuple[int, int], int]] = {Player.X: {}, Player.O: {}}
+        self._static_cache: Dict[Tuple[int, int, bool], List[int]] = {}
+
+    def new_search(self):
+        self.killers = []
+        for table in self.history.values():
+            for move in list(table):
+                table[move] //= 2
+                if not table[move]:
+                    del table[move]
+
+    def order(self, board: Board, moves: List[Tuple[int, int]], mover: Player, rules: GameRules,
+              ply: int, hash_move: Optional[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        lines = board.lines
+        size = board.size
+        win_moves = ()
+        if isinstance(rules, NumericalRules):
+            # A Numerical win needs the right number too, so wins are kept as moves
+            opponent = Player.O if mover == Player.X else Player.X
+            win_moves = rules.winning_moves(board, mover)
+            wins = blocks = 0
+            for row, col, _ in rules.winning_moves(board, opponent):
+                blocks |= 1 << (row * size + col)
         else:
-            new_board.make_move(row, col, player)
+            wins, blocks = self._threat_cells(board, mover, rules.allows_overwrite)
+        losses = 0
+        misere = getattr(rules, "game_mode", None) == GameMode.MISERE
+        if misere:
+            # Completing your own line loses in Misere: try those moves last
+            wins, blocks, losses = 0, 0, wins
+        static_priority = self._static_priority(lines, misere)
+        killers = self.killers[ply] if ply < len(self.killers) else ()
+        history = self.history[mover]
+
+        def priority(move: Tuple[int, int]) -> int:
+            if move == hash_move:
+                return 8 << 40
+            bit_index = move[0] * size + move[1]
+            if wins >> bit_index & 1 or move in win_moves:
+                category = 7
+            elif blocks >> bit_index & 1:
+                category = 6
+            elif losses >> bit_index & 1:
+                return 0
+            elif move in killers:
+                category = 5 - killers.index(move)
+            else:
+                category = 1
+            return category << 40 | min(history.get(move, 0), (1 << 31) - 1) << 8 | static_priority[bit_index]
+
+        moves.sort(key=priority, reverse=True)
+        return moves
+
+    def _static_priority(self, lines: LineTable, misere: bool) -> List[int]:
+        """
+        Per-cell priority from the number of lines through the cell: center
+        and corners first, or last in Misere where such cells are liabilities.
+        """
+        key = (lines.size, lines.line_length, misere)
+        priority = self._static_cache.get(key)
+        if priority is None:
+            priority = [len(cell_lines) for cell_lines in lines.lines_through]
+            if misere:
+                priority = [255 - value for value in priority]
+            self._static_cache[key] = priority
+        return priority
+
+    def record_cutoff(self, board: Board, move: Tuple[int, int], mover: Player, ply: int, draft: int):
+        while len(self.killers) <= ply:
+            self.killers.append([])
+        killers = self.killers[ply]
+        if move not in killers:
+            killers.insert(0, move)
+            del killers[self.KILLERS_PER_PLY:]
+        history = self.history[mover]
+        history[move] = history.get(move, 0) + draft * draft
+
+    @staticmethod
+    def _threat_cells(board: Board, mover: Player, feral: bool) -> Tuple[int, int]:
+        """Return bitmasks of cells that complete a line for mover (wins) and for the opponent (blocks)."""
+        lines = board.lines
+        needed = lines.line_length - 1
+        if mover is Player.X:
+            own_counts, other_counts = board.x_line_counts, board.o_line_counts
+            own_bits, other_bits = board.x_bits, board.o_bits
+        else:
+            own_counts, other_counts = board.o_line_counts, board.x_line_counts
+            own_bits, other_bits = board.o_bits, board.x_bits
+        empty = lines.full_mask & ~(own_bits | other_bits)
+        wins = blocks = 0
+        for line, mask in enumerate(lines.line_masks):
+            if own_counts[line] == needed and (feral or not other_counts[line]):
+                wins |= mask & ~own_bits
+            elif other_counts[line] == needed and not own_counts[line]:
+                blocks |= mask & empty
+        return wins, blocks
+
+# Statistics of one HardAI move
+class SearchStats:
+    """
+    What one ``HardAI.get_move`` call did, for metrics and debugging.
+
+    Plies count from the root: the AI's candidate moves are ply 1, the
+    opponent's replies ply 2, and so on. Root-parallel searches run their
+    nodes in worker processes, so only wall time and depth are filled in.
+
+    Attributes:
+        move: The move returned
+        source: "search", "tablebase", "book", "proof" or "parallel"
+        wall_time: Seconds spent in get_move
+        nodes: Nodes visited, by minimax and the proof search together
+        proof_nodes: Nodes of those visited by the proof search
+        interior_nodes: Nodes whose moves were searched, the root included
+        leaf_evaluations: Heuristic evaluations at the depth limit
+        tt_hits: Nodes answered by the transposition table without a search
+        cutoffs: Alpha/beta cutoffs by the ply of the node where they happened
+        max_ply: Deepest ply visited
+        depth: Plies of the deepest completed iteration (the whole search
+            when there is no budget)
+    """
+    def __init__(self):
+        self.move: Optional[Tuple[int, ...]] = None
+        self.source = "search"
+        self.wall_time = 0.0
+        self.nodes = 0
+        self.proof_nodes = 0
+        self.interior_nodes = 0
+        self.leaf_evaluations = 0
+        self.tt_hits = 0
+        self.cutoffs: List[int] = []
+        self.max_ply = 0
+        self.depth = 0
+
+    @property
+    def branching_factor(self) -> float:
+        """Average number of moves searched per interior node, after cutoffs."""
+        return (self.nodes - self.proof_nodes) / self.interior_nodes if self.interior_nodes else 0.0
+
+    def record_cutoff(self, ply: int):
+        if ply >= len(self.cutoffs):
+            self.cutoffs.extend([0] * (ply + 1 - len(self.cutoffs)))
+        self.cutoffs[ply] += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        """The statistics as a JSON-serializable dict."""
+        return {
+            "move": list(self.move) if self.move is not None else None,
+            "source": self.source,
+            "wall_time": self.wall_time,
+            "nodes": self.nodes,
+            "interior_nodes": self.interior_nodes,
+            "leaf_evaluations": self.leaf_evaluations,
+            "tt_hits": self.tt_hits,
+            "cutoffs": list(self.cutoffs),
+            "max_ply": self.max_ply,
+            "depth": self.depth,
+            "branching_factor": self.branching_factor,
+        }
+
+# Outcome of a proof-number search
+class ProofResult(NamedTuple):
+    """
+    Proven value of a position for the side to move.
+
+    value is ProofNumberSearch.WIN, DRAW or LOSS, or None when the budget
+    ran out before a proof was found. line is a principal line from the
+    position to the end of the game, each move taken from the proof of the
+    side making it; it is empty when the value is unknown.
+    """
+    value: Optional[int]
+    line: List[Tuple[int, int]]
+    nodes: int
+
+# Proof-number solver for k-in-a-row games
+class ProofNumberSearch:
+    """
+    Depth-first proof-number search (df-pn) for line games without overwrites.
+
+    One search proves or disproves that an attacker completes a line
+    against any defence. Every position gets a proof and a disproof number,
+    the least number of leaves still to be solved to prove or disprove it,
+    stored as (phi, delta) from the side to move's point of view: phi for
+    proving that the side to move achieves its goal, delta for disproving
+    it. The search always descends into the child closest to settling its
+    parent, within thresholds passed down from the parent, so effort goes
+    to the most promising proof or refutation instead of being spread over
+    the whole tree as in minimax.
+
+    solve proves first that the side to move wins and, failing that, that
+    the opponent wins; when both are disproved the position is a draw.
+    Positions are keyed by canonical hash and side to move, so symmetric
+    positions share an entry. The tables are the memory budget: a solve
+    that would keep more than max_entries positions gives up and returns
+    an unknown value, as it does when the node or time budget runs out.
+
+    Overwrites (Feral) let positions repeat, which df-pn cannot prove
+    through, and Numerical has no line rules, so both are rejected.
+    """
+    WIN = Tablebase.WIN
+    DRAW = Tablebase.DRAW
+    LOSS = Tablebase.LOSS
+
+    # Proof or disproof number of a solved position
+    INFINITY = 10 ** 9
+    # Nodes searched between wall-clock checks in timed searches
+    TIME_CHECK_INTERVAL = 256
+
+    def __init__(self, max_entries: int = 1000000, node_limit: Optional[int] = None,
+                 time_limit: Optional[float] = None):
+        """
+        Args:
+            max_entries: Most positions kept across the proofs of one solve
+            node_limit: Budget of search nodes per solve; None for no limit
+            time_limit: Wall-clock budget per solve in seconds; None for no limit
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = max_entries
+        self.node_limit = node_limit
+        self.time_limit = time_limit
+        self._tables: Dict[Player, Dict[int, Tuple[int, int]]] = {}
+        self._table: Dict[int, Tuple[int, int]] = {}
+        self._entry_limit = max_entries
+        self._attacker = Player.X
+        self._nodes = 0
+        self._next_budget_check = math.inf
+        self._deadline: Optional[float] = None
+        self._stop_event = threading.Event()
+
+    @staticmethod
+    def supports(rules: GameRules) -> bool:
+        """Whether positions under rules can be solved."""
+        return isinstance(rules, LineRules) and not rules.allows_overwrite
+
+    @property
+    def nodes_searched(self) -> int:
+        """Number of search nodes visited by the most recent solve or prove_win."""
+        return self._nodes
+
+    def solve(self, board: Board, rules: GameRules, player: Player,
+              stop_event: Optional[threading.Event] = None) -> ProofResult:
+        """
+        Solve the position on board with player to move.
+
+        The board is not modified. Returns a ProofResult whose value is None
+        if the node, time or memory budget ran out first, or stop_event (if
+        given) was set.
+        """
+        if not self.supports(rules):
+            raise ValueError(f"Proof-number search does not support {type(rules).__name__}")
+        opponent = Player.O if player == Player.X else Player.X
+        self._start_budget(stop_event=stop_event)
+        winner = rules.check_winner(board)
+        if winner is not None or not rules.get_valid_moves(board, player):
+            value = self.DRAW if winner is None else self.WIN if winner == player else self.LOSS
+            return ProofResult(value, [], 0)
+
+        board = board.copy()
+        try:
+            if self._prove(board, rules, player, player):
+                tables = {player: self._tables[player], opponent: self._tables[player]}
+                return ProofResult(self.WIN, self._principal_line(board, rules, player, tables), self._nodes)
+            if self._prove(board, rules, player, opponent):
+                tables = {player: self._tables[opponent], opponent: self._tables[opponent]}
+                return ProofResult(self.LOSS, self._principal_line(board, rules, player, tables), self._nodes)
+        except _SearchBudgetExceeded:
+            return ProofResult(None, [], self._nodes)
+        finally:
+            self._table = {}
+        # Each side's moves come from the proof that it holds the other to a draw
+        tables = {player: self._tables[opponent], opponent: self._tables[player]}
+        return ProofResult(self.DRAW, self._principal_line(board, rules, player, tables), self._nodes)
+
+    def prove_win(self, board: Board, rules: GameRules, player: Player, deadline: Optional[float] = None,
+                  stop_event: Optional[threading.Event] = None) -> Optional[List[Tuple[int, int]]]:
+        """
+        Return a winning line for player, to move on board, or None if there
+        is no forced win or none was found within the budget.
+
+        deadline, a time.monotonic() value, ends the search early when it
+        comes before the end of time_limit. Setting stop_event ends it as
+        stop() does, even if it is set before the search starts.
+        """
+        if not self.supports(rules):
+            raise ValueError(f"Proof-number search does not support {type(rules).__name__}")
+        opponent = Player.O if player == Player.X else Player.X
+        self._start_budget(deadline, stop_event)
+        if rules.check_winner(board) is not None or not rules.get_valid_moves(board, player):
+            return None
+        board = board.copy()
+        try:
+            if not self._prove(board, rules, player, player):
+                return None
+        except _SearchBudgetExceeded:
+            return None
+        finally:
+            self._table = {}
+        tables = {player: self._tables[player], opponent: self._tables[player]}
+        return self._principal_line(board, rules, player, tables)
+
+    def stop(self):
+        """Make a solve running on another thread give up at its next node."""
+        self._stop_event.set()
+        self._next_budget_check = 0
+
+    def _start_budget(self, deadline: Optional[float] = None, stop_event: Optional[threading.Event] = None):
+        """Reset the counters and tables and arm the budget for a new solve."""
+        self._tables = {}
+        self._nodes = 0
+        self._stop_event = stop_event if stop_event is not None else threading.Event()
+        if self.time_limit is not None:
+            own_deadline = time.monotonic() + self.time_limit
+            deadline = own_deadline if deadline is None else min(deadline, own_deadline)
+        self._deadline = deadline
+        self._next_budget_check = math.inf
+        if self.node_limit is not None:
+            self._next_budget_check = self.node_limit
+        if deadline is not None:
+            self._next_budget_check = min(self._next_budget_check, self.TIME_CHECK_INTERVAL)
+        if self._stop_event.is_set():
+            self._next_budget_check = 0
+
+    def _check_budget(self):
+        """Raise _SearchBudgetExceeded if the node or time budget is used up, or stop was called."""
+        if self._stop_event.is_set():
+            raise _SearchBudgetExceeded()
+        if self.node_limit is not None and self._nodes >= self.node_limit:
+            raise _SearchBudgetExceeded()
+        self._next_budget_check = math.inf if self.node_limit is None else self.node_limit
+        if self._deadline is not None:
+            if time.monotonic() >= self._deadline:
+                raise _SearchBudgetExceeded()
+            self._next_budget_check = min(self._next_budget_check, self._nodes + self.TIME_CHECK_INTERVAL)
+        if self._stop_event.is_set():
+            # stop() ran while the next check was being set
+            self._next_budget_check = 0
+
+    def _prove(self, board: Board, rules: GameRules, player: Player, attacker: Player) -> bool:
+        """Run one proof with player to move; return whether attacker forces a win."""
+        self._attacker = attacker
+        self._table = self._tables[attacker] = {}
+        # Tables of earlier proofs stay alive for the principal line and count against the budget
+        self._entry_limit = self.max_entries - sum(len(table) for table in self._tables.values())
+        opponent = Player.O if player == Player.X else Player.X
+        self._mid(board, rules, player, opponent, self.INFINITY, self.INFINITY)
+        phi, delta = self._table[self._key(board, player)]
+        return phi == 0 if player == attacker else delta == 0
+
+    @staticmethod
+    def _key(board: Board, mover: Player) -> int:
+        return board.canonical_hash()[0] << 1 | (mover is Player.O)
+
+    @staticmethod
+    def _moves(board: Board, rules: LineRules, mover: Player, opponent: Player) -> List[Tuple[int, int]]:
+        """Moves worth searching: with a line open for the opponent, only the cells that block it."""
+        threats = rules.winning_cells(board, opponent)
+        if threats:
+            return board.cells_in(threats)
+        return rules.get_valid_moves(board, mover)
+
+    def _mid(self, board: Board, rules: LineRules, mover: Player, opponent: Player, phi_threshold: int,
+             delta_threshold: int):
+        """
+        Search the position with mover to move until its (phi, delta) reach
+        either threshold, and store them in the table.
+        """
+        self._nodes += 1
+        if self._nodes >= self._next_budget_check:
+            self._check_budget()
+        infinity = self.INFINITY
+        table = self._table
+        key = self._key(board, mover)
+        if rules.winning_cells(board, mover):
+            table[key] = (0, infinity)
+            return
+
+        # Generate the children once; finished ones are solved on the spot
+        attacker_moves = opponent == self._attacker
+        moves = []
+        children = []
+        for move in self._moves(board, rules, mover, opponent):
+            board.play(move, mover)
+            child = self._key(board, opponent)
+            if child not in children:
+                if child not in table:
+                    winner = rules.check_winner(board, move[:2])
+                    if winner is not None or board.is_full():
+                        # A full board without a line is a failure for the attacker
+                        table[child] = (0, infinity) if (winner == self._attacker) == attacker_moves else (infinity, 0)
+                moves.append(move)
+                children.append(child)
+            board.undo_move()
+
+        while True:
+            # phi is the smallest child delta, delta the sum of child phis
+            delta = 0
+            best = 0
+            best_delta = second_delta = infinity
+            best_phi = 1
+            for index, child in enumerate(children):
+                child_phi, child_delta = table.get(child, (1, 1))
+                delta += child_phi
+                if child_delta < best_delta:
+                    second_delta = best_delta
+                    best, best_delta, best_phi = index, child_delta, child_phi
+                elif child_delta < second_delta:
+                    second_delta = child_delta
+            phi = best_delta
+            delta = min(delta, infinity)
+            table[key] = (phi, delta)
+            if len(table) > self._entry_limit:
+                raise _SearchBudgetExceeded()
+            if phi >= phi_threshold or delta >= delta_threshold:
+                return
+            board.play(moves[best], mover)
+            self._mid(board, rules, opponent, mover, min(infinity, delta_threshold - delta + best_phi),
+                      min(phi_threshold, second_delta + 1))
+            board.undo_move()
+
+    def _principal_line(self, board: Board, rules: LineRules, player: Player,
+                        tables: Dict[Player, Dict[int, Tuple[int, int]]]) -> List[Tuple[int, int]]:
+        """
+        Play out the proof from board, player to move, and return the moves.
+
+        Each side moves by tables[side]: into a child the proof shows lost
+        for the opponent when the position is proven for the side, otherwise
+        into the first candidate, as every move loses.
+        """
+        line = []
+        mover = player
+        while True:
+            opponent = Player.O if mover == Player.X else Player.X
+            table = tables[mover]
+            wins = rules.winning_cells(board, mover)
+            moves = board.cells_in(wins) if wins else self._moves(board, rules, mover, opponent)
+            choice = moves[0]
+            if not wins and table.get(self._key(board, mover), (1, 1))[0] == 0:
+                for move in moves:
+                    board.play(move, mover)
+                    solved = table.get(self._key(board, opponent), (1, 1))[1] == 0
+                    board.undo_move()
+                    if solved:
+                        choice = move
+                        break
+            board.play(choice, mover)
+            line.append(choice)
+            if rules.check_winner(board, choice[:2]) is not None or board.is_full():
+                return line
+            mover = opponent
+
+# Hard AI: Minimax Algorithm
+class HardAI(AIStrategy):
+    """
+    Minimax with alpha-beta pruning and a symmetry-aware transposition table.
+
+    The transposition table belongs to the instance, so it is reused by every
+    ``get_move`` call of a game session. It is cleared automatically when
+    the AI is used with a different rules class or board size.
+    """
+    # Score of a won terminal position; wins are scored WIN_SCORE - depth
+    WIN_SCORE = 1000
+    # Nodes searched between wall-clock checks in budgeted searches
+    TIME_CHECK_INTERVAL = 256
+
+    # Modes tablebase.py can build tables for
+    TABLEBASE_MODES = (GameMode.TRADITIONAL, GameMode.MISERE, GameMode.FERAL)
+
+    # Positions with fewer empty cells are searched serially even when workers are set
+    PARALLEL_MIN_EMPTY = 10
+
+    # The search is deterministic, so get_moves searches symmetric positions once
+    deduplicate_batches = True
+
+    def __init__(self, tt_size: int = 100000, max_depth: Optional[int] = 9,
+                 time_limit: Optional[float] = None, node_limit: Optional[int] = None,
+                 use_tablebase: bool = True, use_book: bool = True, workers: Optional[int] = None,
+                 move_ordering: Optional[MoveOrdering] = None, collect_stats: bool = False,
+                 on_move: Optional[Callable[[SearchStats], None]] = None, proof_nodes: Optional[int] = None):
+        """
+        Args:
+            tt_size: Maximum number of transposition table entries
+            max_depth: Plies searched after the AI's own move. In anytime mode
+                this caps the deepest iteration; None means no cap.
+            time_limit: Wall-clock budget per move in seconds. Setting this or
+                node_limit switches get_move to iterative deepening.
+            node_limit: Budget of search nodes per move
+            use_tablebase: Answer from a prebuilt tablebase when one exists
+                for the mode and board size (see tablebase.py)
+            use_book: Answer opening positions from a prebuilt opening book
+                when one exists (see openingbook.py)
+            workers: Number of worker processes for root-parallel search.
+                None or 1 searches in this process. Node budgets are not
+                split across processes, so node_limit forces serial search.
+            move_ordering: Move ordering for the search; defaults to
+                KillerHistoryOrdering. MoveOrdering() keeps row-major order.
+            collect_stats: Keep a SearchStats for every move in last_stats.
+                Off by default; the search then skips all counting except nodes.
+            on_move: Called with the SearchStats of every move; implies collect_stats
+            proof_nodes: Node budget of a proof-number search run before the
+                minimax search; a proven forced win is played at once. None
+                skips it. Only line rules without overwrites are solved. The
+                proof search counts against time_limit: it stops at the move's
+                deadline, and the minimax search gets only the time left.
+        """
+        self.transposition_table = TranspositionTable(tt_size)
+        self._tt_context = None
+        self.max_depth = max_depth
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+        self.use_tablebase = use_tablebase
+        self.use_book = use_book
+        self.workers = workers
+        self.move_ordering = move_ordering if move_ordering is not None else KillerHistoryOrdering()
+        self.collect_stats = collect_stats
+        self.on_move = on_move
+        self.proof_nodes = proof_nodes
+        self._proof_search: Optional[ProofNumberSearch] = None
+        self.last_stats: Optional[SearchStats] = None
+        self._stats: Optional[SearchStats] = None
+        self._nodes = 0
+        self._proof_nodes = 0
+        self._next_budget_check = math.inf
+        self._node_limit = None
+        self._deadline = None
+        self._stop_event = threading.Event()
+
+    def get_move(self, board: Board, player: Player, rules: GameRules) -> Tuple[int, int]:
+        """
+        Use minimax algorithm with alpha-beta pruning to find optimal move.
+
+        Without a time or node budget this is a single search to max_depth.
+        With a budget, depths 1, 2, 3, ... are searched until the budget runs
+        out, and the best move of the deepest completed search is returned.
+        """
+        if not (self.collect_stats or self.on_move):
+            return self._choose_move(board, player, rules)
+
+        stats = self._stats = SearchStats()
+        start = time.perf_counter()
+        try:
+            stats.move = self._choose_move(board, player, rules)
+        finally:
+            self._stats = None
+        stats.wall_time = time.perf_counter() - start
+        stats.nodes = self.nodes_searched
+        stats.proof_nodes = self._proof_nodes
+        self.last_stats = stats
+        if self.on_move is not None:
+            self.on_move(stats)
+        return stats.move
+
+    def _choose_move(self, board: Board, player: Player, rules: GameRules,
+                     stop_event: Optional[threading.Event] = None) -> Optional[Tuple[int, ...]]:
+        """
+        get_move without the statistics bookkeeping.
+
+        stop_event is the search's stop flag; a caller that may cancel the
+        search before it starts passes its own, which stop() then sets.
+        """
+        opponent = Player.O if player == Player.X else Player.X
+        self._nodes = 0
+        self._proof_nodes = 0
+        self._stop_event = stop_event if stop_event is not None else threading.Event()
+        
+        # Cached results are only meaningful for the same rules and board size
+        context = (type(rules), getattr(rules, "spec", None), board.size)
+        if context != self._tt_context:
+            self.transposition_table.clear()
+            self._tt_context = context
+        
+        # One deadline for the whole move, proof search included
+        deadline = None
+        if self.time_limit is not None:
+            deadline = time.monotonic() + self.time_limit
+        
+        # Get valid moves based on game mode
+        valid_moves = self._get_valid_moves(board, player, rules)
+        if not valid_moves:
+            return None
+        
+        if self.use_tablebase:
+            move = self._tablebase_move(board, player, rules)
+            if move is not None:
+                if self._stats is not None:
+                    self._stats.source = "tablebase"
+                return move
+        if self.use_book:
+            move = self._book_move(board, player, rules)
+            if move is not None:
+                if self._stats is not None:
+                    self._stats.source = "book"
+                return move
+        if self.proof_nodes:
+            move = self._proof_move(board, player, rules, deadline)
+            if move is not None:
+                return move
+        
+        self.move_ordering.new_search()
+        valid_moves = self.move_ordering.order(board, valid_moves, player, rules, 0, None)
+        if self.time_limit is None and self.node_limit is None:
+            max_depth = 9 if self.max_depth is None else self.max_depth
+            self._start_budget()
+            try:
+                best_move, _, _ = self._search_root(board, valid_moves, max_depth, player, opponent, rules)
+            except _SearchBudgetExceeded:
+                # Stopped before the search finished; play the move ordering's first choice
+                return valid_moves[0]
+            if self._stats is not None:
+                self._stats.depth = max_depth + 1
+                if not rules.allows_overwrite:
+                    self._stats.depth = min(self._stats.depth, len(board.get_empty_cells()))
+            return best_move
+        return self._iterative_deepening(board, valid_moves, player, opponent, rules, deadline)
+
+    @property
+    def nodes_searched(self) -> int:
+        """Number of search nodes visited by the most recent get_move, proof search included."""
+        return self._nodes + self._proof_nodes
+
+    def _book_move(self, board: Board, player: Player, rules: GameRules) -> Optional[Tuple[int, int]]:
+        """Return the opening book move, or None if there is no book or the position is not in it."""
+        mode = getattr(rules, "game_mode", None)
+        if mode not in self.TABLEBASE_MODES:
+            return None
+        # Books are built for each mode's standard rules, at any win length
+        standard = RulesFactory.create_rules(mode)
+        if rules.spec._replace(board_size=None, win_length=None) != standard.spec:
+            return None
+        lines = rules.compile(board.size)
+        book = get_opening_book(mode, board.size, lines.line_length)
+        if book is None or popcount(board.x_bits | board.o_bits) > book.plies:
+            return None
+        entry = book.lookup(board, player)
+        if entry is None or not rules.is_valid_move(board, entry[0][0], entry[0][1], player):
+            return None
+        return entry[0]
+
+    def _proof_move(self, board: Board, player: Player, rules: GameRules,
+                    deadline: Optional[float] = None) -> Optional[Tuple[int, int]]:
+        """
+        Return the first move of a proven forced win, or None if none was
+        found within proof_nodes or before deadline.
+        """
+        if not ProofNumberSearch.supports(rules):
+            return None
+        if self._proof_search is None or self._proof_search.node_limit != self.proof_nodes:
+            self._proof_search = ProofNumberSearch(self.transposition_table.max_entries, self.proof_nodes)
+        solver = self._proof_search
+        line = solver.prove_win(board, rules, player, deadline, self._stop_event)
+        self._proof_nodes = solver.nodes_searched
+        if line is None:
+            return None
+        if self._stats is not None:
+            self._stats.source = "proof"
+            self._stats.depth = len(line)
+        return line[0]
+
+    def _tablebase_move(self, board: Board, player: Player, rules: GameRules) -> Optional[Tuple[int, int]]:
+        """Return the first best move from the tablebase, or None if the position is not covered."""
+        mode = getattr(rules, "game_mode", None)
+        if mode not in self.TABLEBASE_MODES:
+            return None
+        # Tables are solved for each mode's standard rules with full-length lines
+        standard = RulesFactory.create_rules(mode)
+        if (rules.spec._replace(board_size=None, win_length=None) != standard.spec
+                or rules.compile(board.size).line_length != board.size):
+            return None
+        table = get_tablebase(mode, board.size)
+        if table is None:
+            return None
+        
+        # One-sided tables assume X moved first, so the side to move follows from the counts
+        if table.sides == 1:
+            x_count = board.count(Player.X)
+            o_count = board.count(Player.O)
+            expected = Player.X if x_count == o_count else Player.O if x_count == o_count + 1 else None
+            if player is not expected:
+                return None
+        
+        entry = table.lookup(board, player)
+        if entry is None:
+            return None
+        move_mask = entry[2]
+        return board.lines.coords[(move_mask & -move_mask).bit_length() - 1]
+
+    def _iterative_deepening(self, board: Board, valid_moves: List[Tuple[int, int]], player: Player,
+                             opponent: Player, rules: GameRules, deadline: Optional[float] = None) -> Tuple[int, int]:
+        """
+        Search one ply deeper each iteration until the budget is spent.
+
+        deadline is the move's deadline when time was already spent on it;
+        otherwise time_limit starts now.
+        """
+        self._start_budget(self.time_limit, self.node_limit, deadline)
+        
+        # Without overwrites the game cannot last longer than the empty cells
+        ply_limit = math.inf
+        if not rules.allows_overwrite:
+            ply_limit = len(board.get_empty_cells())
+        if self.max_depth is not None:
+            ply_limit = min(ply_limit, self.max_depth + 1)
+        
+        best_move = valid_moves[0]
+        ordered_moves = list(valid_moves)
+        depth = 1
+        while depth <= ply_limit:
+            try:
+                move, score, scores = self._search_root(board, ordered_moves, depth - 1, player, opponent, rules)
+            except _SearchBudgetExceeded:
+                break
+            best_move = move
+            if self._stats is not None:
+                self._stats.depth = depth
             
-        return new_board
+            # A forced win or loss inside the horizon will not change with more depth
+            if abs(score) >= self.WIN_SCORE // 2:
+                break
+            
+            # Previous best first, then the rest by their last scores
+            ordered_moves.sort(key=lambda m: (m != best_move, -scores[m]))
+            depth += 1
+        return best_move
+
+    def _search_root(self, board: Board, valid_moves: List[Tuple[int, int]], max_depth: int,
+                     player: Player, opponent: Player, rules: GameRules) -> Tuple[Tuple[int, int], float, Dict[Tuple[int, int], float]]:
+        """Search every root move to max_depth. Returns (best_move, best_score, scores by move)."""
+        if self._use_parallel(board):
+            if self._stats is not None:
+                self._stats.source = "parallel"
+            return self._search_root_parallel(board, valid_moves, max_depth, player, rules)
+        if self._stats is not None:
+            self._stats.interior_nodes += 1
+        
+        best_score = -math.inf
+        best_move = None
+        scores = {}
+        
+        # Apply alpha-beta pruning for efficiency
+        alpha = -math.inf
+        beta = math.inf
+        
+        # Search on a private copy; moves are applied and undone in place
+        search_board = board.copy()
+        
+        # Try each possible move
+        for move in valid_moves:
+            search_board.play(move, player)
+            
+            # Evaluate using minimax with alpha-beta pruning
+            score = self._minimax(search_board, 0, max_depth, False, player, opponent, rules, alpha, beta)
+            search_board.undo_move()
+            scores[move] = score
+            
+            if score > best_score:
+                best_score = score
+                best_move = move
+                
+            # Update alpha
+            alpha = max(alpha, best_score)
+                
+        return best_move, best_score, scores
+
+    def _use_parallel(self, board: Board) -> bool:
+        """Whether the root search is large enough to pay for the process pool."""
+        if self.workers is None or self.workers < 2 or self._node_limit is not None:
+            return False
+        # Workers rebuild the board from the player bitmasks, which lose Numerical numbers
+        if isinstance(board, NumericalBoard):
+            return False
+        empty_count = board.lines.num_cells - popcount(board.x_bits | board.o_bits)
+        return empty_count >= self.PARALLEL_MIN_EMPTY
+
+    def _search_root_parallel(self, board: Board, valid_moves: List[Tuple[int, int]], max_depth: int,
+                              player: Player, rules: GameRules) -> Tuple[Tuple[int, int], float, Dict[Tuple[int, int], float]]:
+        """
+        Search root moves in worker processes, one task per move.
+
+        Each task starts from the best score any finished task has reached
+        (a shared alpha), so later moves are cut off as they would be in a
+        serial search. A result at or below the alpha it started from is
+        only an upper bound and never replaces the best move.
+        """
+        pool, shared_alpha, lock = _get_parallel_pool(self.workers)
+        tt_size = self.transposition_table.max_entries
+        with lock:
+            shared_alpha.value = -math.inf
+            futures = [
+                pool.submit(_parallel_root_task, board.size, board.lines.line_length, board.x_bits, board.o_bits, move,
+                            player, rules, max_depth, self._deadline, tt_size)
+                for move in valid_moves
+            ]
+            results = [future.result() for future in futures]
+        
+        best_score = -math.inf
+        best_move = None
+        scores = {}
+        for move, start_alpha, score in results:
+            if score is None:
+                raise _SearchBudgetExceeded()
+            scores[move] = score
+            if score > start_alpha and score > best_score:
+                best_score = score
+                best_move = move
+        return best_move, best_score, scores
+
+    def _start_budget(self, time_limit: Optional[float] = None, node_limit: Optional[int] = None,
+                      deadline: Optional[float] = None):
+        """Reset the node counter and arm the time/node budget for a new move."""
+        self._nodes = 0
+        self._node_limit = node_limit
+        if deadline is None and time_limit is not None:
+            deadline = time.monotonic() + time_limit
+        self._deadline = deadline
+        self._next_budget_check = math.inf
+        if node_limit is not None:
+            self._next_budget_check = node_limit
+        if deadline is not None:
+            self._next_budget_check = min(self._next_budget_check, self.TIME_CHECK_INTERVAL)
+        if self._stop_event.is_set():
+            self._next_budget_check = 0
+
+    def stop(self):
+        """
+        Make a get_move running on another thread give up at its next node.
+
+        A budgeted search returns its best move so far; an unbudgeted one
+        returns the first move in its move ordering. Searches started later
+        are not affected.
+        """
+        self._stop_event.set()
+        self._next_budget_check = 0
+        if self._proof_search is not None:
+            self._proof_search.stop()
+
+    def _check_budget(self):
+        """Raise _SearchBudgetExceeded if the node or time budget is used up, or stop was called."""
+        if self._stop_event.is_set():
+            raise _SearchBudgetExceeded()
+        if self._node_limit is not None and self._nodes >= self._node_limit:
+            raise _SearchBudgetExceeded()
+        if self._deadline is not None:
+            if time.monotonic() >= self._deadline:
+                raise _SearchBudgetExceeded()
+            self._next_budget_check = self._nodes + self.TIME_CHECK_INTERVAL
+            if self._node_limit is not None:
+                self._next_budget_check = min(self._next_budget_check, self._node_limit)
+        else:
+            self._next_budget_check = self._node_limit
+        if self._stop_event.is_set():
+            # stop() ran while the next check was being set
+            self._next_budget_check = 0
+    
+    def _get_valid_moves(self, board: Board, player: Player, rules: GameRules) -> List[Tuple[int, int]]:
+        """Get all valid moves based on the game rules (Feral also allows overwrites)."""
+        return rules.get_valid_moves(board, player)
     
     def _minimax(self, board: Board, depth: int, max_depth: int, is_maximizing: bool, 
                 player: Player, opponent: Player, rules: GameRules, 
@@ -464,7 +2384,7 @@ class HardAI(AIStrategy):
         Minimax algorithm with alpha-beta pruning implementation.
         
         Args:
-            board: Current board state
+            board: Current board state (moves are applied and undone in place)
             depth: Current recursion depth
             max_depth: Maximum recursion depth to limit search
             is_maximizing: Whether it's maximizing player's turn
@@ -477,86 +2397,511 @@ class HardAI(AIStrategy):
         Returns:
             The optimal score for the current board state
         """
-        # Check for terminal states
-        winner = rules.check_winner(board)
+        self._nodes += 1
+        if self._nodes >= self._next_budget_check:
+            self._check_budget()
+        stats = self._stats
+        if stats is not None and depth >= stats.max_ply:
+            stats.max_ply = depth + 1
+        
+        # Check for terminal states; only lines through the last move can have changed
+        winner = rules.check_winner(board, board.last_move)
         if winner == player:
-            return 10 - depth  # Win (prefer quicker wins)
+            return self.WIN_SCORE - depth  # Win (prefer quicker wins)
         elif winner == opponent:
-            return depth - 10  # Loss (prefer longer losses)
+            return depth - self.WIN_SCORE  # Loss (prefer longer losses)
         elif board.is_full() or depth >= max_depth:
             # Either a draw or we've reached our maximum search depth
             if depth >= max_depth:
                 # Use heuristic evaluation at max depth
+                if stats is not None:
+                    stats.leaf_evaluations += 1
                 return rules.evaluate_board(board, player)
             return 0  # Draw
             
         current_player = player if is_maximizing else opponent
         
-        # Get valid moves for the current player
-        valid_moves = self._get_valid_moves(board, current_player, rules)
+        # Probe the transposition table with the canonical form of the position
+        table = self.transposition_table
+        position_hash, symmetry = board.canonical_hash()
+        key = position_hash << 2 | is_maximizing << 1 | (player is Player.X)
+        draft = max_depth - depth
+        if not rules.allows_overwrite:
+            # Without overwrites the game ends within the remaining empty cells,
+            # so a search that deep is exact for any later, deeper request
+            draft = min(draft, board.lines.num_cells - popcount(board.x_bits | board.o_bits))
+        alpha_orig = alpha
+        beta_orig = beta
+        hash_move = None
+        entry = table.lookup(key)
+        if entry is not None:
+            entry_draft, flag, value, move_index = entry
+            if entry_draft >= draft:
+                value = self._score_from_table(value, depth)
+                if flag == TranspositionTable.EXACT:
+                    if stats is not None:
+                        stats.tt_hits += 1
+                    return value
+                elif flag == TranspositionTable.LOWER_BOUND:
+                    alpha = max(alpha, value)
+                else:
+                    beta = min(beta, value)
+                if beta <= alpha:
+                    if stats is not None:
+                        stats.tt_hits += 1
+                    return value
+            if move_index is not None:
+                number, cell = divmod(move_index, board.lines.num_cells)
+                hash_move = board.lines.coords[board.lines.inverse_symmetries[symmetry][cell]]
+                if number:
+                    hash_move += (number,)
+        
+        # Get valid moves for the current player, most promising first
+        ordering = self.move_ordering
+        valid_moves = ordering.order(board, self._get_valid_moves(board, current_player, rules),
+                                     current_player, rules, depth + 1, hash_move)
+        best_move = None
+        if stats is not None:
+            stats.interior_nodes += 1
         
         if is_maximizing:
             # AI's turn (maximizing)
             best_score = -math.inf
             
-            for row, col in valid_moves:
-                # Create a new board with this move
-                new_board = self._create_new_board_with_move(board, row, col, current_player, rules)
-                
-                # Recursive call
-                score = self._minimax(new_board, depth + 1, max_depth, False, player, opponent, rules, alpha, beta)
-                best_score = max(best_score, score)
+            for move in valid_moves:
+                # Apply the move in place, search, then take it back
+                board.play(move, current_player)
+                score = self._minimax(board, depth + 1, max_depth, False, player, opponent, rules, alpha, beta)
+                board.undo_move()
+                if score > best_score:
+                    best_score = score
+                    best_move = move
                 
                 # Alpha-beta pruning
                 alpha = max(alpha, best_score)
                 if beta <= alpha:
+                    ordering.record_cutoff(board, move, current_player, depth + 1, draft)
+                    if stats is not None:
+                        stats.record_cutoff(depth + 1)
                     break  # Beta cutoff
         else:
             # Opponent's turn (minimizing)
             best_score = math.inf
             
-            for row, col in valid_moves:
-                # Create a new board with this move
-                new_board = self._create_new_board_with_move(board, row, col, current_player, rules)
-                
-                # Recursive call
-                score = self._minimax(new_board, depth + 1, max_depth, True, player, opponent, rules, alpha, beta)
-                best_score = min(best_score, score)
+            for move in valid_moves:
+                # Apply the move in place, search, then take it back
+                board.play(move, current_player)
+                score = self._minimax(board, depth + 1, max_depth, True, player, opponent, rules, alpha, beta)
+                board.undo_move()
+                if score < best_score:
+                    best_score = score
+                    best_move = move
                 
                 # Alpha-beta pruning
                 beta = min(beta, best_score)
                 if beta <= alpha:
+                    ordering.record_cutoff(board, move, current_player, depth + 1, draft)
+                    if stats is not None:
+                        stats.record_cutoff(depth + 1)
                     break  # Alpha cutoff
+        
+        # Record whether the result is exact or only a bound from a cutoff
+        if best_score <= alpha_orig:
+            flag = TranspositionTable.UPPER_BOUND
+        elif best_score >= beta_orig:
+            flag = TranspositionTable.LOWER_BOUND
+        else:
+            flag = TranspositionTable.EXACT
+        move_index = None
+        if best_move is not None:
+            move_index = board.lines.symmetries[symmetry][best_move[0] * board.size + best_move[1]]
+            if len(best_move) > 2:
+                # Numerical moves keep their number, which no symmetry changes
+                move_index += best_move[2] * board.lines.num_cells
+        table.store(key, draft, flag, self._score_to_table(best_score, depth), move_index)
                 
         return best_score
 
+    def _score_to_table(self, score: float, depth: int) -> float:
+        """Make win/loss scores relative to the node so they can be reused at any depth."""
+        if score >= self.WIN_SCORE // 2:
+            return score + depth
+        if score <= -(self.WIN_SCORE // 2):
+            return score - depth
+        return score
+
+    def _score_from_table(self, score: float, depth: int) -> float:
+        """Inverse of _score_to_table for a node at the given depth."""
+        if score >= self.WIN_SCORE // 2:
+            return score - depth
+        if score <= -(self.WIN_SCORE // 2):
+            return score + depth
+        return score
+
+# Monte Carlo Tree Search
+class _MCTSNode:
+    """A node of MonteCarloAI's search tree: the position after `player` played `move`."""
+    __slots__ = ("move", "parent", "player", "children", "untried", "visits", "score",
+                 "x_bits", "o_bits", "zobrist", "terminal", "winner")
+
+    def __init__(self, move: Optional[Tuple[int, int]], parent: Optional["_MCTSNode"], player: Player, board: Board):
+        self.move = move
+        self.parent = parent
+        self.player = player
+        self.children: List["_MCTSNode"] = []
+        self.untried: List[Tuple[int, int]] = []
+        self.visits = 0
+        self.score = 0.0  # Sum of results from `player`'s point of view
+        self.x_bits = board.x_bits
+        self.o_bits = board.o_bits
+        self.zobrist = board.zobrist  # Also tells Numerical positions with the same owners apart
+        self.terminal = False
+        self.winner: Optional[Player] = None
+
+class MonteCarloAI(AIStrategy):
+    """
+    UCT Monte Carlo Tree Search.
+
+    Each iteration walks down the tree by the UCB1 rule, expands one new
+    move, finishes the game with random moves and backs the result up the
+    path. The cost per move is bounded by a playout count and/or a time
+    limit rather than by the size of the game tree, so it suits large
+    boards and Feral mode, where overwrites make games unbounded.
+
+    The subtree under the chosen move is kept, and reused on the next call
+    when the opponent's reply is found in it.
+    """
+    def __init__(self, playouts: int = 2000, time_limit: Optional[float] = None,
+                 exploration: float = math.sqrt(2), max_playout_moves: Optional[int] = None,
+                 seed: Optional[int] = None):
+        """
+        Args:
+            playouts: Maximum number of playouts per move
+            time_limit: Wall-clock budget per move in seconds (optional)
+            exploration: UCB1 exploration constant
+            max_playout_moves: Random moves after which a playout counts as a
+                draw; defaults to 4 x the number of cells in Feral mode
+            seed: Seed for the playout random number generator
+        """
+        self.playouts = playouts
+        self.time_limit = time_limit
+        self.exploration = exploration
+        self.max_playout_moves = max_playout_moves
+        self.random = random.Random(seed)
+        self._root: Optional[_MCTSNode] = None
+        self._context = None
+
+    def get_move(self, board: Board, player: Player, rules: GameRules) -> Tuple[int, int]:
+        """Run playouts until the budget is spent and return the most visited move."""
+        opponent = Player.O if player == Player.X else Player.X
+        valid_moves = rules.get_valid_moves(board, player)
+        if not valid_moves:
+            return None
+        
+        # Take an immediate win without searching
+        for move in valid_moves:
+            if self._wins(board, move, player, rules):
+                self._root = None
+                return move
+        
+        root = self._reuse_tree(board, player, rules)
+        if root is None:
+            root = _MCTSNode(None, None, opponent, board)
+            root.untried = list(valid_moves)
+            self.random.shuffle(root.untried)
+        
+        max_moves = self.max_playout_moves
+        if max_moves is None:
+            max_moves = 4 * board.lines.num_cells if rules.allows_overwrite else board.lines.num_cells
+        deadline = None if self.time_limit is None else time.monotonic() + self.time_limit
+        
+        search_board = board.copy()
+        for _ in range(self.playouts):
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            self._iterate(root, search_board, rules, max_moves)
+        
+        best = max(root.children, key=lambda child: child.visits, default=None)
+        if best is None:
+            return valid_moves[0]
+        
+        # Keep the chosen subtree for the next move
+        best.parent = None
+        self._root = best
+        return best.move
+
+    def _iterate(self, root: _MCTSNode, board: Board, rules: GameRules, max_moves: int):
+        """Run one selection, expansion, playout and backpropagation pass."""
+        node = root
+        applied = 0
+        
+        # Selection
+        while not node.untried and node.children and not node.terminal:
+            node = self._select_child(node)
+            board.play(node.move, node.player)
+            applied += 1
+        
+        # Expansion
+        if node.untried and not node.terminal:
+            move = node.untried.pop()
+            mover = Player.O if node.player == Player.X else Player.X
+            board.play(move, mover)
+            applied += 1
+            child = _MCTSNode(move, node, mover, board)
+            winner = rules.check_winner(board, board.last_move)
+            if winner is not None or board.is_full():
+                child.terminal = True
+                child.winner = winner
+            else:
+                next_player = Player.O if mover == Player.X else Player.X
+                child.untried = rules.get_valid_moves(board, next_player)
+                self.random.shuffle(child.untried)
+            node.children.append(child)
+            node = child
+        
+        # Simulation
+        if node.terminal:
+            winner = node.winner
+        else:
+            winner = self._playout(board, node.player, rules, max_moves)
+        
+        # Backpropagation
+        while node is not None:
+            node.visits += 1
+            if winner is None:
+                node.score += 0.5
+            elif winner == node.player:
+                node.score += 1.0
+            node = node.parent
+        
+        for _ in range(applied):
+            board.undo_move()
+
+    def _select_child(self, node: _MCTSNode) -> _MCTSNode:
+        """Pick the child with the highest UCB1 value."""
+        log_visits = math.log(node.visits)
+        exploration = self.exploration
+        return max(
+            node.children,
+            key=lambda child: child.score / child.visits + exploration * math.sqrt(log_visits / child.visits),
+        )
+
+    def _playout(self, board: Board, last_player: Player, rules: GameRules, max_moves: int) -> Optional[Player]:
+        """Play random moves to the end of the game and return the winner (None for a draw)."""
+        mover = last_player
+        winner = None
+        played = 0
+        feral = rules.allows_overwrite
+        numerical = isinstance(rules, NumericalRules)
+        full_mask = board.lines.full_mask
+        choice = self.random.choice
+        while played < max_moves:
+            mover = Player.O if mover == Player.X else Player.X
+            if numerical:
+                moves = rules.get_valid_moves(board, mover)
+            elif feral:
+                moves = board.cells_in(full_mask & ~board.bits(mover))
+            else:
+                moves = board.cells_in(full_mask & ~(board.x_bits | board.o_bits))
+            if not moves:
+                break
+            move = choice(moves)
+            board.play(move, mover)
+            played += 1
+            winner = rules.check_winner(board, board.last_move)
+            if winner is not None or board.is_full():
+                break
+        for _ in range(played):
+            board.undo_move()
+        return winner
+
+    def _wins(self, board: Board, move: Tuple[int, ...], player: Player, rules: GameRules) -> bool:
+        """Whether player wins immediately by playing move."""
+        board.play(move, player)
+        winner = rules.check_winner(board, board.last_move)
+        board.undo_move()
+        return winner == player
+
+    def _reuse_tree(self, board: Board, player: Player, rules: GameRules) -> Optional[_MCTSNode]:
+        """Return the kept subtree node matching the current position, if the opponent's reply was explored."""
+        context = (type(rules), getattr(rules, "spec", None), board.size)
+        previous = self._root
+        self._root = None
+        if previous is None or context != self._context:
+            self._context = context
+            return None
+        for child in previous.children:
+            if (child.x_bits == board.x_bits and child.o_bits == board.o_bits
+                    and child.zobrist == board.zobrist and child.player != player):
+                if child.terminal:
+                    return None
+                child.parent = None
+                return child
+        return None
+
+# Process pools for HardAI's parallel root search, one per worker count.
+# Each pool has a shared alpha value and a lock that serializes searches on it.
+_PARALLEL_POOLS: Dict[int, Tuple[ProcessPoolExecutor, Any, threading.Lock]] = {}
+_PARALLEL_POOLS_LOCK = threading.Lock()
+
+def _get_parallel_pool(workers: int) -> Tuple[ProcessPoolExecutor, Any, threading.Lock]:
+    """Return the shared (pool, shared alpha, lock) for a worker count, starting it on first use."""
+    with _PARALLEL_POOLS_LOCK:
+        if workers not in _PARALLEL_POOLS:
+            shared_alpha = multiprocessing.Value("d", -math.inf)
+            pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_parallel_worker,
+                                       initargs=(shared_alpha,))
+            _PARALLEL_POOLS[workers] = (pool, shared_alpha, threading.Lock())
+        return _PARALLEL_POOLS[workers]
+
+# State of a parallel search worker process
+_worker_shared_alpha = None
+_worker_ai: Optional[HardAI] = None
+
+def _init_parallel_worker(shared_alpha):
+    global _worker_shared_alpha
+    _worker_shared_alpha = shared_alpha
+
+def _parallel_root_task(size: int, win_length: int, x_bits: int, o_bits: int, move: Tuple[int, int], player: Player,
+                        rules: GameRules, max_depth: int, deadline: Optional[float],
+                        tt_size: int) -> Tuple[Tuple[int, int], float, Optional[float]]:
+    """
+    Search a single root move in a worker process.
+
+    Returns (move, alpha the search started from, score); score is None if
+    the deadline passed. The worker keeps one HardAI, so its transposition
+    table carries over between tasks.
+    """
+    global _worker_ai
+    if _worker_ai is None or _worker_ai.transposition_table.max_entries != tt_size:
+        _worker_ai = HardAI(tt_size=tt_size, use_tablebase=False)
+    ai = _worker_ai
+    context = (type(rules), getattr(rules, "spec", None), size)
+    if context != ai._tt_context:
+        ai.transposition_table.clear()
+        ai._tt_context = context
+    
+    opponent = Player.O if player == Player.X else Player.X
+    board = Board.from_bits(size, x_bits, o_bits, win_length)
+    board.apply_move(move[0], move[1], player)
+    alpha = _worker_shared_alpha.value
+    ai._start_budget(deadline=deadline)
+    try:
+        score = ai._minimax(board, 0, max_depth, False, player, opponent, rules, alpha, math.inf)
+    except _SearchBudgetExceeded:
+        return move, alpha, None
+    
+    if score > alpha:
+        with _worker_shared_alpha.get_lock():
+            if score > _worker_shared_alpha.value:
+                _worker_shared_alpha.value = score
+    return move, alpha, score
+
+# Background search on the human's time
+class Ponderer:
+    """
+    Searches the AI's answers to the human's likely replies while the human thinks.
+
+    ``start`` takes a copy of the position and, on a daemon thread, plays
+    each reply the human has (most promising first by the AI's move
+    ordering, at most max_replies) and runs the AI's search on the result.
+    Answers are stored by the position they answer. ``take`` stops the
+    thread and returns the answer for the position actually reached, or
+    None.
+
+    Pondering runs the game's own HardAI, so its transposition table keeps
+    everything searched. A reply that was only partly searched when the
+    human moved is then finished from the table instead of from scratch.
+    """
+    def __init__(self, ai: HardAI, max_replies: Optional[int] = None):
+        self.ai = ai
+        self.max_replies = max_replies
+        self._thread: Optional[threading.Thread] = None
+        self._cancelled = threading.Event()
+        self._answers: Dict[int, Optional[Tuple[int, ...]]] = {}
+
+    def start(self, board: Board, human: Player, ai_player: Player, rules: GameRules):
+        """Start pondering the position on board, with human to move."""
+        self.stop()
+        self._answers = {}
+        self._cancelled.clear()
+        self._thread = threading.Thread(target=self._run, args=(board.copy(), human, ai_player, rules),
+                                        name="gameai-ponder", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Cancel pondering and wait for the thread to finish."""
+        if self._thread is None:
+            return
+        # The searches share the cancel event, so one stop reaches the next search too
+        self._cancelled.set()
+        self.ai.stop()
+        self._thread.join()
+        self._thread = None
+
+    def take(self, board: Board) -> Optional[Tuple[int, ...]]:
+        """Stop pondering and return the pondered answer for board, or None if it was not reached."""
+        self.stop()
+        return self._answers.get(board.zobrist)
+
+    def _run(self, board: Board, human: Player, ai_player: Player, rules: GameRules):
+        ai = self.ai
+        replies = ai.move_ordering.order(board, rules.get_valid_moves(board, human), human, rules, 0, None)
+        for reply in replies[:self.max_replies]:
+            if self._cancelled.is_set():
+                return
+            board.play(reply, human)
+            try:
+                if rules.check_winner(board, reply[:2]) is None and not board.is_full():
+                    move = ai._choose_move(board, ai_player, rules, self._cancelled)
+                    if self._cancelled.is_set():
+                        return
+                    self._answers[board.zobrist] = move
+            finally:
+                board.undo_move()
+
 # AI Factory to create the appropriate AI based on difficulty
 class AIFactory:
     @staticmethod
-    def create_ai(difficulty: Difficulty) -> AIStrategy:
-        """Create and return an AI with the specified difficulty."""
+    def create_ai(difficulty: Difficulty, algorithm: SearchAlgorithm = SearchAlgorithm.MINIMAX, **options: Any) -> AIStrategy:
+        """
+        Create and return an AI with the specified difficulty.
+
+        For Difficulty.HARD, algorithm selects minimax (HardAI, the default)
+        or Monte Carlo Tree Search (MonteCarloAI). Keyword options are passed
+        to the AI's constructor, e.g. ``create_ai(Difficulty.HARD, time_limit=0.5)``.
+        """
         if difficulty == Difficulty.EASY:
-            return EasyAI()
+            return EasyAI(**options)
         elif difficulty == Difficulty.MEDIUM:
-            return MediumAI()
+            return MediumAI(**options)
         elif difficulty == Difficulty.HARD:
-            return HardAI()
+            if algorithm == SearchAlgorithm.MCTS:
+                return MonteCarloAI(**options)
+            return HardAI(**options)
         else:
             raise ValueError(f"Unknown difficulty: {difficulty}")
 
 # Rules Factory to create the appropriate rules based on game mode
 class RulesFactory:
     @staticmethod
-    def create_rules(mode: GameMode) -> GameRules:
-        """Create and return the rules for the specified game mode."""
+    def create_rules(mode: GameMode, win_length: Optional[int] = None) -> GameRules:
+        """
+        Create and return the rules for the specified game mode.
+
+        win_length turns the line modes into k-in-a-row variants, e.g.
+        4-in-a-row on a 5x5 board; Numerical mode always uses whole lines.
+        """
         if mode == GameMode.TRADITIONAL:
-            return TraditionalRules()
+            return TraditionalRules(win_length)
         elif mode == GameMode.MISERE:
-            return MisereRules()
+            return MisereRules(win_length)
         elif mode == GameMode.NUMERICAL:
+            if win_length is not None:
+                raise ValueError("Numerical mode does not support a win length")
             return NumericalRules()
         elif mode == GameMode.FERAL:
-            return FeralRules()
+            return FeralRules(win_length)
         else:
             raise ValueError(f"Unknown game mode: {mode}")
 
@@ -565,28 +2910,125 @@ class TicTacToeGame:
     def __init__(self, mode: GameMode = GameMode.TRADITIONAL, 
                  difficulty: Difficulty = Difficulty.MEDIUM,
                  board_size: int = 3,
-                 human_player: Player = Player.X):
-        self.board = Board(board_size)
-        self.rules = RulesFactory.create_rules(mode)
-        self.ai = AIFactory.create_ai(difficulty)
+                 human_player: Player = Player.X,
+                 ai_options: Optional[Dict[str, Any]] = None,
+                 win_length: Optional[int] = None,
+                 ponder: bool = False):
+        """
+        With ponder, a Hard minimax AI searches its answers to the human's
+        likely replies during the human's turn (see Ponderer).
+        """
+        self.rules = RulesFactory.create_rules(mode, win_length)
+        self.board = self.rules.create_board(board_size)
+        self.ai = AIFactory.create_ai(difficulty, **(ai_options or {}))
+        self.ponderer = Ponderer(self.ai) if ponder and isinstance(self.ai, HardAI) else None
         self.mode = mode
         self.difficulty = difficulty
         self.human_player = human_player
         self.ai_player = Player.O if human_player == Player.X else Player.X
         self.current_player = Player.X  # X always goes first
+
+    # to_bytes layout: flags, board size, win length (0 for the board size), then the cells
+    SNAPSHOT_HEADER = struct.Struct("<BBB")
+    _SNAPSHOT_MODES = tuple(GameMode)
+    _SNAPSHOT_DIFFICULTIES = tuple(Difficulty)
+
+    def to_bytes(self) -> bytes:
+        """
+        Encode the game in a few bytes (6 for a 3x3 board).
+
+        The first byte packs the mode, the difficulty, the side to move and
+        the human side. The board size and win length follow, then 2 bits
+        per cell (0 empty, 1 X, 2 O) in row-major order. Numerical cells hold
+        their number instead, in as many bits as the largest number needs.
+
+        The AI, its options and the move history are not stored.
+        """
+        board = self.board
+        flags = (self._SNAPSHOT_MODES.index(self.mode)
+                 | self._SNAPSHOT_DIFFICULTIES.index(self.difficulty) << 2
+                 | (self.current_player is Player.O) << 4
+                 | (self.human_player is Player.O) << 5)
+        win_length = board.lines.line_length
+        cell_bits = self._snapshot_cell_bits(self.mode, board.size)
+        packed = 0
+        if isinstance(board, NumericalBoard):
+            for index, number in enumerate(board.values):
+                packed |= number << (index * cell_bits)
+        else:
+            for player, code in ((Player.X, 1), (Player.O, 2)):
+                bits = board.bits(player)
+                while bits:
+                    low_bit = bits & -bits
+                    packed |= code << (2 * (low_bit.bit_length() - 1))
+                    bits ^= low_bit
+        header = self.SNAPSHOT_HEADER.pack(flags, board.size, 0 if win_length == board.size else win_length)
+        return header + packed.to_bytes((board.lines.num_cells * cell_bits + 7) // 8, "little")
+
+    @classmethod
+    def from_bytes(cls, data: bytes, ai_options: Optional[Dict[str, Any]] = None) -> "TicTacToeGame":
+        """Rebuild a game written by to_bytes, with a fresh AI made from ai_options."""
+        header = cls.SNAPSHOT_HEADER
+        if len(data) < header.size:
+            raise ValueError("Game snapshot is truncated")
+        flags, size, win_length = header.unpack_from(data)
+        if flags >> 6 or flags >> 2 & 3 >= len(cls._SNAPSHOT_DIFFICULTIES) or size == 0:
+            raise ValueError("Not a game snapshot")
+        mode = cls._SNAPSHOT_MODES[flags & 3]
+        difficulty = cls._SNAPSHOT_DIFFICULTIES[flags >> 2 & 3]
+        human_player = Player.O if flags >> 5 & 1 else Player.X
+        
+        cell_bits = cls._snapshot_cell_bits(mode, size)
+        num_cells = size * size
+        end = header.size + (num_cells * cell_bits + 7) // 8
+        if len(data) < end:
+            raise ValueError("Game snapshot is truncated")
+        game = cls(mode, difficulty, size, human_player, ai_options, win_length or None)
+        board = game.board
+        packed = int.from_bytes(data[header.size:end], "little")
+        cell_mask = (1 << cell_bits) - 1
+        for index in range(num_cells):
+            value = packed >> (index * cell_bits) & cell_mask
+            if not value:
+                continue
+            row, col = divmod(index, size)
+            if isinstance(board, NumericalBoard):
+                # Every number is played once, and only numbers up to max_number exist
+                if value > board.max_number or board.used_numbers >> value & 1:
+                    raise ValueError("Invalid cell in game snapshot")
+                board.set_number(row, col, value)
+            elif value <= 2:
+                board.set_cell(row, col, Player.X if value == 1 else Player.O)
+            else:
+                raise ValueError("Invalid cell in game snapshot")
+        game.current_player = Player.O if flags >> 4 & 1 else Player.X
+        if isinstance(board, NumericalBoard):
+            # X plays the odd numbers and moves first, so the counts fix the side to move
+            if board.count(Player.X) - board.count(Player.O) != (game.current_player is Player.O):
+                raise ValueError("Numbers in game snapshot do not match the side to move")
+        return game
+
+    @staticmethod
+    def _snapshot_cell_bits(mode: GameMode, size: int) -> int:
+        """Bits per cell in to_bytes: 2, or enough for size*size in Numerical mode."""
+        if mode == GameMode.NUMERICAL:
+            return (size * size).bit_length()
+        return 2
         
     def reset_game(self):
         """Reset the game to its initial state."""
+        self.stop_pondering()
         self.board.reset()
         self.current_player = Player.X
     
-    def make_human_move(self, row: int, col: int) -> bool:
-        """Process a human player's move."""
+    def make_human_move(self, row: int, col: int, number: Optional[int] = None) -> bool:
+        """Process a human player's move. Numerical mode also needs the number to play."""
         if self.current_player != self.human_player:
             return False
             
         # Use appropriate game mode for move validation
-        if not self.board.make_move(row, col, self.human_player, self.mode):
+        move = (row, col) if number is None else (row, col, number)
+        if not self._make_move(move, self.human_player):
             return False
             
         self.current_player = self.ai_player
@@ -596,19 +3038,37 @@ class TicTacToeGame:
         """Let the AI make its move."""
         if self.current_player != self.ai_player:
             return None
-            
-        move = self.ai.get_move(self.board, self.ai_player, self.rules)
-        if move:
-            row, col = move
+        
+        move = self.ponderer.take(self.board) if self.ponderer is not None else None
+        if move is None:
+            move = self.ai.get_move(self.board, self.ai_player, self.rules)
+        return self.apply_ai_move(move)
+
+    def apply_ai_move(self, move: Optional[Tuple[int, ...]]) -> Optional[Tuple[int, ...]]:
+        """Play a move chosen for the AI, e.g. by a worker process. Returns the move or None."""
+        if move and self.current_player == self.ai_player:
             # Use appropriate game mode for move execution
-            self.board.make_move(row, col, self.ai_player, self.mode)
+            self._make_move(move, self.ai_player)
             self.current_player = self.human_player
+            if self.ponderer is not None and not self.check_game_over()[0]:
+                self.ponderer.start(self.board, self.human_player, self.ai_player, self.rules)
             return move
         return None
+
+    def stop_pondering(self):
+        """Cancel any background search; make_ai_move does this itself."""
+        if self.ponderer is not None:
+            self.ponderer.stop()
+
+    def _make_move(self, move: Tuple[int, ...], player: Player) -> bool:
+        """Validate and play a (row, col) or Numerical (row, col, number) move."""
+        if len(move) > 2:
+            return self.board.make_move(move[0], move[1], player, self.mode, number=move[2])
+        return self.board.make_move(move[0], move[1], player, self.mode)
     
     def check_game_over(self) -> Tuple[bool, Optional[Player]]:
         """Check if the game is over, and who the winner is (if any)."""
-        winner = self.rules.check_winner(self.board)
+        winner = self.rules.check_winner(self.board, self.board.last_move)
         
         if winner:
             return True, winner
@@ -658,7 +3118,11 @@ def play_console_game():
                 try:
                     row = int(input(f"Enter row (0-{game.board.size-1}): "))
                     col = int(input(f"Enter column (0-{game.board.size-1}): "))
-                    valid_move = game.make_human_move(row, col)
+                    number = None
+                    if game.mode == GameMode.NUMERICAL:
+                        numbers = game.board.numbers_for(game.human_player)
+                        number = int(input(f"Enter number {numbers}: "))
+                    valid_move = game.make_human_move(row, col, number)
                     if not valid_move:
                         print("Invalid move! Try again.")
                 except ValueError:
@@ -668,8 +3132,11 @@ def play_console_game():
             print("\nAI is thinking...")
             ai_move = game.make_ai_move()
             if ai_move:
-                row, col = ai_move
-                print(f"AI chose: ({row}, {col})")
+                row, col = ai_move[0], ai_move[1]
+                if len(ai_move) > 2:
+                    print(f"AI chose: {ai_move[2]} at ({row}, {col})")
+                else:
+                    print(f"AI chose: ({row}, {col})")
         
         # Check if game is over
         game_over, winner = game.check_game_over()
@@ -0,0 +1,393 @@
+# Compact game records and position statistics
+# Streams record files of any size and tabulates how often each position occurs, how it ends and what is played
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, BinaryIO, Dict, FrozenSet, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from gameai import GameMode, GameRules, Player, RulesFactory
+
+# Result codes, shared with selfplay.BatchResult
+DRAW = 0
+X_WINS = 1
+O_WINS = 2
+UNFINISHED = 3
+
+# Mode codes in the record header; append only, codes are stored in files
+MODES = (GameMode.TRADITIONAL, GameMode.MISERE, GameMode.NUMERICAL, GameMode.FERAL)
+_MODE_CODES = {mode: code for code, mode in enumerate(MODES)}
+
+MAGIC = b"TTGR"
+VERSION = 1
+
+# Largest board and longest game a record can hold
+MAX_SIZE = 15
+MAX_MOVES = 255
+
+class GameRecord(NamedTuple):
+    """
+    One finished (or abandoned) game.
+
+    moves are (row, col) tuples, or (row, col, number) in Numerical mode,
+    alternating from X. win_length is None for whole lines.
+    """
+    mode: GameMode
+    size: int
+    win_length: Optional[int]
+    moves: List[Tuple[int, ...]]
+    result: int
+
+def _packs_nibbles(size: int) -> bool:
+    """Whether cell indexes of a board fit in four bits."""
+    return size * size <= 16
+
+def _payload_size(mode: GameMode, size: int, count: int) -> int:
+    """Bytes of move data of a record."""
+    if mode == GameMode.NUMERICAL:
+        return count if _packs_nibbles(size) else 2 * count
+    return (count + 1) // 2 if _packs_nibbles(size) else count
+
+def encode_record(record: GameRecord) -> bytes:
+    """
+    Pack a record into bytes.
+
+    A record is three header bytes followed by the moves:
+
+        byte 0      mode code (bits 0-2) and result (bits 3-4)
+        byte 1      board size (bits 0-3) and win length, 0 for whole lines (bits 4-7)
+        byte 2      number of moves
+
+    Each move is its cell index, row-major. On boards of up to 16 cells two
+    moves share a byte (low nibble first) and a Numerical move is one byte,
+    cell and number - 1; on larger boards a move is a byte, and a
+    Numerical move a cell byte and a number byte. A full 3x3 game other
+    than Numerical takes eight bytes.
+    """
+    mode, size, win_length, moves, result = record
+    if not 1 <= size <= MAX_SIZE:
+        raise ValueError(f"Board size {size} does not fit in a game record")
+    if win_length is not None and not 1 <= win_length <= MAX_SIZE:
+        raise ValueError(f"Win length {win_length} does not fit in a game record")
+    if len(moves) > MAX_MOVES:
+        raise ValueError(f"Games longer than {MAX_MOVES} moves do not fit in a game record")
+    data = bytearray((_MODE_CODES[mode] | result << 3, size | (win_length or 0) << 4, len(moves)))
+    nibbles = _packs_nibbles(size)
+    if mode == GameMode.NUMERICAL:
+        for row, col, number in moves:
+            cell = row * size + col
+            if nibbles:
+                data.append(cell | (number - 1) << 4)
+            else:
+                data += bytes((cell, number))
+    elif nibbles:
+        cells = [row * size + col for row, col in moves]
+        if len(cells) % 2:
+            cells.append(0)
+        data += bytes(low | high << 4 for low, high in zip(cells[::2], cells[1::2]))
+    else:
+        data += bytes(row * size + col for row, col in moves)
+    return bytes(data)
+
+def _mode(flags: int) -> GameMode:
+    """The mode of a record from its first header byte."""
+    code = flags & 0x7
+    if code >= len(MODES):
+        raise ValueError("Not a game record")
+    return MODES[code]
+
+def record_size(data, offset: int = 0) -> Optional[int]:
+    """Total bytes of the record starting at data[offset], or None if its header is not all there."""
+    if len(data) - offset < 3:
+        return None
+    mode = _mode(data[offset])
+    return 3 + _payload_size(mode, data[offset + 1] & 0xF, data[offset + 2])
+
+# Per board size: (row, col) of every byte value, of both nibbles of every byte value,
+# and the byte values that hold a cell off the board
+_CELL_TABLES: Dict[int, Tuple[List[Tuple[int, int]], List[Tuple[Tuple[int, int], Tuple[int, int]]], FrozenSet[int]]] = {}
+
+def _cell_tables(size: int) -> Tuple[List[Tuple[int, int]], List[Tuple[Tuple[int, int], Tuple[int, int]]], FrozenSet[int]]:
+    tables = _CELL_TABLES.get(size)
+    if tables is None:
+        num_cells = size * size
+        cells = [divmod(value, size) for value in range(256)]
+        if _packs_nibbles(size):
+            # A Numerical move's high nibble, number - 1, is in range just when a cell would be
+            invalid = frozenset(value for value in range(256) if value & 0xF >= num_cells or value >> 4 >= num_cells)
+        else:
+            invalid = frozenset(range(num_cells, 256))
+        tables = _CELL_TABLES[size] = (cells, [(cells[value & 0xF], cells[value >> 4]) for value in range(256)], invalid)
+    return tables
+
+def decode_record(data, offset: int = 0) -> GameRecord:
+    """
+    Unpack the record starting at data[offset].
+
+    Raises ValueError if the record is truncated, has an unknown mode code
+    or a board size of 0, or holds a move off the board.
+    """
+    if len(data) - offset < 3:
+        raise ValueError("Truncated game record")
+    flags, shape, count = data[offset], data[offset + 1], data[offset + 2]
+    mode = _mode(flags)
+    size = shape & 0xF
+    if size == 0:
+        raise ValueError("Not a game record: board size 0")
+    win_length = shape >> 4 or None
+    start = offset + 3
+    end = start + _payload_size(mode, size, count)
+    if end > len(data):
+        raise ValueError("Truncated game record")
+    payload = data[start:end]
+    cells, pairs, invalid = _cell_tables(size)
+    moves: List[Tuple[int, ...]]
+    if mode == GameMode.NUMERICAL and not _packs_nibbles(size):
+        numbers = payload[1::2]
+        if not invalid.isdisjoint(payload[::2]) or (numbers and not 1 <= min(numbers) <= max(numbers) <= size * size):
+            raise ValueError("Game record has a move off the board")
+    elif not invalid.isdisjoint(payload):
+        raise ValueError("Game record has a move off the board")
+    if mode == GameMode.NUMERICAL:
+        if _packs_nibbles(size):
+            moves = [cells[value & 0xF] + ((value >> 4) + 1,) for value in payload]
+        else:
+            moves = [cells[cell] + (number,) for cell, number in zip(payload[::2], payload[1::2])]
+    elif _packs_nibbles(size):
+        moves = []
+        for value in payload:
+            moves += pairs[value]
+        del moves[count:]
+    else:
+        moves = [cells[value] for value in payload]
+    return GameRecord(mode, size, win_length, moves, flags >> 3 & 0x3)
+
+class RecordWriter:
+    """Appends encoded records to a record file; use as a context manager."""
+    def __init__(self, path: str):
+        self._file: BinaryIO = open(path, "wb")
+        self._file.write(MAGIC + bytes((VERSION,)))
+
+    def write(self, record: GameRecord):
+        self._file.write(encode_record(record))
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self) -> "RecordWriter":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def write_records(path: str, records: Iterable[GameRecord]) -> int:
+    """Write records to a new file at path. Returns the number written."""
+    count = 0
+    with RecordWriter(path) as writer:
+        for record in records:
+            writer.write(record)
+            count += 1
+    return count
+
+def iter_record_bytes(path: str, buffer_size: int = 1 << 20) -> Iterator[bytes]:
+    """
+    Yield the encoded bytes of every record in a file, in order.
+
+    The file is read buffer_size bytes at a time, so memory use does not
+    grow with the file. Raises ValueError on a bad header, an unknown mode
+    code or a truncated last record.
+    """
+    with open(path, "rb") as record_file:
+        header = record_file.read(len(MAGIC) + 1)
+        if header[:len(MAGIC)] != MAGIC or header[len(MAGIC):] != bytes((VERSION,)):
+            raise ValueError(f"Not a game record file: {path}")
+        pending = b""
+        while True:
+            chunk = record_file.read(buffer_size)
+            data = pending + chunk if pending else chunk
+            offset = 0
+            while True:
+                size = record_size(data, offset)
+                if size is None or offset + size > len(data):
+                    break
+                yield data[offset:offset + size]
+                offset += size
+            pending = data[offset:]
+            if not chunk:
+                if pending:
+                    raise ValueError(f"Truncated game record at the end of {path}")
+                return
+
+def read_records(path: str, buffer_size: int = 1 << 20) -> Iterator[GameRecord]:
+    """Yield every record in a file, streaming it in constant memory."""
+    for data in iter_record_bytes(path, buffer_size):
+        yield decode_record(data)
+
+# Key of a position in a PositionTable: mode, size, win length, canonical hash, side to move
+PositionKey = Tuple[str, int, Optional[int], int, str]
+
+class PositionTable:
+    """
+    Per-position statistics of a set of games.
+
+    Positions are keyed by variant, canonical hash and side to move, so all
+    rotations and reflections of a position are counted together. Each
+    entry is [occurrences, then game results indexed by result code
+    (DRAW, X_WINS, O_WINS, UNFINISHED), then {move: times played}], where
+    a move is its cell index in the canonical orientation, with the number
+    appended in Numerical mode.
+
+    Tables of disjoint sets of games merge into the table of their union,
+    which is how worker processes' results are combined.
+    """
+    def __init__(self, max_ply: Optional[int] = None):
+        self.max_ply = max_ply
+        self.positions: Dict[PositionKey, List[Any]] = {}
+        self.games = 0
+        self._rules: Dict[Tuple[GameMode, Optional[int]], GameRules] = {}
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def add(self, record: GameRecord):
+        """Replay a game and count every position in it before each move."""
+        mode, size, win_length, moves, result = record
+        rules_key = (mode, win_length)
+        rules = self._rules.get(rules_key)
+        if rules is None:
+            rules = self._rules[rules_key] = RulesFactory.create_rules(mode, win_length)
+        board = rules.create_board(size)
+        symmetries = board.lines.symmetries
+        variant = (mode.name.lower(), size, win_length)
+        positions = self.positions
+        player = Player.X
+        plies = len(moves) if self.max_ply is None else min(len(moves), self.max_ply)
+        for move in moves[:plies]:
+            position_hash, symmetry = board.canonical_hash()
+            key = variant + (position_hash, player.value)
+            entry = positions.get(key)
+            if entry is None:
+                entry = positions[key] = [0, 0, 0, 0, 0, {}]
+            entry[0] += 1
+            entry[1 + result] += 1
+            choice = symmetries[symmetry][move[0] * size + move[1]]
+            if len(move) > 2:
+                choice = (choice, move[2])
+            entry[5][choice] = entry[5].get(choice, 0) + 1
+            board.play(move, player)
+            player = Player.O if player == Player.X else Player.X
+        self.games += 1
+
+    def merge(self, other: "PositionTable"):
+        """Add the counts of another table into this one."""
+        positions = self.positions
+        for key, theirs in other.positions.items():
+            ours = positions.get(key)
+            if ours is None:
+                positions[key] = theirs
+                continue
+            for index in range(5):
+                ours[index] += theirs[index]
+            choices = ours[5]
+            for choice, count in theirs[5].items():
+                choices[choice] = choices.get(choice, 0) + count
+        self.games += other.games
+
+    def most_common(self, count: Optional[int] = None) -> List[Dict[str, Any]]:
+        """The count most frequent positions (all if None) as JSON-serializable rows."""
+        ranked = sorted(self.positions.items(), key=lambda item: -item[1][0])
+        rows = []
+        for (mode, size, win_length, position_hash, side), entry in ranked[:count]:
+            occurrences = entry[0]
+            choices = sorted(entry[5].items(), key=lambda item: -item[1])
+            rows.append({
+                "mode": mode,
+                "size": size,
+                "win_length": win_length,
+                "hash": f"{position_hash:016x}",
+                "to_move": side,
+                "count": occurrences,
+                "x_win_rate": entry[1 + X_WINS] / occurrences,
+                "o_win_rate": entry[1 + O_WINS] / occurrences,
+                "draw_rate": entry[1 + DRAW] / occurrences,
+                "unfinished_rate": entry[1 + UNFINISHED] / occurrences,
+                "moves": [[list(choice) if isinstance(choice, tuple) else choice, times]
+                          for choice, times in choices],
+            })
+        return rows
+
+def _analyze_batch(batch: List[bytes], max_ply: Optional[int]) -> PositionTable:
+    """Worker entry point: tabulate a batch of encoded records."""
+    table = PositionTable(max_ply)
+    for data in batch:
+        table.add(decode_record(data))
+    return table
+
+def _batches(paths: List[str], batch_size: int) -> Iterator[List[bytes]]:
+    batch = []
+    for path in paths:
+        for data in iter_record_bytes(path):
+            batch.append(data)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+def analyze(paths: List[str], max_ply: Optional[int] = None, workers: Optional[int] = None,
+            batch_size: int = 20000) -> PositionTable:
+    """
+    Tabulate every game in the record files at paths.
+
+    The files are streamed in this process and handed out in batches of
+    batch_size encoded records to workers processes (default: one per
+    CPU), whose tables are merged as they finish. At most two batches per
+    worker are in flight, so memory stays bounded by the batches and the
+    table itself. workers=1 tabulates in this process. max_ply limits the
+    positions counted to the first plies of each game.
+    """
+    table = PositionTable(max_ply)
+    if workers == 1:
+        for path in paths:
+            for record in read_records(path):
+                table.add(record)
+        return table
+
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = []
+        limit = 2 * workers
+        for batch in _batches(paths, batch_size):
+            in_flight.append(pool.submit(_analyze_batch, batch, max_ply))
+            if len(in_flight) >= limit:
+                table.merge(in_flight.pop(0).result())
+        for future in in_flight:
+            table.merge(future.result())
+    return table
+
+def main():
+    parser = argparse.ArgumentParser(description="Tabulate position statistics of game record files.")
+    parser.add_argument("paths", nargs="+", help="Game record files")
+    parser.add_argument("--max-ply", type=int, default=None, help="Count only the first plies of each game")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per CPU)")
+    parser.add_argument("--batch-size", type=int, default=20000, help="Records per worker task")
+    parser.add_argument("--top", type=int, default=1000, help="Positions written, most frequent first (0: all)")
+    parser.add_argument("--output", default="positions.jsonl", help="File to write the position table to")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    table = analyze(args.paths, args.max_ply, args.workers, args.batch_size)
+    elapsed = time.perf_counter() - started
+    rows = table.most_common(args.top or None)
+    temp_path = args.output + ".tmp"
+    with open(temp_path, "w") as handle:
+        for row in rows:
+            handle.write(json.dumps(row) + "\n")
+    os.replace(temp_path, args.output)
+    print(f"{table.games:,} games, {len(table):,} distinct positions in {elapsed:.1f}s")
+    print(f"wrote the {len(rows):,} most frequent positions to {args.output}")
+
+if __name__ == "__main__":
+    main()
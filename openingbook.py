@@ -0,0 +1,119 @@
+# Opening book builder for 4x4 and 5x5 boards
+# Deep-searches every symmetry-distinct early position and writes the book read by gameai.OpeningBook
+
+import argparse
+import os
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from gameai import (Board, GameMode, GameRules, HardAI, OpeningBook, Player, RulesFactory, TABLEBASE_DIR,
+                    opening_book_path)
+
+# Modes a book can be built for: the line-based ones
+SUPPORTED_MODES = (GameMode.TRADITIONAL, GameMode.MISERE, GameMode.FERAL)
+
+def opening_positions(rules: GameRules, size: int, plies: int) -> Iterator[Tuple[Board, Player, int]]:
+    """
+    Yield (board, side to move, ply) for every symmetry-distinct, unfinished
+    position reached within plies moves of the empty board, X moving first.
+
+    Positions are visited breadth-first, so all positions of one ply come
+    before the next. Boards are fresh copies the caller may keep.
+    """
+    board = rules.create_board(size)
+    frontier = [board]
+    seen = set()
+    for ply in range(plies + 1):
+        player = Player.X if ply % 2 == 0 else Player.O
+        next_frontier = []
+        for position in frontier:
+            key = (position.canonical_hash()[0], player)
+            if key in seen:
+                continue
+            seen.add(key)
+            moves = rules.get_valid_moves(position, player)
+            if not moves:
+                continue
+            yield position, player, ply
+            if ply == plies:
+                continue
+            for move in moves:
+                child = position.copy()
+                child.play(move, player)
+                if rules.check_winner(child, move[:2]) is None:
+                    next_frontier.append(child)
+        frontier = next_frontier
+
+def build_book(mode: GameMode, size: int, plies: int, win_length: Optional[int] = None,
+               time_limit: float = 2.0, max_depth: Optional[int] = None, log=None) -> bytes:
+    """
+    Search every opening position of mode up to plies moves and return the book file contents.
+
+    Each position gets a HardAI search of time_limit seconds (deepening to
+    max_depth, if given). One AI is kept for the whole book, so its
+    transposition table carries over between related positions.
+    """
+    if mode not in SUPPORTED_MODES:
+        raise ValueError(f"No opening book builder for game mode: {mode}")
+    rules = RulesFactory.create_rules(mode, win_length)
+    ai = HardAI(tt_size=1000000, max_depth=max_depth, time_limit=time_limit, use_tablebase=False, use_book=False,
+                collect_stats=True)
+    entries: Dict[Tuple[int, int], Tuple[int, int]] = {}
+    started = time.perf_counter()
+    for board, player, ply in opening_positions(rules, size, plies):
+        move = ai.get_move(board, player, rules)
+        if move is None:
+            continue
+        position_hash, symmetry = board.canonical_hash()
+        cell = board.lines.symmetries[symmetry][move[0] * size + move[1]]
+        entries[OpeningBook.key(position_hash, player)] = (cell, ai.last_stats.depth)
+        if log and len(entries) % 50 == 0:
+            log(f"{len(entries)} positions, ply {ply}, {time.perf_counter() - started:.0f}s")
+
+    header = OpeningBook.HEADER
+    entry = OpeningBook.ENTRY
+    data = bytearray(header.size + entry.size * len(entries))
+    header.pack_into(data, 0, OpeningBook.MAGIC, OpeningBook.VERSION, size, rules.compile(size).line_length, plies,
+                     mode.value.encode("ascii"), len(entries))
+    for index, key in enumerate(sorted(entries)):
+        cell, depth = entries[key]
+        entry.pack_into(data, header.size + entry.size * index, key[0], key[1], cell, depth)
+    return bytes(data)
+
+def write_book(mode: GameMode, size: int, plies: int, win_length: Optional[int] = None,
+               time_limit: float = 2.0, max_depth: Optional[int] = None,
+               directory: str = TABLEBASE_DIR, log=None) -> str:
+    """Build the opening book for mode and size and write it to directory. Returns the file path."""
+    path = opening_book_path(mode, size, win_length, directory)
+    os.makedirs(directory, exist_ok=True)
+    data = build_book(mode, size, plies, win_length, time_limit, max_depth, log)
+    # Write to a temporary file first so readers never map a partial book
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as book_file:
+        book_file.write(data)
+    os.replace(temp_path, path)
+    return path
+
+def main():
+    parser = argparse.ArgumentParser(description="Build opening books for 4x4 and 5x5 boards.")
+    parser.add_argument("--mode", choices=[mode.name.lower() for mode in SUPPORTED_MODES], action="append",
+                        help="Game mode to build (repeatable, default: all supported modes)")
+    parser.add_argument("--size", type=int, choices=[4, 5], action="append",
+                        help="Board size to build (repeatable, default: 4 and 5)")
+    parser.add_argument("--win-length", type=int, default=None, help="Marks in a row to complete a line (default: the size)")
+    parser.add_argument("--plies", type=int, default=2, help="Moves from the empty board covered by the book")
+    parser.add_argument("--time-limit", type=float, default=2.0, help="Search time per position in seconds")
+    parser.add_argument("--max-depth", type=int, default=None, help="Deepest search per position (default: no cap)")
+    parser.add_argument("--out", default=TABLEBASE_DIR, help="Output directory")
+    args = parser.parse_args()
+
+    modes = [GameMode[name.upper()] for name in args.mode] if args.mode else list(SUPPORTED_MODES)
+    sizes: List[int] = args.size or [4, 5]
+    for mode in modes:
+        for size in sizes:
+            path = write_book(mode, size, args.plies, args.win_length, args.time_limit, args.max_depth,
+                              args.out, log=print)
+            print(f"{mode.value} {size}x{size}: wrote {path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+# Batch self-play engine for the Easy and Medium AI policies
+# Plays many games at once by storing all boards in one NumPy array
+
+import argparse
+import time
+from typing import Dict, Optional
+
+import numpy as np
+
+from gameai import Difficulty, GameMode, get_line_table
+
+# Cell values in the batch board array
+EMPTY = 0
+X = 1
+O = 2
+
+# Outcome codes in BatchResult.outcomes
+DRAW = 0
+X_WINS = 1
+O_WINS = 2
+UNFINISHED = 3
+
+class BatchResult:
+    """Per-game outcomes and move counts of a batch of games."""
+    def __init__(self, outcomes: np.ndarray, move_counts: np.ndarray):
+        self.outcomes = outcomes
+        self.move_counts = move_counts
+
+    def __len__(self) -> int:
+        return len(self.outcomes)
+
+    def summary(self) -> Dict[str, float]:
+        """Return win/draw rates and the average game length."""
+        games = max(len(self.outcomes), 1)
+        counts = np.bincount(self.outcomes, minlength=4)
+        return {
+            "games": len(self.outcomes),
+            "x_win_rate": float(counts[X_WINS] / games),
+            "o_win_rate": float(counts[O_WINS] / games),
+            "draw_rate": float(counts[DRAW] / games),
+            "unfinished_rate": float(counts[UNFINISHED] / games),
+            "average_moves": float(self.move_counts.mean()) if len(self.move_counts) else 0.0,
+        }
+
+class BatchSelfPlay:
+    """
+    Vectorized self-play for EasyAI and MediumAI policies.
+
+    All N games are stored as an (N, cells) int8 array and advance in lock
+    step: at ply p every unfinished game has the same side to move, so a
+    move, a win check and a policy decision are a handful of array
+    operations for the whole batch. Win checks gather every line of every
+    board at once and compare it against the mover's value.
+
+    The policies follow EasyAI and MediumAI: Easy plays a random empty
+    cell, Medium takes the first winning cell, then the first blocking cell,
+    then the center, a random corner and finally a random cell. Lines are
+    those of get_line_table, so win_length gives k-in-a-row variants. In Feral
+    mode Medium also overwrites the opponent's center and corners, as
+    MediumAI._get_feral_move does; blocks are restricted to cells the mover
+    may actually play.
+    """
+    def __init__(self, mode: GameMode = GameMode.TRADITIONAL, board_size: int = 3,
+                 seed: Optional[int] = None, chunk_size: int = 100000, win_length: Optional[int] = None):
+        if mode == GameMode.NUMERICAL:
+            raise ValueError("Batch self-play does not support Numerical mode")
+        self.mode = mode
+        self.size = board_size
+        self.chunk_size = chunk_size
+        self.rng = np.random.default_rng(seed)
+
+        table = get_line_table(board_size, win_length)
+        self.num_cells = table.num_cells
+        self.line_length = table.line_length
+        self.lines = np.array(
+            [[index for index in range(table.num_cells) if mask >> index & 1] for mask in table.line_masks],
+            dtype=np.intp,
+        )
+        # incidence[line, cell] is 1 when the cell lies on the line
+        self.incidence = np.zeros((len(self.lines), self.num_cells), dtype=np.int32)
+        for line, cells in enumerate(self.lines):
+            self.incidence[line, cells] = 1
+
+        last = board_size - 1
+        self.center = (board_size // 2) * board_size + board_size // 2
+        self.corners = np.array([0, last, last * board_size, last * board_size + last], dtype=np.intp)
+
+    def play(self, num_games: int, x_policy: Difficulty = Difficulty.EASY,
+             o_policy: Difficulty = Difficulty.EASY, max_moves: Optional[int] = None) -> BatchResult:
+        """
+        Play num_games games with X moving first and return their results.
+
+        max_moves bounds the game length; it only matters in Feral mode,
+        where overwrites can go on forever. Games cut off are UNFINISHED.
+        """
+        for policy in (x_policy, o_policy):
+            if policy not in (Difficulty.EASY, Difficulty.MEDIUM):
+                raise ValueError(f"Batch self-play supports Easy and Medium policies, not {policy}")
+        if max_moves is None:
+            max_moves = 4 * self.num_cells if self.mode == GameMode.FERAL else self.num_cells
+
+        outcomes = np.empty(num_games, dtype=np.int8)
+        move_counts = np.empty(num_games, dtype=np.int16)
+        for start in range(0, num_games, self.chunk_size):
+            stop = min(start + self.chunk_size, num_games)
+            self._play_chunk(outcomes[start:stop], move_counts[start:stop], x_policy, o_policy, max_moves)
+        return BatchResult(outcomes, move_counts)
+
+    def _play_chunk(self, outcomes: np.ndarray, move_counts: np.ndarray,
+                    x_policy: Difficulty, o_policy: Difficulty, max_moves: int):
+        """Play len(outcomes) games in place."""
+        num_games = len(outcomes)
+        cells = np.zeros((num_games, self.num_cells), dtype=np.int8)
+        outcomes[:] = UNFINISHED
+        move_counts[:] = max_moves
+        active = np.arange(num_games)
+
+        for ply in range(max_moves):
+            if active.size == 0:
+                break
+            player, opponent = (X, O) if ply % 2 == 0 else (O, X)
+            policy = x_policy if player == X else o_policy
+            boards = cells[active]
+
+            if policy == Difficulty.MEDIUM:
+                moves = self._medium_moves(boards, player, opponent)
+            else:
+                moves = self._random_choice(boards == EMPTY)
+            boards[np.arange(active.size), moves] = player
+            cells[active] = boards
+
+            # A completed line ends the game; in Misere the line's owner loses
+            completed = (boards[:, self.lines] == player).all(axis=2).any(axis=1)
+            full = (boards != EMPTY).all(axis=1)
+            finished = completed | full
+            if self.mode == GameMode.MISERE:
+                line_outcome = X_WINS if player == O else O_WINS
+            else:
+                line_outcome = X_WINS if player == X else O_WINS
+            done = active[finished]
+            outcomes[done] = np.where(completed[finished], line_outcome, DRAW)
+            move_counts[done] = ply + 1
+            active = active[~finished]
+
+    def _random_choice(self, candidates: np.ndarray) -> np.ndarray:
+        """Pick a uniformly random True column in each row of a boolean array."""
+        scores = self.rng.random(candidates.shape)
+        scores[~candidates] = -1.0
+        return scores.argmax(axis=1)
+
+    def _completing_cells(self, boards: np.ndarray, owner: int, playable: np.ndarray) -> np.ndarray:
+        """Cells in playable that would complete a line for owner."""
+        owned = (boards[:, self.lines] == owner).sum(axis=2)
+        if self.mode == GameMode.FERAL:
+            # The last cell may be empty or held by the other player
+            open_lines = owned == self.line_length - 1
+        else:
+            empty = (boards[:, self.lines] == EMPTY).sum(axis=2)
+            open_lines = (owned == self.line_length - 1) & (empty == 1)
+        return playable & (boards != owner) & (open_lines.astype(np.int32) @ self.incidence > 0)
+
+    def _medium_moves(self, boards: np.ndarray, player: int, opponent: int) -> np.ndarray:
+        """Vectorized MediumAI.get_move for one side to move."""
+        empty = boards == EMPTY
+        feral = self.mode == GameMode.FERAL
+        playable = boards != player if feral else empty
+        moves = np.full(len(boards), -1, dtype=np.intp)
+        undecided = np.ones(len(boards), dtype=bool)
+
+        def take(candidates: np.ndarray, first: bool = True):
+            has = undecided & candidates.any(axis=1)
+            if has.any():
+                picks = candidates[has].argmax(axis=1) if first else self._random_choice(candidates[has])
+                moves[has] = picks
+                undecided[has] = False
+
+        # In Misere completing a line never wins, so there is nothing to take or block
+        if self.mode != GameMode.MISERE:
+            take(self._completing_cells(boards, player, playable))
+            take(self._completing_cells(boards, opponent, empty))
+
+        if feral:
+            # Overwrite the opponent's center, then their first corner
+            center = np.zeros_like(empty)
+            center[:, self.center] = boards[:, self.center] == opponent
+            take(center)
+            corners = np.zeros_like(empty)
+            corners[:, self.corners] = boards[:, self.corners] == opponent
+            take(corners)
+
+        center = np.zeros_like(empty)
+        center[:, self.center] = empty[:, self.center]
+        take(center)
+        corners = np.zeros_like(empty)
+        corners[:, self.corners] = empty[:, self.corners]
+        take(corners, first=False)
+        take(playable, first=False)
+        return moves
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a batch of self-play games with vectorized AI policies.")
+    parser.add_argument("--games", type=int, default=1000000)
+    parser.add_argument("--mode", choices=[mode.name.lower() for mode in GameMode if mode != GameMode.NUMERICAL],
+                        default="traditional")
+    parser.add_argument("--size", type=int, default=3)
+    parser.add_argument("--win-length", type=int, default=None, help="Marks in a row to complete a line (default: the size)")
+    parser.add_argument("--x", choices=["easy", "medium"], default="easy", help="Policy for X (moves first)")
+    parser.add_argument("--o", choices=["easy", "medium"], default="medium", help="Policy for O")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    engine = BatchSelfPlay(GameMode[args.mode.upper()], args.size, seed=args.seed, win_length=args.win_length)
+    start = time.perf_counter()
+    result = engine.play(args.games, Difficulty[args.x.upper()], Difficulty[args.o.upper()])
+    elapsed = time.perf_counter() - start
+    for key, value in result.summary().items():
+        print(f"{key}: {value}")
+    print(f"elapsed: {elapsed:.2f}s ({args.games / elapsed * 60:,.0f} games/minute)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,812 @@
+# Asyncio HTTP server hosting many concurrent TicTacToeGame sessions
+# Easy and Medium moves run on the event loop; Hard moves run on a worker pool
+
+import argparse
+import asyncio
+import json
+import mmap
+import os
+import secrets
+import struct
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from gameai import (AIFactory, AIStrategy, Board, Difficulty, GameMode, GameRules, NumericalBoard, Player,
+                    RulesFactory, SearchAlgorithm, TicTacToeGame)
+
+# Largest request body accepted, in bytes
+MAX_BODY = 64 * 1024
+
+# ai_options a client may set: the accepted type and, for counts, the largest value kept.
+# time_limit is clamped to the server's hard_time_limit and workers to its worker count.
+AI_OPTION_LIMITS: Dict[str, Tuple[type, Optional[int]]] = {
+    "algorithm": (str, None),
+    "time_limit": (float, None),
+    "node_limit": (int, 10 ** 6),
+    "max_depth": (int, 32),
+    "tt_size": (int, 10 ** 6),
+    "workers": (int, None),
+    "use_tablebase": (bool, None),
+    "use_book": (bool, None),
+    "proof_nodes": (int, 10 ** 5),
+    "playouts": (int, 10 ** 5),
+    "exploration": (float, None),
+    "max_playout_moves": (int, 1000),
+    "seed": (int, None),
+}
+
+HTTP_REASONS = {
+    200: "OK", 201: "Created", 204: "No Content", 400: "Bad Request", 404: "Not Found",
+    405: "Method Not Allowed", 409: "Conflict", 413: "Payload Too Large",
+    500: "Internal Server Error", 503: "Service Unavailable", 504: "Gateway Timeout",
+}
+
+class HTTPError(Exception):
+    """An error answered with the given HTTP status and a JSON {"error": message} body."""
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+class ServerBusy(HTTPError):
+    """The session limit or the worker pool queue is full; the client should retry later."""
+    def __init__(self, message: str):
+        super().__init__(503, message)
+
+# One hosted game
+class Session:
+    """
+    One hosted game.
+
+    An idle session can be paused: its game is packed into a few bytes with
+    TicTacToeGame.to_bytes and rebuilt on the next request. The AI starts
+    afresh on resume, so a Hard AI's transposition table is not kept.
+    """
+    __slots__ = ("id", "game", "packed", "ai_options", "lock", "last_used", "last_ai_move")
+
+    def __init__(self, session_id: str, game: Optional[TicTacToeGame], ai_options: Optional[Dict[str, Any]],
+                 now: float, packed: Optional[bytes] = None):
+        self.id = session_id
+        self.game = game
+        self.packed = packed
+        self.ai_options = ai_options or None
+        self.lock = asyncio.Lock() if game is not None else None
+        self.last_used = now
+        self.last_ai_move: Optional[Tuple[int, ...]] = None
+
+    @property
+    def busy(self) -> bool:
+        """Whether an AI move is in progress."""
+        return self.lock is not None and self.lock.locked()
+
+    @property
+    def paused(self) -> bool:
+        return self.game is None
+
+    @property
+    def win_length(self) -> Optional[int]:
+        """The session's win length, or None for whole lines."""
+        board = self.game.board
+        return None if board.lines.line_length == board.size else board.lines.line_length
+
+    def pause(self) -> bool:
+        """Pack the game into bytes and drop it. Returns False if a move is in progress."""
+        if self.paused:
+            return True
+        if self.busy:
+            return False
+        self.packed = self.game.to_bytes()
+        self.game = None
+        self.lock = None
+        self.last_ai_move = None
+        return True
+
+    def resume(self):
+        """Rebuild a paused game."""
+        if self.paused:
+            self.game = TicTacToeGame.from_bytes(self.packed, self.ai_options)
+            self.packed = None
+            self.lock = asyncio.Lock()
+
+    def state(self) -> Dict[str, Any]:
+        """Return the JSON-serializable state of the game."""
+        self.resume()
+        game = self.game
+        board = game.board
+        if isinstance(board, NumericalBoard):
+            cells = [[board.get_number(row, col) or None for col in range(board.size)] for row in range(board.size)]
+        else:
+            cells = [[cell.value.strip() or None for cell in row] for row in board.cells]
+        over, winner = game.check_game_over()
+        return {
+            "id": self.id,
+            "mode": game.mode.name.lower(),
+            "difficulty": game.difficulty.name.lower(),
+            "board_size": board.size,
+            "win_length": self.win_length,
+            "human_player": game.human_player.value,
+            "ai_options": _options_to_json(self.ai_options),
+            "board": cells,
+            "current_player": game.current_player.value,
+            "game_over": over,
+            "winner": winner.value if winner else None,
+            "last_ai_move": list(self.last_ai_move) if self.last_ai_move else None,
+        }
+
+def _options_to_json(ai_options: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """AI options with enum values replaced by their names."""
+    return {key: getattr(value, "name", value) for key, value in (ai_options or {}).items()}
+
+def _options_from_json(ai_options: Dict[str, Any]) -> Dict[str, Any]:
+    """Inverse of _options_to_json."""
+    if "algorithm" in ai_options:
+        ai_options["algorithm"] = SearchAlgorithm[ai_options["algorithm"]]
+    return ai_options
+
+# Session registry with idle expiry
+class SessionManager:
+    """
+    Creates, looks up, pauses and expires sessions.
+
+    A session expires after ttl seconds without a request. It is paused
+    after pause_after idle seconds, if set. Sessions with a move in progress
+    are never paused or expired. ``clock`` is injectable so both can be
+    driven by hand.
+
+    ``snapshot`` writes every session to one file, and ``restore`` loads
+    them back as paused sessions, so a restart only reads bytes.
+    """
+    # Snapshot file: header, then per session the id, the packed game and the
+    # AI options as JSON, each prefixed with its length
+    SNAPSHOT_MAGIC = b"TTSS"
+    SNAPSHOT_VERSION = 1
+    SNAPSHOT_HEADER = struct.Struct("<4sBI")
+    SNAPSHOT_RECORD = struct.Struct("<BBH")
+
+    def __init__(self, ttl: float = 600.0, max_sessions: int = 10000, clock=time.monotonic,
+                 pause_after: Optional[float] = None):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.clock = clock
+        self.pause_after = pause_after
+        self._sessions: Dict[str, Session] = {}
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def create(self, mode: GameMode = GameMode.TRADITIONAL, difficulty: Difficulty = Difficulty.MEDIUM,
+               board_size: int = 3, human_player: Player = Player.X, win_length: Optional[int] = None,
+               ai_options: Optional[Dict[str, Any]] = None) -> Session:
+        """Start a new game and return its session. Raises ServerBusy at the session limit."""
+        if len(self._sessions) >= self.max_sessions:
+            self.expire()
+            if len(self._sessions) >= self.max_sessions:
+                raise ServerBusy("session limit reached")
+        game = TicTacToeGame(mode, difficulty, board_size, human_player, ai_options, win_length)
+        session_id = secrets.token_urlsafe(12)
+        session = Session(session_id, game, dict(ai_options or {}), self.clock())
+        self._sessions[session_id] = session
+        return session
+
+    def get(self, session_id: str) -> Optional[Session]:
+        """Return the session, resumed and marked as used, or None if it does not exist or expired."""
+        session = self._sessions.get(session_id)
+        if session is None:
+            return None
+        now = self.clock()
+        if now - session.last_used > self.ttl and not session.busy:
+            del self._sessions[session_id]
+            return None
+        session.last_used = now
+        session.resume()
+        return session
+
+    def remove(self, session_id: str) -> bool:
+        """Delete a session. Returns False if it did not exist."""
+        return self._sessions.pop(session_id, None) is not None
+
+    def expire(self) -> int:
+        """Remove every idle session past its ttl and return how many were removed."""
+        cutoff = self.clock() - self.ttl
+        expired = [session_id for session_id, session in self._sessions.items()
+                   if session.last_used < cutoff and not session.busy]
+        for session_id in expired:
+            del self._sessions[session_id]
+        return len(expired)
+
+    def paused_count(self) -> int:
+        return sum(1 for session in self._sessions.values() if session.paused)
+
+    def pause_idle(self) -> int:
+        """Pause every session idle for pause_after seconds and return how many were paused."""
+        if self.pause_after is None:
+            return 0
+        cutoff = self.clock() - self.pause_after
+        paused = 0
+        for session in self._sessions.values():
+            if session.last_used < cutoff and not session.paused and session.pause():
+                paused += 1
+        return paused
+
+    def snapshot(self, path: str) -> int:
+        """
+        Write every session to a memory-mapped file at path and return the count.
+
+        Running sessions are packed without being paused. The file is written
+        next to path and renamed over it, so a crash never leaves half a snapshot.
+        Sessions too large for a snapshot record are skipped and not counted.
+        """
+        records = []
+        for session in self._sessions.values():
+            packed = session.packed if session.paused else session.game.to_bytes()
+            options = json.dumps(_options_to_json(session.ai_options)).encode() if session.ai_options else b""
+            session_id = session.id.encode("ascii")
+            # A session whose fields overflow the record's length fields is left out, not the whole snapshot
+            if len(session_id) > 0xFF or len(packed) > 0xFF or len(options) > 0xFFFF:
+                continue
+            records.append((session_id, packed, options))
+
+        header = self.SNAPSHOT_HEADER
+        record = self.SNAPSHOT_RECORD
+        total = header.size + sum(record.size + len(a) + len(b) + len(c) for a, b, c in records)
+        temp_path = path + ".tmp"
+        with open(temp_path, "w+b") as handle:
+            handle.truncate(total)
+            with mmap.mmap(handle.fileno(), total) as data:
+                header.pack_into(data, 0, self.SNAPSHOT_MAGIC, self.SNAPSHOT_VERSION, len(records))
+                offset = header.size
+                for session_id, packed, options in records:
+                    record.pack_into(data, offset, len(session_id), len(packed), len(options))
+                    offset += record.size
+                    for chunk in (session_id, packed, options):
+                        data[offset:offset + len(chunk)] = chunk
+                        offset += len(chunk)
+                data.flush()
+        os.replace(temp_path, path)
+        return len(records)
+
+    def restore(self, path: str) -> int:
+        """
+        Load the sessions of a snapshot file as paused sessions and return the count.
+
+        Games are only rebuilt when a session is next used. Sessions that
+        already exist are kept as they are.
+        """
+        header = self.SNAPSHOT_HEADER
+        record = self.SNAPSHOT_RECORD
+        now = self.clock()
+        with open(path, "rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            magic, version, count = header.unpack_from(data, 0)
+            if magic != self.SNAPSHOT_MAGIC or version != self.SNAPSHOT_VERSION:
+                raise ValueError(f"{path} is not a version {self.SNAPSHOT_VERSION} session snapshot")
+            offset = header.size
+            for _ in range(count):
+                id_length, packed_length, options_length = record.unpack_from(data, offset)
+                offset += record.size
+                session_id = data[offset:offset + id_length].decode("ascii")
+                offset += id_length
+                packed = data[offset:offset + packed_length]
+                offset += packed_length
+                options = None
+                if options_length:
+                    options = _options_from_json(json.loads(data[offset:offset + options_length]))
+                offset += options_length
+                if session_id not in self._sessions:
+                    self._sessions[session_id] = Session(session_id, None, options, now, packed)
+        return count
+
+# AIs kept by each worker process, keyed by difficulty and options
+_worker_ais: Dict[Tuple[Difficulty, str], AIStrategy] = {}
+
+def _board_state(board: Board) -> Any:
+    """Compact, picklable contents of a board: the numbers, or the two bitmasks."""
+    if isinstance(board, NumericalBoard):
+        return list(board.values)
+    return (board.x_bits, board.o_bits)
+
+def _restore_board(mode: GameMode, win_length: Optional[int], size: int, state: Any) -> Tuple[Board, GameRules]:
+    """Rebuild a board from _board_state, with its rules."""
+    rules = RulesFactory.create_rules(mode, win_length)
+    board = rules.create_board(size)
+    if isinstance(board, NumericalBoard):
+        for index, number in enumerate(state):
+            if number:
+                board.set_number(index // size, index % size, number)
+    else:
+        x_bits, o_bits = state
+        for row, col in board.cells_in(x_bits):
+            board.set_cell(row, col, Player.X)
+        for row, col in board.cells_in(o_bits):
+            board.set_cell(row, col, Player.O)
+    return board, rules
+
+def _process_ai_moves(difficulty: Difficulty, ai_options: Dict[str, Any],
+                      requests: List[Tuple[GameMode, Optional[int], int, Any, Player]]) -> List[Optional[Tuple[int, ...]]]:
+    """Compute a batch of AI moves in a worker process from (mode, win_length, size, state, player) snapshots."""
+    key = (difficulty, json.dumps(ai_options, sort_keys=True, default=str))
+    ai = _worker_ais.get(key)
+    if ai is None:
+        ai = _worker_ais[key] = AIFactory.create_ai(difficulty, **ai_options)
+    batch = []
+    for mode, win_length, size, state, player in requests:
+        board, rules = _restore_board(mode, win_length, size, state)
+        batch.append((board, player, rules))
+    return ai.get_moves(batch)
+
+def _parse_enum(enum_type, value: Any, field: str):
+    """Accept an enum member by name ("traditional") or value ("Traditional")."""
+    if isinstance(value, str):
+        try:
+            return enum_type[value.upper()]
+        except KeyError:
+            for member in enum_type:
+                if member.value == value:
+                    return member
+    raise HTTPError(400, f"invalid {field}: {value!r}")
+
+def _parse_ai_options(ai_options: Any, max_time: float, max_workers: int) -> Dict[str, Any]:
+    """
+    Validate client ai_options against AI_OPTION_LIMITS and return them clamped.
+
+    time_limit is always set, to at most max_time, so no option can keep a
+    worker busy past the move deadline.
+    """
+    if not isinstance(ai_options, dict):
+        raise HTTPError(400, "ai_options must be an object")
+    options: Dict[str, Any] = {}
+    for key, value in ai_options.items():
+        if key not in AI_OPTION_LIMITS:
+            raise HTTPError(400, f"unsupported ai_option: {key}")
+        kind, limit = AI_OPTION_LIMITS[key]
+        if kind is float:
+            valid = isinstance(value, (int, float)) and not isinstance(value, bool) and value > 0
+        elif kind is int:
+            valid = isinstance(value, int) and not isinstance(value, bool) and (value > 0 or key == "seed")
+        else:
+            valid = isinstance(value, kind)
+        if not valid:
+            raise HTTPError(400, f"invalid ai_option {key}: {value!r}")
+        options[key] = min(value, limit) if limit is not None else value
+    if "algorithm" in options:
+        options["algorithm"] = _parse_enum(SearchAlgorithm, options["algorithm"], "algorithm")
+    if "workers" in options:
+        options["workers"] = min(options["workers"], max_workers)
+    options["time_limit"] = min(options.get("time_limit", max_time), max_time)
+    return options
+
+def _parse_int(payload: Dict[str, Any], field: str, default: Optional[int] = None) -> Optional[int]:
+    value = payload.get(field, default)
+    if value is not None and (not isinstance(value, int) or isinstance(value, bool)):
+        raise HTTPError(400, f"{field} must be an integer")
+    return value
+
+class GameServer:
+    """
+    JSON-over-HTTP game server.
+
+    Routes:
+        POST   /sessions               start a game; body: mode, difficulty, board_size,
+                                       win_length, human_player, ai_options (all optional)
+        GET    /sessions/<id>          game state
+        POST   /sessions/<id>/moves    play {"row", "col", "number"?}; the AI replies in the response
+        DELETE /sessions/<id>          end the game
+        GET    /stats                  session and worker pool counters
+
+    Easy and Medium AIs answer in microseconds, so they run on the event
+    loop. Hard AIs run on a thread or process pool. Their searches get at
+    most ``hard_time_limit`` seconds, whatever the session's ai_options ask
+    for; only the options in AI_OPTION_LIMITS are accepted, and counts are
+    capped there.
+    Each move request has a ``move_timeout`` deadline, queue wait included,
+    and is answered with 504 when it passes. The session stays busy (409)
+    until the search finishes and its move is played. When ``max_pending``
+    Hard moves are already queued or running, new ones get 503 at once
+    instead of queueing without bound.
+
+    With ``pause_after`` set, sessions idle that long are packed to a few
+    bytes each. With ``snapshot_path`` set, all sessions are written there on
+    stop and restored from it on start.
+
+    With ``batch_window`` set, Hard moves with the same ai_options that
+    arrive within that many seconds are sent to a worker as one batch,
+    and AIStrategy.get_moves searches each distinct position in it once.
+    This saves the most when many games are in the same opening.
+    """
+    def __init__(self, host: str = "127.0.0.1", port: int = 8080, session_ttl: float = 600.0,
+                 max_sessions: int = 10000, workers: Optional[int] = None, use_processes: bool = False,
+                 max_pending: Optional[int] = None, move_timeout: float = 5.0, hard_time_limit: float = 1.0,
+                 pause_after: Optional[float] = None, snapshot_path: Optional[str] = None,
+                 batch_window: Optional[float] = None):
+        self.host = host
+        self.port = port
+        self.sessions = SessionManager(session_ttl, max_sessions, pause_after=pause_after)
+        self.snapshot_path = snapshot_path
+        self.workers = workers or os.cpu_count() or 1
+        self.use_processes = use_processes
+        self.max_pending = max_pending if max_pending is not None else 4 * self.workers
+        self.move_timeout = move_timeout
+        self.hard_time_limit = hard_time_limit
+        self.batch_window = batch_window
+        # Hard moves waiting for their batch window to close, by difficulty and options
+        self._batches: Dict[str, Tuple[asyncio.TimerHandle, List[Tuple[Session, asyncio.Future]]]] = {}
+        self._executor: Optional[Executor] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._reaper: Optional[asyncio.Task] = None
+        self._connections: Dict[asyncio.StreamWriter, asyncio.Task] = {}
+        self._pending = 0
+        self._stats = {"requests": 0, "ai_moves": 0, "rejected": 0, "timeouts": 0}
+
+    async def start(self):
+        """
+        Start listening; with port 0 the chosen port is stored in self.port.
+
+        Sessions are restored from snapshot_path first, if that file exists.
+        """
+        if self.snapshot_path and os.path.exists(self.snapshot_path):
+            self.sessions.restore(self.snapshot_path)
+        if self.use_processes:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="gameai")
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._reaper = asyncio.create_task(self._expire_sessions())
+
+    async def stop(self):
+        """Stop listening, shut the worker pool down and snapshot the sessions to snapshot_path."""
+        if self._reaper is not None:
+            self._reaper.cancel()
+        for timer, _ in self._batches.values():
+            timer.cancel()
+        self._batches.clear()
+        if self._server is not None:
+            self._server.close()
+            # Close idle keep-alive connections and let their handlers finish
+            connections = list(self._connections.items())
+            for writer, _ in connections:
+                writer.close()
+            await asyncio.gather(*(task for _, task in connections), return_exceptions=True)
+            await self._server.wait_closed()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        if self.snapshot_path:
+            self.sessions.snapshot(self.snapshot_path)
+
+    async def serve_forever(self):
+        await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+    async def _expire_sessions(self):
+        interval = min(self.sessions.ttl / 2, self.sessions.pause_after or 30.0, 30.0)
+        while True:
+            await asyncio.sleep(interval)
+            self.sessions.expire()
+            self.sessions.pause_idle()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve HTTP/1.1 requests on one connection until it closes (keep-alive by default)."""
+        self._connections[writer] = asyncio.current_task()
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                length = int(headers.get("content-length") or 0)
+                if length > MAX_BODY:
+                    status, payload = 413, {"error": "request body too large"}
+                    keep_alive = False
+                else:
+                    body = await reader.readexactly(length) if length else b""
+                    status, payload = await self._dispatch(method, target, body)
+
+                writer.write(self._response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            self._connections.pop(writer, None)
+            writer.close()
+
+    @staticmethod
+    def _response(status: int, payload: Optional[Dict[str, Any]], keep_alive: bool) -> bytes:
+        body = b"" if payload is None else json.dumps(payload).encode()
+        headers = [
+            f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        if status == 503:
+            headers.append("Retry-After: 1")
+        return ("\r\n".join(headers) + "\r\n\r\n").encode("latin-1") + body
+
+    async def _dispatch(self, method: str, target: str, body: bytes) -> Tuple[int, Optional[Dict[str, Any]]]:
+        """Route one request and turn HTTPErrors into error responses."""
+        self._stats["requests"] += 1
+        parts = [part for part in target.split("?", 1)[0].split("/") if part]
+        try:
+            payload = json.loads(body) if body else {}
+            if not isinstance(payload, dict):
+                raise HTTPError(400, "request body must be a JSON object")
+
+            if parts == ["sessions"]:
+                self._require(method, "POST")
+                return 201, await self._create_session(payload)
+            if parts == ["stats"]:
+                self._require(method, "GET")
+                return 200, self.stats()
+            if len(parts) >= 2 and parts[0] == "sessions":
+                session = self.sessions.get(parts[1])
+                if session is None:
+                    raise HTTPError(404, "no such session")
+                if len(parts) == 2:
+                    if method == "DELETE":
+                        self.sessions.remove(session.id)
+                        return 204, None
+                    self._require(method, "GET")
+                    return 200, session.state()
+                if parts[2:] == ["moves"]:
+                    self._require(method, "POST")
+                    return 200, await self._move(session, payload)
+            raise HTTPError(404, "not found")
+        except json.JSONDecodeError:
+            return 400, {"error": "invalid JSON"}
+        except HTTPError as error:
+            if error.status == 503:
+                self._stats["rejected"] += 1
+            return error.status, {"error": error.message}
+        except Exception as error:
+            return 500, {"error": f"{type(error).__name__}: {error}"}
+
+    @staticmethod
+    def _require(method: str, allowed: str):
+        if method != allowed:
+            raise HTTPError(405, f"use {allowed}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for monitoring: sessions, pending worker moves and request totals."""
+        return {"sessions": len(self.sessions), "paused": self.sessions.paused_count(), "pending": self._pending,
+                "max_pending": self.max_pending, "batching": sum(len(batch) for _, batch in self._batches.values()),
+                **self._stats}
+
+    async def _create_session(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        mode = _parse_enum(GameMode, payload.get("mode", "traditional"), "mode")
+        difficulty = _parse_enum(Difficulty, payload.get("difficulty", "medium"), "difficulty")
+        human_player = _parse_enum(Player, payload.get("human_player", "X"), "human_player")
+        if human_player is Player.EMPTY:
+            raise HTTPError(400, "human_player must be X or O")
+        board_size = _parse_int(payload, "board_size", 3)
+        win_length = _parse_int(payload, "win_length")
+        ai_options = payload.get("ai_options") or {}
+        if difficulty == Difficulty.HARD:
+            # Bound every Hard search so a move fits in its deadline
+            ai_options = _parse_ai_options(ai_options, self.hard_time_limit, self.workers)
+        elif ai_options:
+            raise HTTPError(400, "ai_options are only accepted for Hard")
+        if not 2 <= board_size <= 10:
+            raise HTTPError(400, "board_size must be between 2 and 10")
+
+        try:
+            session = self.sessions.create(mode, difficulty, board_size, human_player, win_length, ai_options)
+        except (TypeError, ValueError) as error:
+            raise HTTPError(400, str(error))
+
+        # The AI opens when the human plays O. If that times out the session is
+        # still returned, and its state shows the AI's move once it lands.
+        if session.game.current_player == session.game.ai_player:
+            try:
+                await self._locked_ai_move(session, time.monotonic() + self.move_timeout)
+            except HTTPError as error:
+                if error.status != 504:
+                    self.sessions.remove(session.id)
+                    raise
+        return session.state()
+
+    async def _move(self, session: Session, payload: Dict[str, Any]) -> Dict[str, Any]:
+        row = _parse_int(payload, "row")
+        col = _parse_int(payload, "col")
+        number = _parse_int(payload, "number")
+        if row is None or col is None:
+            raise HTTPError(400, "row and col are required")
+        game = session.game
+        if (number is not None) != (game.mode == GameMode.NUMERICAL):
+            raise HTTPError(400, "number is required in Numerical mode and only there")
+        deadline = time.monotonic() + self.move_timeout
+
+        if session.busy:
+            raise HTTPError(409, "the AI is still moving")
+        if game.check_game_over()[0]:
+            raise HTTPError(409, "the game is over")
+        # Refuse before the human move is played, so the game never waits on a rejected AI move
+        self._check_capacity(game)
+        if not game.make_human_move(row, col, number):
+            raise HTTPError(400, "invalid move")
+        session.last_ai_move = None
+
+        if not game.check_game_over()[0]:
+            await self._locked_ai_move(session, deadline)
+        return session.state()
+
+    async def _locked_ai_move(self, session: Session, deadline: float):
+        """Let the AI reply, holding the session lock until its move is on the board."""
+        await session.lock.acquire()
+        future = None
+        try:
+            future = self._start_ai_move(session)
+            await asyncio.wait_for(asyncio.shield(future), max(deadline - time.monotonic(), 0))
+        except asyncio.TimeoutError:
+            self._stats["timeouts"] += 1
+            raise HTTPError(504, "AI move timed out; the session is busy until it finishes")
+        finally:
+            if future is None or future.done():
+                session.lock.release()
+            else:
+                future.add_done_callback(lambda _: session.lock.release())
+
+    def _check_capacity(self, game: TicTacToeGame):
+        """Raise ServerBusy if game's AI needs a worker and max_pending moves are already queued."""
+        if game.difficulty == Difficulty.HARD and self._pending >= self.max_pending:
+            raise ServerBusy("all AI workers are busy")
+
+    def _start_ai_move(self, session: Session) -> asyncio.Future:
+        """Start the AI's move and return a future that is done once the move is played."""
+        loop = asyncio.get_running_loop()
+        game = session.game
+        self._stats["ai_moves"] += 1
+        if game.difficulty != Difficulty.HARD:
+            future = loop.create_future()
+            session.last_ai_move = game.make_ai_move()
+            future.set_result(session.last_ai_move)
+            return future
+
+        self._check_capacity(game)
+        self._pending += 1
+        future = loop.create_future()
+        if self.batch_window is None:
+            self._run_batch([(session, future)])
+            return future
+
+        key = json.dumps([game.difficulty.name, _options_to_json(session.ai_options)], sort_keys=True)
+        if key in self._batches:
+            self._batches[key][1].append((session, future))
+        else:
+            timer = loop.call_later(self.batch_window, self._flush_batch, key)
+            self._batches[key] = (timer, [(session, future)])
+        return future
+
+    def _flush_batch(self, key: str):
+        _, batch = self._batches.pop(key)
+        self._run_batch(batch)
+
+    def _run_batch(self, batch: List[Tuple[Session, asyncio.Future]]):
+        """
+        Compute the AI moves of a batch of sessions on the worker pool and play them.
+
+        All sessions in a batch share difficulty and ai_options. In thread
+        mode the first session's AI answers for all of them; this is safe
+        because every session in the batch holds its lock until the batch is done.
+        """
+        loop = asyncio.get_running_loop()
+        games = [session.game for session, _ in batch]
+        if self.use_processes:
+            requests = [(game.mode, session.win_length, game.board.size, _board_state(game.board), game.ai_player)
+                        for (session, _), game in zip(batch, games)]
+            work = loop.run_in_executor(self._executor, _process_ai_moves, games[0].difficulty,
+                                        batch[0][0].ai_options or {}, requests)
+        else:
+            requests = [(game.board, game.ai_player, game.rules) for game in games]
+            work = loop.run_in_executor(self._executor, games[0].ai.get_moves, requests)
+
+        def on_done(work_future: asyncio.Future):
+            self._pending -= len(batch)
+            try:
+                moves = work_future.result()
+            except BaseException as error:
+                for _, future in batch:
+                    future.set_exception(error)
+                return
+            for (session, future), move in zip(batch, moves):
+                try:
+                    session.last_ai_move = session.game.apply_ai_move(move)
+                    future.set_result(session.last_ai_move)
+                except Exception as error:
+                    future.set_exception(error)
+        work.add_done_callback(on_done)
+
+# Loopback client, for tests, benchmarks and scripts
+class GameClient:
+    """Minimal keep-alive HTTP client for GameServer."""
+    def __init__(self, host: str = "127.0.0.1", port: int = 8080):
+        self.host = host
+        self.port = port
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    async def request(self, method: str, path: str, payload: Optional[Dict[str, Any]] = None) -> Tuple[int, Any]:
+        """Send one request and return (status, decoded JSON body or None)."""
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        body = b"" if payload is None else json.dumps(payload).encode()
+        head = (f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n")
+        self._writer.write(head.encode("latin-1") + body)
+        await self._writer.drain()
+
+        status_line = await self._reader.readline()
+        if not status_line:
+            raise ConnectionError("server closed the connection")
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await self._reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        length = int(headers.get("content-length") or 0)
+        data = await self._reader.readexactly(length) if length else b""
+        if headers.get("connection", "").lower() == "close":
+            await self.close()
+        return status, json.loads(data) if data else None
+
+    async def create_session(self, **options: Any) -> Tuple[int, Any]:
+        return await self.request("POST", "/sessions", options)
+
+    async def move(self, session_id: str, row: int, col: int, number: Optional[int] = None) -> Tuple[int, Any]:
+        payload = {"row": row, "col": col}
+        if number is not None:
+            payload["number"] = number
+        return await self.request("POST", f"/sessions/{session_id}/moves", payload)
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._reader = self._writer = None
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve Tic-Tac-Toe games over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--ttl", type=float, default=600.0, help="Seconds before an idle session expires")
+    parser.add_argument("--max-sessions", type=int, default=10000)
+    parser.add_argument("--workers", type=int, default=None, help="Hard AI workers (default: CPU count)")
+    parser.add_argument("--processes", action="store_true", help="Run Hard AI moves in processes instead of threads")
+    parser.add_argument("--max-pending", type=int, default=None, help="Hard moves queued before 503s (default: 4 x workers)")
+    parser.add_argument("--move-timeout", type=float, default=5.0, help="Deadline of each move request in seconds")
+    parser.add_argument("--hard-time-limit", type=float, default=1.0, help="Default Hard AI search time in seconds")
+    parser.add_argument("--pause-after", type=float, default=None, help="Seconds before an idle session is packed to bytes")
+    parser.add_argument("--batch-window", type=float, default=None,
+                        help="Seconds to collect Hard moves into one batch (default: no batching)")
+    parser.add_argument("--snapshot", default=None, help="File to restore sessions from on start and save them to on stop")
+    args = parser.parse_args()
+
+    server = GameServer(args.host, args.port, args.ttl, args.max_sessions, args.workers, args.processes,
+                        args.max_pending, args.move_timeout, args.hard_time_limit, args.pause_after, args.snapshot,
+                        args.batch_window)
+    print(f"Serving on http://{args.host}:{args.port}")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
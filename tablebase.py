@@ -0,0 +1,240 @@
+# Tablebase builder for small Tic-Tac-Toe boards
+# Solves every reachable position once and writes the table read by gameai.Tablebase
+
+import argparse
+import os
+from collections import deque
+from typing import Dict, List, Tuple
+
+from gameai import (Board, GameMode, GameRules, Player, RulesFactory, Tablebase,
+                    TABLEBASE_DIR, get_line_table, popcount, tablebase_path)
+
+# Modes solved by forward search from the empty board (one-sided tables)
+FORWARD_MODES = (GameMode.TRADITIONAL, GameMode.MISERE)
+# Modes solved by retrograde analysis over every position (two-sided tables)
+RETROGRADE_MODES = (GameMode.FERAL,)
+SUPPORTED_MODES = FORWARD_MODES + RETROGRADE_MODES
+
+def solve_positions(rules: GameRules, size: int = 3) -> Dict[int, int]:
+    """
+    Solve every reachable, unfinished position with X to move first.
+
+    Returns a mapping from table index to packed entry (see Tablebase).
+    """
+    board = Board(size)
+    x_digits, o_digits = Tablebase.digit_tables(size)
+    solved: Dict[int, Tuple[int, int]] = {}
+    entries: Dict[int, int] = {}
+
+    def solve(to_move: Player) -> Tuple[int, int]:
+        index = x_digits[board.x_bits] + o_digits[board.o_bits]
+        if index in solved:
+            return solved[index]
+        opponent = Player.O if to_move == Player.X else Player.X
+
+        results: List[Tuple[int, int, int]] = []
+        for row, col in board.get_empty_cells():
+            board.apply_move(row, col, to_move)
+            winner = rules.check_winner(board, (row, col))
+            if winner == to_move:
+                value, plies = Tablebase.WIN, 1
+            elif winner is not None:
+                value, plies = Tablebase.LOSS, 1
+            elif board.is_full():
+                value, plies = Tablebase.DRAW, 1
+            else:
+                reply_value, reply_plies = solve(opponent)
+                value = {Tablebase.WIN: Tablebase.LOSS, Tablebase.LOSS: Tablebase.WIN}.get(reply_value, Tablebase.DRAW)
+                plies = reply_plies + 1
+            board.undo_move()
+            results.append((value, plies, row * size + col))
+
+        # Prefer wins (fastest first), then draws, then losses (slowest first)
+        def rank(result: Tuple[int, int, int]) -> Tuple[int, int]:
+            value, plies, _ = result
+            if value == Tablebase.WIN:
+                return (2, -plies)
+            if value == Tablebase.DRAW:
+                return (1, 0)
+            return (0, plies)
+
+        best = max(rank(result) for result in results)
+        best_results = [result for result in results if rank(result) == best]
+        value = best_results[0][0]
+        plies = max(result[1] for result in best_results)
+        move_mask = 0
+        for _, _, cell in best_results:
+            move_mask |= 1 << cell
+
+        solved[index] = (value, plies)
+        entries[index] = Tablebase.encode_entry(value, plies, move_mask)
+        return value, plies
+
+    solve(Player.X)
+    return entries
+
+def solve_feral_retrograde(size: int = 3) -> Dict[int, int]:
+    """
+    Solve Feral mode exactly by retrograde analysis.
+
+    Overwrites make the Feral state graph cyclic, so it cannot be solved by
+    a depth-limited forward search. Instead every state (position plus side
+    to move) is enumerated, finished states are valued, and values are
+    propagated backwards breadth-first: a state with a losing successor is a
+    win, a state whose successors are all wins for the opponent is a loss,
+    and whatever is never resolved is a draw. As in TicTacToeGame, a line
+    wins for its owner and a full board without a line is a draw.
+
+    Returns a mapping from two-sided table index (see Tablebase) to packed entry.
+    """
+    table = get_line_table(size)
+    num_cells = table.num_cells
+    num_positions = 3 ** num_cells
+    powers = [3 ** index for index in range(num_cells)]
+    line_masks = table.line_masks
+
+    # Decode every base-3 position index into its two bitmasks
+    x_bits = [0] * num_positions
+    o_bits = [0] * num_positions
+    for position in range(1, num_positions):
+        previous = position - 1
+        # Incrementing a base-3 number: find the lowest digit that is not 2
+        index = 0
+        while previous // powers[index] % 3 == 2:
+            index += 1
+        carry_mask = (1 << index) - 1
+        x_bits[position] = x_bits[previous] & ~carry_mask
+        o_bits[position] = o_bits[previous] & ~carry_mask
+        if previous // powers[index] % 3 == 0:
+            x_bits[position] |= 1 << index
+        else:
+            x_bits[position] &= ~(1 << index)
+            o_bits[position] |= 1 << index
+
+    def has_line(bits: int) -> bool:
+        return any(bits & mask == mask for mask in line_masks)
+
+    # States are position * 2 + side, where side 0 is X to move and 1 is O to move
+    num_states = 2 * num_positions
+    value = bytearray(num_states)
+    plies = [0] * num_states
+    terminal = bytearray(num_states)
+    unresolved_moves = [0] * num_states
+    queue = deque()
+    for position in range(num_positions):
+        x_line = has_line(x_bits[position])
+        o_line = has_line(o_bits[position])
+        for side in (0, 1):
+            state = position * 2 + side
+            if x_line or o_line:
+                terminal[state] = 1
+                if x_line and o_line:
+                    continue  # Unreachable
+                value[state] = Tablebase.WIN if x_line == (side == 0) else Tablebase.LOSS
+                queue.append(state)
+            elif x_bits[position] | o_bits[position] == table.full_mask:
+                terminal[state] = 1
+                value[state] = Tablebase.DRAW
+            else:
+                own = x_bits[position] if side == 0 else o_bits[position]
+                unresolved_moves[state] = num_cells - popcount(own)
+
+    while queue:
+        state = queue.popleft()
+        position, side = divmod(state, 2)
+        mover = 1 - side  # The player who made the last move
+        moved_bits = x_bits[position] if mover == 0 else o_bits[position]
+        while moved_bits:
+            low_bit = moved_bits & -moved_bits
+            moved_bits ^= low_bit
+            power = powers[low_bit.bit_length() - 1]
+            # Before the move the cell was empty or held by the side now to move
+            for previous_digit in (0, side + 1):
+                previous = (position + (previous_digit - (mover + 1)) * power) * 2 + mover
+                if terminal[previous] or value[previous]:
+                    continue
+                if value[state] == Tablebase.LOSS:
+                    value[previous] = Tablebase.WIN
+                    plies[previous] = plies[state] + 1
+                    queue.append(previous)
+                else:
+                    unresolved_moves[previous] -= 1
+                    if unresolved_moves[previous] == 0:
+                        value[previous] = Tablebase.LOSS
+                        plies[previous] = plies[state] + 1
+                        queue.append(previous)
+
+    # Pick the best moves of every unfinished state from its successors
+    entries: Dict[int, int] = {}
+    for position in range(num_positions):
+        for side in (0, 1):
+            state = position * 2 + side
+            if terminal[state]:
+                continue
+            state_value = value[state] or Tablebase.DRAW
+            own = x_bits[position] if side == 0 else o_bits[position]
+            candidates = []
+            for index in range(num_cells):
+                if own >> index & 1:
+                    continue
+                digit = position // powers[index] % 3
+                successor = (position + (side + 1 - digit) * powers[index]) * 2 + (1 - side)
+                reply = value[successor] or Tablebase.DRAW
+                if state_value == Tablebase.WIN and reply == Tablebase.LOSS:
+                    candidates.append((plies[successor], index))
+                elif state_value == Tablebase.DRAW and reply == Tablebase.DRAW:
+                    candidates.append((0, index))
+                elif state_value == Tablebase.LOSS:
+                    candidates.append((-plies[successor], index))
+            # Fastest wins and slowest losses
+            best = min(rank for rank, _ in candidates)
+            move_mask = 0
+            for rank, index in candidates:
+                if rank == best:
+                    move_mask |= 1 << index
+            entries[position + side * num_positions] = Tablebase.encode_entry(state_value, plies[state], move_mask)
+    return entries
+
+def build_tablebase(mode: GameMode, size: int = 3) -> bytes:
+    """Solve a mode and return the complete tablebase file contents."""
+    if mode in FORWARD_MODES:
+        entries = solve_positions(RulesFactory.create_rules(mode), size)
+        sides = 1
+    elif mode in RETROGRADE_MODES:
+        entries = solve_feral_retrograde(size)
+        sides = 2
+    else:
+        raise ValueError(f"No tablebase builder for game mode: {mode}")
+    data = bytearray(Tablebase.HEADER.size + Tablebase.ENTRY.size * sides * 3 ** (size * size))
+    Tablebase.HEADER.pack_into(data, 0, Tablebase.MAGIC, Tablebase.VERSION, size, sides,
+                               mode.value.encode("ascii"))
+    for index, entry in entries.items():
+        Tablebase.ENTRY.pack_into(data, Tablebase.HEADER.size + Tablebase.ENTRY.size * index, entry)
+    return bytes(data)
+
+def write_tablebase(mode: GameMode, size: int = 3, directory: str = TABLEBASE_DIR) -> str:
+    """Build the tablebase for mode and write it to directory. Returns the file path."""
+    path = tablebase_path(mode, size, directory)
+    os.makedirs(directory, exist_ok=True)
+    data = build_tablebase(mode, size)
+    # Write to a temporary file first so readers never map a partial table
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as table_file:
+        table_file.write(data)
+    os.replace(temp_path, path)
+    return path
+
+def main():
+    parser = argparse.ArgumentParser(description="Build perfect-play tablebases for 3x3 boards.")
+    parser.add_argument("--mode", choices=[mode.name.lower() for mode in SUPPORTED_MODES], action="append",
+                        help="Game mode to build (repeatable, default: all supported modes)")
+    parser.add_argument("--out", default=TABLEBASE_DIR, help="Output directory")
+    args = parser.parse_args()
+
+    modes = [GameMode[name.upper()] for name in args.mode] if args.mode else list(SUPPORTED_MODES)
+    for mode in modes:
+        path = write_tablebase(mode, 3, args.out)
+        print(f"{mode.value}: wrote {path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+from gameai import Board, GameMode, HardAI, Player, RulesFactory
+
+
+class CountingAI(HardAI):
+    """HardAI that records every position it searches."""
+    def __init__(self, **options):
+        super().__init__(use_book=False, use_tablebase=False, **options)
+        self.searched = []
+
+    def get_move(self, board, player, rules):
+        self.searched.append((board.x_bits, board.o_bits))
+        return super().get_move(board, player, rules)
+
+
+def children(board, player, rules):
+    requests = []
+    for move in rules.get_valid_moves(board, player):
+        child = board.copy()
+        child.play(move, player)
+        requests.append((child, Player.O if player == Player.X else Player.X, rules))
+    return requests
+
+
+def test_first_moves_on_the_empty_board_are_three_positions():
+    rules = RulesFactory.create_rules(GameMode.TRADITIONAL)
+    requests = children(rules.create_board(3), Player.X, rules)
+    ai = CountingAI()
+    moves = ai.get_moves(requests)
+    assert len(ai.searched) == 3
+    for (board, player, _), move in zip(requests, moves):
+        assert move in rules.get_valid_moves(board, player)
+
+
+def test_board_without_symmetry_keeps_every_move():
+    rules = RulesFactory.create_rules(GameMode.TRADITIONAL)
+    board = rules.create_board(3)
+    board.play((0, 0), Player.X)
+    board.play((0, 1), Player.O)
+    requests = children(board, Player.X, rules)
+    ai = CountingAI()
+    ai.get_moves(requests)
+    assert len(ai.searched) == len(requests) == 7
+
+
+def test_hash_collision_does_not_merge_positions(monkeypatch):
+    rules = RulesFactory.create_rules(GameMode.TRADITIONAL)
+    requests = children(rules.create_board(3), Player.X, rules)
+    monkeypatch.setattr(Board, "canonical_hash", lambda self: (0, 0))
+    ai = CountingAI()
+    moves = ai.get_moves(requests)
+    assert len(ai.searched) == 9
+    for (board, player, _), move in zip(requests, moves):
+        assert move in rules.get_valid_moves(board, player)
+
+
+def test_numerical_positions_differ_by_their_numbers():
+    rules = RulesFactory.create_rules(GameMode.NUMERICAL)
+    requests = []
+    for number in (1, 3):
+        board = rules.create_board(3)
+        board.play((1, 1, number), Player.X)
+        requests.append((board, Player.O, rules))
+    ai = CountingAI(max_depth=1)
+    ai.get_moves(requests)
+    assert len(ai.searched) == 2
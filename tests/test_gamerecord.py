@@ -0,0 +1,46 @@
+import pytest
+
+from gameai import GameMode
+from gamerecord import DRAW, GameRecord, MAGIC, VERSION, decode_record, encode_record, read_records
+
+
+def test_record_round_trip():
+    record = GameRecord(GameMode.TRADITIONAL, 3, None, [(1, 1), (0, 0), (2, 2)], DRAW)
+    assert decode_record(encode_record(record)) == record
+
+
+def test_unknown_mode_code_is_a_value_error(tmp_path):
+    path = tmp_path / "bad.ttgr"
+    path.write_bytes(MAGIC + bytes((VERSION,)) + bytes((5, 3, 0)))
+    with pytest.raises(ValueError, match="Not a game record"):
+        list(read_records(str(path)))
+    with pytest.raises(ValueError, match="Not a game record"):
+        decode_record(bytes((7, 3, 0)))
+
+
+@pytest.mark.parametrize("data, message", [
+    (bytes((0, 3)), "Truncated"),
+    (bytes((0, 3, 4, 0x10)), "Truncated"),
+    (bytes((2, 4, 3, 0x00, 0x11)), "Truncated"),
+    (bytes((0, 0, 1, 0)), "board size 0"),
+    (bytes((2, 0, 0)), "board size 0"),
+    (bytes((0, 3, 1, 0x09)), "off the board"),
+    (bytes((0, 3, 2, 0x90)), "off the board"),
+    (bytes((2, 3, 1, 0x90)), "off the board"),
+    (bytes((0, 5, 1, 25)), "off the board"),
+    (bytes((2, 5, 1, 24, 0)), "off the board"),
+    (bytes((2, 5, 1, 24, 26)), "off the board"),
+])
+def test_malformed_record_is_a_value_error(data, message):
+    with pytest.raises(ValueError, match=message):
+        decode_record(data)
+
+
+@pytest.mark.parametrize("record", [
+    GameRecord(GameMode.TRADITIONAL, 3, None, [(2, 2), (0, 0), (2, 1)], DRAW),
+    GameRecord(GameMode.NUMERICAL, 3, None, [(2, 2, 9), (0, 0, 8)], DRAW),
+    GameRecord(GameMode.NUMERICAL, 5, 4, [(4, 4, 25), (0, 0, 1)], DRAW),
+    GameRecord(GameMode.FERAL, 5, 4, [(4, 4), (0, 0), (4, 4)], DRAW),
+])
+def test_edge_cells_round_trip(record):
+    assert decode_record(encode_record(record)) == record
@@ -0,0 +1,94 @@
+import threading
+import time
+
+import pytest
+
+from gameai import GameMode, HardAI, Player, Ponderer, RulesFactory
+
+
+def test_proof_search_counts_against_time_limit():
+    rules = RulesFactory.create_rules(GameMode.TRADITIONAL, 4)
+    board = rules.create_board(5)
+    ai = HardAI(time_limit=0.1, proof_nodes=10 ** 7, use_book=False)
+    start = time.perf_counter()
+    move = ai.get_move(board, Player.X, rules)
+    assert move is not None
+    assert time.perf_counter() - start < 1.0
+
+
+def test_proven_win_is_played_from_the_proof():
+    rules = RulesFactory.create_rules(GameMode.TRADITIONAL, 3)
+    ai = HardAI(time_limit=1.0, proof_nodes=20000, use_book=False, collect_stats=True)
+    ai.get_move(rules.create_board(4), Player.X, rules)
+    assert ai.last_stats.source == "proof"
+
+
+def test_stopping_a_pondering_search_returns_promptly():
+    rules = RulesFactory.create_rules(GameMode.TRADITIONAL, 4)
+    ponderer = Ponderer(HardAI(proof_nodes=10 ** 7, use_book=False))
+    for delay in (0.0, 0.0, 0.01, 0.2):
+        ponderer.start(rules.create_board(5), Player.X, Player.O, rules)
+        time.sleep(delay)
+        start = time.perf_counter()
+        ponderer.stop()
+        assert time.perf_counter() - start < 0.5
+
+
+def test_stop_set_before_the_search_starts_is_kept():
+    rules = RulesFactory.create_rules(GameMode.TRADITIONAL, 4)
+    stop_event = threading.Event()
+    stop_event.set()
+    ai = HardAI(proof_nodes=10 ** 7, use_book=False)
+    board = rules.create_board(5)
+    start = time.perf_counter()
+    move = ai._choose_move(board, Player.X, rules, stop_event)
+    assert time.perf_counter() - start < 0.5
+    assert move in rules.get_valid_moves(board, Player.X)
+
+
+def test_time_limit_cuts_off_the_search():
+    rules = RulesFactory.create_rules(GameMode.TRADITIONAL, 4)
+    board = rules.create_board(6)
+    ai = HardAI(time_limit=0.1, use_book=False)
+    start = time.perf_counter()
+    move = ai.get_move(board, Player.X, rules)
+    assert time.perf_counter() - start < 1.0
+    assert move in rules.get_valid_moves(board, Player.X)
+
+
+@pytest.mark.parametrize("node_limit", [1, 50, 2000])
+def test_node_limit_cuts_off_the_search(node_limit):
+    rules = RulesFactory.create_rules(GameMode.TRADITIONAL, 4)
+    board = rules.create_board(6)
+    ai = HardAI(node_limit=node_limit, use_book=False)
+    move = ai.get_move(board, Player.X, rules)
+    assert move in rules.get_valid_moves(board, Player.X)
+    assert ai.nodes_searched <= node_limit + 1
+
+
+def test_stopped_unbudgeted_search_still_returns_a_move():
+    rules = RulesFactory.create_rules(GameMode.TRADITIONAL, 4)
+    board = rules.create_board(6)
+    ai = HardAI(use_book=False)
+    timer = threading.Timer(0.1, ai.stop)
+    timer.start()
+    start = time.perf_counter()
+    move = ai.get_move(board, Player.X, rules)
+    timer.join()
+    assert time.perf_counter() - start < 1.0
+    assert move in rules.get_valid_moves(board, Player.X)
+
+
+def test_proof_nodes_are_counted_when_minimax_takes_over():
+    rules = RulesFactory.create_rules(GameMode.TRADITIONAL)
+    board = rules.create_board(4)
+    plain = HardAI(max_depth=2, use_book=False, collect_stats=True)
+    plain.get_move(board, Player.X, rules)
+    ai = HardAI(max_depth=2, proof_nodes=500, use_book=False, collect_stats=True)
+    ai.get_move(board, Player.X, rules)
+    stats = ai.last_stats
+    assert stats.source == "search"
+    assert stats.proof_nodes > 0
+    assert stats.nodes == stats.proof_nodes + plain.last_stats.nodes
+    assert ai.nodes_searched == stats.nodes
+    assert stats.branching_factor == plain.last_stats.branching_factor
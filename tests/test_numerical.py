@@ -0,0 +1,62 @@
+import random
+
+import pytest
+
+from gameai import GameMode, HardAI, Player, RulesFactory
+
+
+def expected_line_sums(board):
+    """Sum and filled count of every line, recomputed from the cell values."""
+    sums, filled = [], []
+    for mask in board.lines.line_masks:
+        values = [board.values[index] for index in range(board.lines.num_cells) if mask >> index & 1]
+        sums.append(sum(values))
+        filled.append(sum(1 for value in values if value))
+    return sums, filled
+
+
+def position(moves):
+    rules = RulesFactory.create_rules(GameMode.NUMERICAL)
+    board = rules.create_board(3)
+    player = Player.X
+    for move in moves:
+        board.play(move, player)
+        player = Player.O if player == Player.X else Player.X
+    return board, player, rules
+
+
+@pytest.mark.parametrize("size", [3, 4])
+def test_line_sums_follow_every_move_and_undo(size):
+    rules = RulesFactory.create_rules(GameMode.NUMERICAL)
+    board = rules.create_board(size)
+    rng = random.Random(size)
+    player = Player.X
+    history = [expected_line_sums(board)]
+    while not board.is_full():
+        move = rng.choice(rules.get_valid_moves(board, player))
+        board.play(move, player)
+        history.append(expected_line_sums(board))
+        assert (board.line_sums, board.line_filled) == history[-1]
+        player = Player.O if player == Player.X else Player.X
+    while len(history) > 1:
+        board.undo_move()
+        history.pop()
+        assert (board.line_sums, board.line_filled) == history[-1]
+    assert board.used_numbers == 0
+
+
+def test_search_takes_a_win():
+    # Row 0 holds 4 and 6, and X still has the 5
+    board, player, rules = position([(2, 2, 1), (0, 0, 4), (2, 0, 3), (0, 1, 6)])
+    assert HardAI(use_book=False).get_move(board, player, rules) == (0, 2, 5)
+
+
+@pytest.mark.parametrize("moves, threat", [
+    # O completes row 0 with its 6 unless X fills (0, 2)
+    ([(0, 0, 1), (0, 1, 8)], (0, 2)),
+    # X completes row 0 with its 5 unless O fills (0, 0), and O has no win of its own
+    ([(0, 2, 7), (2, 2, 4), (0, 1, 3)], (0, 0)),
+])
+def test_search_blocks_a_threat(moves, threat):
+    board, player, rules = position(moves)
+    assert HardAI(use_book=False).get_move(board, player, rules)[:2] == threat
@@ -0,0 +1,101 @@
+import random
+
+import pytest
+
+from gameai import Board, GameMode, Player, RulesFactory
+
+# (mode, board size, win length): the line modes, whole lines and k-in-a-row
+VARIANTS = [
+    (GameMode.TRADITIONAL, 3, None),
+    (GameMode.TRADITIONAL, 4, None),
+    (GameMode.TRADITIONAL, 5, 4),
+    (GameMode.TRADITIONAL, 6, 3),
+    (GameMode.MISERE, 3, None),
+    (GameMode.MISERE, 5, 4),
+    (GameMode.FERAL, 3, None),
+    (GameMode.FERAL, 4, 3),
+]
+
+
+def other(player):
+    return Player.O if player == Player.X else Player.X
+
+
+def line_owner(grid, win_length):
+    """The player with win_length marks in a row, column or diagonal, by scanning the grid."""
+    size = len(grid)
+    for row in range(size):
+        for col in range(size):
+            player = grid[row][col]
+            if player is Player.EMPTY:
+                continue
+            for d_row, d_col in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                end_row, end_col = row + d_row * (win_length - 1), col + d_col * (win_length - 1)
+                if not (0 <= end_row < size and 0 <= end_col < size):
+                    continue
+                if all(grid[row + d_row * step][col + d_col * step] is player for step in range(win_length)):
+                    return player
+    return None
+
+
+def reference_winner(mode, grid, win_length):
+    owner = line_owner(grid, win_length)
+    if owner is not None and mode == GameMode.MISERE:
+        return other(owner)
+    return owner
+
+
+def reference_moves(mode, grid, player):
+    size = len(grid)
+    return [(row, col) for row in range(size) for col in range(size)
+            if grid[row][col] is Player.EMPTY or (mode == GameMode.FERAL and grid[row][col] is not player)]
+
+
+def grid_of(board):
+    return [[board.get_cell(row, col) for col in range(board.size)] for row in range(board.size)]
+
+
+def check_position(mode, rules, board, player, win_length, last_move):
+    grid = grid_of(board)
+    winner = reference_winner(mode, grid, win_length)
+    assert rules.check_winner(board) == winner
+    if last_move is not None:
+        assert rules.check_winner(board, last_move) == winner
+
+    moves = reference_moves(mode, grid, player)
+    assert sorted(rules.get_valid_moves(board, player)) == moves
+    assert [(row, col) for row in range(board.size) for col in range(board.size)
+            if rules.is_valid_move(board, row, col, player)] == moves
+    # A full board with no winner is a draw in every line mode, Feral included
+    assert board.is_full() == all(cell is not Player.EMPTY for cells in grid for cell in cells)
+    if winner is not None:
+        return
+
+    winning = 0
+    for row, col in moves:
+        after = [list(cells) for cells in grid]
+        after[row][col] = player
+        if reference_winner(mode, after, win_length) == player:
+            winning |= 1 << (row * board.size + col)
+            assert rules.is_winning_move(board, row, col, player)
+    assert rules.winning_cells(board, player) == winning
+
+
+@pytest.mark.parametrize("mode, size, win_length", VARIANTS)
+@pytest.mark.parametrize("tracked", [True, False])
+def test_compiled_rules_match_a_grid_scan(mode, size, win_length, tracked):
+    rules = RulesFactory.create_rules(mode, win_length)
+    rng = random.Random(f"{mode}-{size}-{win_length}")
+    for _ in range(20):
+        # Untracked boards count whole lines, so k-in-a-row goes through the compiled masks
+        board = rules.create_board(size) if tracked else Board(size)
+        player = Player.X
+        last_move = None
+        for _ in range(3 * size * size):
+            check_position(mode, rules, board, player, win_length or size, last_move)
+            moves = rules.get_valid_moves(board, player)
+            if not moves or rules.check_winner(board) is not None:
+                break
+            last_move = rng.choice(moves)
+            board.play(last_move, player)
+            player = other(player)
@@ -0,0 +1,70 @@
+import asyncio
+import time
+
+import pytest
+
+from gameai import Difficulty, GameMode, Player
+from server import GameClient, GameServer, SessionManager
+
+
+async def _hostile_session(ai_options):
+    server = GameServer(port=0, workers=1, move_timeout=5.0, hard_time_limit=0.3)
+    await server.start()
+    client = GameClient(port=server.port)
+    try:
+        start = time.monotonic()
+        status, state = await client.create_session(difficulty="hard", board_size=5, human_player="O",
+                                                    ai_options=ai_options)
+        elapsed = time.monotonic() - start
+        # The worker is free again once the move is played
+        for _ in range(50):
+            if server.stats()["pending"] == 0:
+                break
+            await asyncio.sleep(0.05)
+        return status, state, elapsed, server.stats()["pending"]
+    finally:
+        await client.close()
+        await server.stop()
+
+
+@pytest.mark.parametrize("ai_options", [
+    {"node_limit": 10 ** 9},
+    {"node_limit": 10 ** 9, "time_limit": 10 ** 6, "tt_size": 10 ** 9},
+    {"algorithm": "mcts", "playouts": 10 ** 9},
+])
+def test_hostile_budget_returns_within_move_timeout(ai_options):
+    status, state, elapsed, pending = asyncio.run(_hostile_session(ai_options))
+    assert status == 201
+    assert state["last_ai_move"] is not None
+    assert elapsed < 5.0
+    assert pending == 0
+    assert state["ai_options"]["time_limit"] <= 0.3
+
+
+def test_unknown_ai_option_is_rejected():
+    async def run():
+        server = GameServer(port=0, workers=1)
+        await server.start()
+        client = GameClient(port=server.port)
+        try:
+            return await client.create_session(difficulty="hard", ai_options={"on_move": "print"})
+        finally:
+            await client.close()
+            await server.stop()
+
+    status, _ = asyncio.run(run())
+    assert status == 400
+
+
+def test_snapshot_skips_sessions_too_large_for_a_record(tmp_path):
+    manager = SessionManager()
+    small = manager.create(GameMode.TRADITIONAL, Difficulty.HARD, ai_options={"time_limit": 0.1})
+    large = manager.create(GameMode.TRADITIONAL, Difficulty.HARD, ai_options={"time_limit": 0.1})
+    large.ai_options["padding"] = "x" * 70000
+    path = str(tmp_path / "sessions.snap")
+    assert manager.snapshot(path) == 1
+
+    restored = SessionManager()
+    assert restored.restore(path) == 1
+    assert restored.get(small.id) is not None
+    assert restored.get(large.id) is None
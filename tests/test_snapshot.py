@@ -0,0 +1,57 @@
+import pytest
+
+from gameai import Difficulty, GameMode, Player, TicTacToeGame
+
+
+def numerical_snapshot(numbers, current_player):
+    """Snapshot bytes of a 3x3 Numerical game with numbers on the first cells, unchecked."""
+    flags = (tuple(GameMode).index(GameMode.NUMERICAL)
+             | tuple(Difficulty).index(Difficulty.EASY) << 2
+             | (current_player is Player.O) << 4)
+    packed = sum(number << (4 * index) for index, number in enumerate(numbers))
+    return TicTacToeGame.SNAPSHOT_HEADER.pack(flags, 3, 0) + packed.to_bytes(5, "little")
+
+
+@pytest.mark.parametrize("mode, size, moves", [
+    (GameMode.TRADITIONAL, 3, [(1, 1), (0, 2)]),
+    (GameMode.MISERE, 4, [(0, 0), (3, 3), (1, 2)]),
+    (GameMode.FERAL, 3, [(0, 0), (0, 0)]),
+    (GameMode.NUMERICAL, 3, [(1, 1, 5), (0, 0, 2), (2, 2, 9)]),
+    (GameMode.NUMERICAL, 4, [(0, 3, 15), (3, 0, 16)]),
+])
+def test_snapshot_round_trip(mode, size, moves):
+    game = TicTacToeGame(mode, Difficulty.EASY, size, Player.O)
+    player = Player.X
+    for move in moves:
+        assert game._make_move(move, player)
+        player = Player.O if player == Player.X else Player.X
+    game.current_player = player
+
+    restored = TicTacToeGame.from_bytes(game.to_bytes())
+    assert restored.to_bytes() == game.to_bytes()
+    assert (restored.board.x_bits, restored.board.o_bits) == (game.board.x_bits, game.board.o_bits)
+    assert restored.current_player is player
+    assert restored.human_player is Player.O
+    if mode == GameMode.NUMERICAL:
+        assert restored.board.values == game.board.values
+        assert restored.board.used_numbers == game.board.used_numbers
+
+
+@pytest.mark.parametrize("numbers, current_player", [
+    ([10], Player.O),
+    ([15, 2], Player.X),
+    ([3, 3], Player.X),
+    ([1, 2, 1], Player.O),
+    ([1, 3], Player.X),
+    ([2], Player.O),
+    ([1], Player.X),
+    ([1, 2], Player.O),
+])
+def test_corrupt_numerical_snapshot_is_a_value_error(numbers, current_player):
+    with pytest.raises(ValueError):
+        TicTacToeGame.from_bytes(numerical_snapshot(numbers, current_player))
+
+
+def test_valid_numerical_snapshot_is_accepted():
+    game = TicTacToeGame.from_bytes(numerical_snapshot([1, 2, 9], Player.O))
+    assert game.board.numbers_for(Player.X) == [3, 5, 7]
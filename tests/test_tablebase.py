@@ -0,0 +1,163 @@
+import random
+from functools import lru_cache
+
+import pytest
+
+from gameai import Board, GameMode, HardAI, Player, RulesFactory, Tablebase
+from tablebase import write_tablebase
+
+
+@pytest.fixture(scope="module")
+def tables(tmp_path_factory):
+    """Traditional and Feral 3x3 tablebases built from scratch for this test run."""
+    directory = str(tmp_path_factory.mktemp("tablebases"))
+    return {mode: Tablebase(write_tablebase(mode, 3, directory)) for mode in (GameMode.TRADITIONAL, GameMode.FERAL)}
+
+
+def other(player):
+    return Player.O if player == Player.X else Player.X
+
+
+def board_of(x_bits, o_bits):
+    return Board.from_bits(3, x_bits, o_bits)
+
+
+def solve_traditional(rules):
+    """(value, plies) of every reachable unfinished position by plain negamax, keyed by the two bitmasks."""
+    results = {}
+
+    def solve(board, player):
+        key = (board.x_bits, board.o_bits)
+        if key in results:
+            return results[key]
+        outcomes = []
+        for move in board.get_empty_cells():
+            board.play(move, player)
+            if rules.check_winner(board, move) == player:
+                outcome = (Tablebase.WIN, 1)
+            elif board.is_full():
+                outcome = (Tablebase.DRAW, 1)
+            else:
+                value, plies = solve(board, other(player))
+                outcome = ({Tablebase.WIN: Tablebase.LOSS, Tablebase.LOSS: Tablebase.WIN}.get(value, Tablebase.DRAW),
+                           plies + 1)
+            board.undo_move()
+            outcomes.append(outcome)
+        # Fastest wins, then draws, then slowest losses
+        results[key] = max(outcomes, key=lambda outcome: {Tablebase.WIN: (2, -outcome[1]), Tablebase.DRAW: (1, 0),
+                                                          Tablebase.LOSS: (0, outcome[1])}[outcome[0]])
+        return results[key]
+
+    solve(rules.create_board(3), Player.X)
+    return results
+
+
+def test_traditional_table_matches_negamax(tables):
+    table = tables[GameMode.TRADITIONAL]
+    rules = RulesFactory.create_rules(GameMode.TRADITIONAL)
+    solved = solve_traditional(rules)
+    assert len(solved) > 4000
+    for (x_bits, o_bits), (value, plies) in solved.items():
+        board = board_of(x_bits, o_bits)
+        entry = table.lookup(board)
+        assert entry[:2] == (value, plies)
+        # Every listed best move keeps the value
+        player = Player.X if board.count(Player.X) == board.count(Player.O) else Player.O
+        for row, col in board.cells_in(entry[2]):
+            board.play((row, col), player)
+            reply = solved.get((board.x_bits, board.o_bits))
+            if reply is not None:
+                assert (value, plies) == ({Tablebase.WIN: Tablebase.LOSS, Tablebase.LOSS: Tablebase.WIN}.get(
+                    reply[0], Tablebase.DRAW), reply[1] + 1)
+            board.undo_move()
+
+
+@pytest.mark.parametrize("x_cells, o_cells, expected", [
+    ([], [], (Tablebase.DRAW, 9)),
+    ([(1, 1)], [(0, 1)], (Tablebase.WIN, 5)),
+    ([(0, 0)], [(1, 1)], (Tablebase.DRAW, 7)),
+    ([(1, 1), (0, 0)], [(0, 1)], (Tablebase.LOSS, 4)),
+])
+def test_known_traditional_positions(tables, x_cells, o_cells, expected):
+    board = Board(3)
+    for cell in x_cells:
+        board.set_cell(*cell, Player.X)
+    for cell in o_cells:
+        board.set_cell(*cell, Player.O)
+    assert tables[GameMode.TRADITIONAL].lookup(board)[:2] == expected
+
+
+def feral_horizon_score(rules, horizon):
+    """Negamax to horizon plies: the horizon left when the game is won (negative when lost), 0 otherwise."""
+    @lru_cache(maxsize=None)
+    def score(x_bits, o_bits, player, depth):
+        board = board_of(x_bits, o_bits)
+        best = -horizon - 1
+        for move in rules.get_valid_moves(board, player):
+            board.play(move, player)
+            if rules.check_winner(board, move) == player:
+                value = depth
+            elif board.is_full() or depth == 1:
+                value = 0
+            else:
+                value = -score(board.x_bits, board.o_bits, other(player), depth - 1)
+            board.undo_move()
+            best = max(best, value)
+        return best
+
+    return score
+
+
+def test_feral_table_matches_search(tables):
+    table = tables[GameMode.FERAL]
+    rules = RulesFactory.create_rules(GameMode.FERAL)
+    horizon = 4
+    score = feral_horizon_score(rules, horizon)
+    rng = random.Random(10)
+    checked = 0
+    while checked < 300:
+        x_bits = o_bits = 0
+        for index in range(9):
+            digit = rng.randrange(3)
+            x_bits |= (digit == 1) << index
+            o_bits |= (digit == 2) << index
+        board = board_of(x_bits, o_bits)
+        player = rng.choice((Player.X, Player.O))
+        entry = table.lookup(board, player)
+        if entry is None:
+            assert rules.check_winner(board) is not None or board.is_full()
+            continue
+        value, plies, _ = entry
+        expected = 0
+        if value != Tablebase.DRAW and plies <= horizon:
+            expected = (horizon - plies + 1) * (1 if value == Tablebase.WIN else -1)
+        assert score(x_bits, o_bits, player, horizon) == expected
+        checked += 1
+
+
+@pytest.mark.parametrize("mode", [GameMode.TRADITIONAL, GameMode.FERAL])
+def test_search_keeps_the_tablebase_value(tables, mode):
+    table = tables[mode]
+    rules = RulesFactory.create_rules(mode)
+    ai = HardAI(max_depth=4, use_tablebase=False, use_book=False)
+    rng = random.Random(mode.value)
+    checked = 0
+    while checked < 40:
+        board = rules.create_board(3)
+        player = Player.X
+        for _ in range(rng.randrange(1, 6)):
+            move = rng.choice(rules.get_valid_moves(board, player))
+            board.play(move, player)
+            player = other(player)
+            if rules.check_winner(board, move) is not None:
+                break
+        entry = table.lookup(board, player)
+        # Wins close enough for the search horizon must be kept
+        if entry is None or entry[0] != Tablebase.WIN or entry[1] > 3:
+            continue
+        move = ai.get_move(board, player, rules)
+        board.play(move, player)
+        if rules.check_winner(board, move) != player:
+            reply = table.lookup(board, other(player))
+            assert reply is not None and reply[0] == Tablebase.LOSS and reply[1] < entry[1]
+        checked += 1
@@ -0,0 +1,10 @@
+from gameai import GameMode
+from tournament import DRAW, Entrant, play_game, schedule
+
+
+def test_feral_full_board_is_a_draw_not_a_forfeit():
+    entrants = [Entrant("easy", "easy"), Entrant("easy2", "easy")]
+    tasks = schedule(entrants, [GameMode.FERAL], [3], 200, seed=1)
+    records = [play_game(task) for task in tasks]
+    assert not [record for record in records if record["forfeit"] is not None]
+    assert any(record["result"] == DRAW for record in records)
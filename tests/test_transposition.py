@@ -0,0 +1,140 @@
+import random
+
+import pytest
+
+from gameai import Board, GameMode, HardAI, MoveOrdering, Player, RulesFactory, TranspositionTable
+
+WIN = HardAI.WIN_SCORE
+
+
+def other(player):
+    return Player.O if player == Player.X else Player.X
+
+
+def plain_minimax(board, depth, max_depth, maximizing, player, rules):
+    """HardAI._minimax's scoring without pruning or a table."""
+    winner = rules.check_winner(board, board.last_move)
+    if winner == player:
+        return WIN - depth
+    if winner == other(player):
+        return depth - WIN
+    if depth >= max_depth:
+        return rules.evaluate_board(board, player)
+    if board.is_full():
+        return 0
+    mover = player if maximizing else other(player)
+    scores = []
+    for move in rules.get_valid_moves(board, mover):
+        board.play(move, mover)
+        scores.append(plain_minimax(board, depth + 1, max_depth, not maximizing, player, rules))
+        board.undo_move()
+    return max(scores) if maximizing else min(scores)
+
+
+def plain_root(board, max_depth, player, rules):
+    scores = {}
+    for move in rules.get_valid_moves(board, player):
+        board.play(move, player)
+        scores[move] = plain_minimax(board, 0, max_depth, False, player, rules)
+        board.undo_move()
+    return scores
+
+
+def position(mode, size, moves, win_length=None):
+    rules = RulesFactory.create_rules(mode, win_length)
+    board = rules.create_board(size)
+    player = Player.X
+    for move in moves:
+        board.play(move, player)
+        player = other(player)
+    return board, player, rules
+
+
+def rotate(board, moves, player, rules):
+    """The same game with every move rotated a quarter turn."""
+    size = board.size
+    return position(rules.game_mode, size, [(col, size - 1 - row) for row, col in moves], rules.spec.win_length)
+
+
+POSITIONS = [
+    (GameMode.TRADITIONAL, 3, None, [], 8),
+    (GameMode.TRADITIONAL, 3, None, [(0, 0), (1, 1), (2, 2)], 8),
+    (GameMode.MISERE, 3, None, [(1, 1), (0, 0)], 8),
+    (GameMode.TRADITIONAL, 4, None, [(0, 0), (1, 1), (0, 1), (2, 2), (3, 3), (0, 2), (1, 0), (3, 0)], 8),
+    (GameMode.TRADITIONAL, 4, 3, [(1, 1), (2, 2), (0, 1)], 3),
+    (GameMode.MISERE, 4, None, [(0, 0), (3, 3), (1, 2)], 3),
+]
+
+
+@pytest.mark.parametrize("mode, size, win_length, moves, max_depth", POSITIONS)
+def test_table_search_matches_plain_minimax(mode, size, win_length, moves, max_depth):
+    board, player, rules = position(mode, size, moves, win_length)
+    expected = max(plain_root(board.copy(), max_depth, player, rules).values())
+
+    ai = HardAI(use_tablebase=False, use_book=False)
+    for _ in range(2):
+        # The second search starts from the table the first one filled
+        moves_now = rules.get_valid_moves(board, player)
+        move, score, _ = ai._search_root(board, moves_now, max_depth, player, other(player), rules)
+        assert score == expected
+
+    # A rotated position hits the same entries through the symmetry remapping
+    rotated, rotated_player, _ = rotate(board, moves, player, rules)
+    move, score, _ = ai._search_root(rotated, rules.get_valid_moves(rotated, rotated_player), max_depth,
+                                     rotated_player, other(rotated_player), rules)
+    assert score == expected
+    assert plain_root(rotated.copy(), max_depth, rotated_player, rules)[move] == expected
+
+
+@pytest.mark.parametrize("mode, size, win_length, moves, max_depth", POSITIONS[:4])
+def test_bounds_from_the_table_respect_the_window(mode, size, win_length, moves, max_depth):
+    board, player, rules = position(mode, size, moves, win_length)
+    mover_moves = rules.get_valid_moves(board, player)
+    truth = plain_root(board.copy(), max_depth, player, rules)
+    ai = HardAI(use_tablebase=False, use_book=False, move_ordering=MoveOrdering())
+    rng = random.Random(7)
+    for _ in range(30):
+        move = rng.choice(mover_moves)
+        low = rng.randint(-WIN, WIN)
+        alpha, beta = low, low + rng.randint(1, WIN)
+        board.play(move, player)
+        value = ai._minimax(board, 0, max_depth, False, player, other(player), rules, alpha, beta)
+        board.undo_move()
+        exact = truth[move]
+        if exact <= alpha:
+            assert value <= alpha
+        elif exact >= beta:
+            assert value >= beta
+        else:
+            assert value == exact
+
+
+def test_eviction_holds_the_table_at_max_entries():
+    table = TranspositionTable(max_entries=4)
+    for key in range(10):
+        table.store(key, 1, TranspositionTable.EXACT, float(key), None)
+        assert len(table) <= 4
+    assert len(table) == 4
+    assert table.lookup(0) is None
+    assert table.lookup(9) == (1, TranspositionTable.EXACT, 9.0, None)
+
+
+def test_search_keeps_the_table_at_max_entries():
+    board, player, rules = position(GameMode.TRADITIONAL, 4, [(0, 0), (1, 1)])
+    ai = HardAI(tt_size=50, max_depth=4, use_tablebase=False, use_book=False)
+    ai.get_move(board, player, rules)
+    assert len(ai.transposition_table) == 50
+
+
+def test_deeper_draft_is_kept():
+    table = TranspositionTable()
+    table.store(1, 5, TranspositionTable.EXACT, 1.0, 3)
+    table.store(1, 3, TranspositionTable.LOWER_BOUND, 2.0, 4)
+    assert table.lookup(1) == (5, TranspositionTable.EXACT, 1.0, 3)
+    table.store(1, 6, TranspositionTable.UPPER_BOUND, 3.0, 5)
+    assert table.lookup(1) == (6, TranspositionTable.UPPER_BOUND, 3.0, 5)
+
+
+def test_max_entries_must_be_positive():
+    with pytest.raises(ValueError):
+        TranspositionTable(0)
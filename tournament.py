@@ -0,0 +1,372 @@
+# Round-robin tournaments between AI strategies
+# Shards games across a process pool and streams per-game results to CSV or JSONL
+
+import argparse
+import csv
+import importlib
+import inspect
+import itertools
+import json
+import math
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from gameai import AIStrategy, EasyAI, GameMode, HardAI, MediumAI, MonteCarloAI, Player, RulesFactory
+
+# Strategies available by short name; anything else is given as "module:Class"
+BUILTIN_STRATEGIES: Dict[str, Callable[..., AIStrategy]] = {
+    "easy": EasyAI,
+    "medium": MediumAI,
+    "hard": HardAI,
+    "mcts": MonteCarloAI,
+}
+
+# z value of the confidence intervals in the standings
+CONFIDENCE_Z = 1.96
+
+# Result codes of a game record
+X_WINS = "x"
+O_WINS = "o"
+DRAW = "draw"
+UNFINISHED = "unfinished"
+
+# Fields of a game record, in CSV column order
+RECORD_FIELDS = ("mode", "size", "win_length", "x", "o", "game", "seed", "result", "winner", "forfeit",
+                 "moves", "x_move_ms", "x_max_ms", "o_move_ms", "o_max_ms")
+
+class Entrant(NamedTuple):
+    """A tournament participant: a unique label, the strategy to build and its constructor options."""
+    label: str
+    strategy: str
+    options: Dict[str, Any] = {}
+
+class GameTask(NamedTuple):
+    """One game to play: the variant, who plays X and O, and the game's random seed."""
+    mode: GameMode
+    size: int
+    win_length: Optional[int]
+    x: Entrant
+    o: Entrant
+    game: int
+    seed: int
+
+def load_strategy(strategy: str) -> Callable[..., AIStrategy]:
+    """Return the AIStrategy class for a built-in name or an importable "module:Class"."""
+    if strategy in BUILTIN_STRATEGIES:
+        return BUILTIN_STRATEGIES[strategy]
+    module_name, _, class_name = strategy.partition(":")
+    if not class_name:
+        raise ValueError(f"Unknown strategy {strategy!r}: use one of {', '.join(BUILTIN_STRATEGIES)} or module:Class")
+    factory = getattr(importlib.import_module(module_name), class_name)
+    if not (inspect.isclass(factory) and issubclass(factory, AIStrategy)):
+        raise ValueError(f"{strategy} is not an AIStrategy subclass")
+    return factory
+
+def create_ai(entrant: Entrant, seed: int) -> AIStrategy:
+    """
+    Build a fresh AI for one game.
+
+    Strategies whose constructor takes a seed get one derived from the game
+    seed unless the entrant's options fix it, so seeded games replay exactly.
+    """
+    factory = load_strategy(entrant.strategy)
+    options = dict(entrant.options)
+    if "seed" not in options and "seed" in inspect.signature(factory).parameters:
+        options["seed"] = seed
+    return factory(**options)
+
+def game_seed(seed: int, *parts: Any) -> int:
+    """Deterministic 63-bit seed for a game, the same in every process and Python run."""
+    return random.Random(":".join(str(part) for part in (seed,) + parts)).getrandbits(63)
+
+def schedule(entrants: List[Entrant], modes: List[GameMode], sizes: List[int], games: int,
+             seed: int = 0, win_length: Optional[int] = None) -> List[GameTask]:
+    """
+    Return every game of a round robin: games per pairing, mode and size.
+
+    The two entrants of a pairing alternate as X, the side that moves
+    first, so an even number of games is balanced. Numerical mode has no
+    win length and is scheduled with whole lines.
+    """
+    labels = [entrant.label for entrant in entrants]
+    if len(set(labels)) != len(labels):
+        raise ValueError("Entrant labels must be unique")
+    tasks = []
+    for mode in modes:
+        length = None if mode == GameMode.NUMERICAL else win_length
+        for size in sizes:
+            for first, second in itertools.combinations(entrants, 2):
+                for game in range(games):
+                    x, o = (first, second) if game % 2 == 0 else (second, first)
+                    task_seed = game_seed(seed, mode.name, size, length, first.label, second.label, game)
+                    tasks.append(GameTask(mode, size, length, x, o, game, task_seed))
+    return tasks
+
+def play_game(task: GameTask, max_moves: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Play one game and return its record.
+
+    The global random module is seeded from the task, which makes Easy and
+    Medium games reproducible; time-limited searches are not. A side that
+    returns no move or an illegal one while it has legal moves forfeits.
+    A full board is a draw in every mode, as in TicTacToeGame. Feral games,
+    where overwrites can otherwise go on forever, stop as UNFINISHED after
+    max_moves (default 4 x the number of cells).
+    """
+    random.seed(task.seed)
+    rules = RulesFactory.create_rules(task.mode, task.win_length)
+    board = rules.create_board(task.size)
+    if max_moves is None:
+        max_moves = 4 * task.size * task.size if rules.allows_overwrite else task.size * task.size
+    ais = {
+        Player.X: create_ai(task.x, game_seed(task.seed, "x")),
+        Player.O: create_ai(task.o, game_seed(task.seed, "o")),
+    }
+    move_ms = {Player.X: [], Player.O: []}
+
+    player = Player.X
+    result, winner, forfeit = UNFINISHED, None, None
+    for _ in range(max_moves):
+        opponent = Player.O if player == Player.X else Player.X
+        valid_moves = rules.get_valid_moves(board, player)
+        if not valid_moves:
+            result = DRAW
+            break
+        start = time.perf_counter()
+        move = ais[player].get_move(board, player, rules)
+        move_ms[player].append((time.perf_counter() - start) * 1000.0)
+        if move is None or tuple(move) not in valid_moves:
+            winner, forfeit = opponent, player
+            break
+        move = tuple(move)
+        board.play(move, player)
+        winner = rules.check_winner(board, move[:2])
+        if winner is not None:
+            break
+        if board.is_full():
+            result = DRAW
+            break
+        player = opponent
+    if winner is not None:
+        result = X_WINS if winner == Player.X else O_WINS
+
+    labels = {Player.X: task.x.label, Player.O: task.o.label}
+    return {
+        "mode": task.mode.name.lower(),
+        "size": task.size,
+        "win_length": task.win_length,
+        "x": task.x.label,
+        "o": task.o.label,
+        "game": task.game,
+        "seed": task.seed,
+        "result": result,
+        "winner": labels[winner] if winner is not None else None,
+        "forfeit": labels[forfeit] if forfeit is not None else None,
+        "moves": len(move_ms[Player.X]) + len(move_ms[Player.O]),
+        "x_move_ms": sum(move_ms[Player.X]),
+        "x_max_ms": max(move_ms[Player.X], default=0.0),
+        "o_move_ms": sum(move_ms[Player.O]),
+        "o_max_ms": max(move_ms[Player.O], default=0.0),
+    }
+
+def _play_chunk(tasks: List[GameTask]) -> List[Dict[str, Any]]:
+    """Worker entry point: play a shard of games in order."""
+    return [play_game(task) for task in tasks]
+
+def wilson_interval(successes: int, trials: int, z: float = CONFIDENCE_Z) -> Tuple[float, float]:
+    """Wilson score interval of a binomial proportion; (0, 1) without trials."""
+    if not trials:
+        return 0.0, 1.0
+    rate = successes / trials
+    denominator = 1 + z * z / trials
+    center = (rate + z * z / (2 * trials)) / denominator
+    margin = z * math.sqrt(rate * (1 - rate) / trials + z * z / (4 * trials * trials)) / denominator
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+class Standings:
+    """
+    Running totals of a tournament, fed one game record at a time.
+
+    Pairings are counted per (mode, size, win length) from the point of view
+    of the entrant listed first; unfinished games count as draws. Move
+    timings are kept per entrant over all its games.
+    """
+    def __init__(self, entrants: List[Entrant]):
+        self._order = {entrant.label: index for index, entrant in enumerate(entrants)}
+        self.pairings: Dict[Tuple[str, int, Optional[int], str, str], List[int]] = {}
+        self.timing: Dict[str, List[float]] = {entrant.label: [0.0, 0, 0.0] for entrant in entrants}
+        self.games = 0
+
+    def add(self, record: Dict[str, Any]):
+        first, second = sorted((record["x"], record["o"]), key=self._order.__getitem__)
+        key = (record["mode"], record["size"], record["win_length"], first, second)
+        counts = self.pairings.setdefault(key, [0, 0, 0])
+        if record["winner"] == first:
+            counts[0] += 1
+        elif record["winner"] == second:
+            counts[2] += 1
+        else:
+            counts[1] += 1
+        self.games += 1
+
+        x_moves = (record["moves"] + 1) // 2
+        for side, moves in (("x", x_moves), ("o", record["moves"] - x_moves)):
+            timing = self.timing[record[side]]
+            timing[0] += record[f"{side}_move_ms"]
+            timing[1] += moves
+            timing[2] = max(timing[2], record[f"{side}_max_ms"])
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """One row per pairing with win, draw and loss rates of the first entrant and their intervals."""
+        rows = []
+        for (mode, size, win_length, first, second), counts in sorted(self.pairings.items(), key=str):
+            games = sum(counts)
+            row: Dict[str, Any] = {"mode": mode, "size": size, "win_length": win_length,
+                                   "entrant": first, "opponent": second, "games": games}
+            for name, count in zip(("win", "draw", "loss"), counts):
+                row[name] = count
+                row[f"{name}_rate"] = count / games
+                row[f"{name}_interval"] = wilson_interval(count, games)
+            rows.append(row)
+        return rows
+
+    def timing_summary(self) -> Dict[str, Dict[str, float]]:
+        """Per entrant: moves played, mean and slowest move time in milliseconds."""
+        return {
+            label: {"moves": moves, "mean_ms": total / moves if moves else 0.0, "max_ms": slowest}
+            for label, (total, moves, slowest) in self.timing.items()
+        }
+
+class ResultWriter:
+    """Streams game records to a CSV or JSONL file, flushing after every batch."""
+    def __init__(self, path: str, file_format: Optional[str] = None):
+        if file_format is None:
+            file_format = "csv" if path.endswith(".csv") else "jsonl"
+        if file_format not in ("csv", "jsonl"):
+            raise ValueError(f"Unknown result format: {file_format}")
+        self.format = file_format
+        self._file = open(path, "w", newline="")
+        self._csv = None
+        if file_format == "csv":
+            self._csv = csv.DictWriter(self._file, fieldnames=RECORD_FIELDS)
+            self._csv.writeheader()
+
+    def write(self, records: Iterable[Dict[str, Any]]):
+        for record in records:
+            if self._csv is not None:
+                self._csv.writerow(record)
+            else:
+                self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+def run_tournament(tasks: List[GameTask], standings: Standings, workers: Optional[int] = None,
+                   chunk_size: int = 10, on_records: Optional[Callable[[List[Dict[str, Any]]], None]] = None):
+    """
+    Play every task and feed the records to standings as they finish.
+
+    Tasks are split into shards of chunk_size games, played on a pool of
+    workers processes (default: one per CPU); workers=1 plays them in this
+    process. Shards finish in any order, but each record carries its own
+    seed, so the totals do not depend on scheduling. on_records is called
+    with each finished shard, e.g. to stream it to a file.
+    """
+    chunks = [tasks[start:start + chunk_size] for start in range(0, len(tasks), chunk_size)]
+
+    def finish(records: List[Dict[str, Any]]):
+        for record in records:
+            standings.add(record)
+        if on_records is not None:
+            on_records(records)
+
+    if workers == 1:
+        for chunk in chunks:
+            finish(_play_chunk(chunk))
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for future in as_completed([pool.submit(_play_chunk, chunk) for chunk in chunks]):
+            finish(future.result())
+
+def parse_entrant(spec: str, options: Dict[str, Dict[str, Any]]) -> Entrant:
+    """Parse a LABEL=STRATEGY (or bare STRATEGY) command-line spec."""
+    label, _, strategy = spec.partition("=")
+    if not strategy:
+        label, strategy = spec, spec
+    load_strategy(strategy)
+    return Entrant(label, strategy, options.get(label, {}))
+
+def main():
+    parser = argparse.ArgumentParser(description="Play a round-robin tournament between AI strategies.")
+    parser.add_argument("--ai", action="append",
+                        help="Entrant as LABEL=STRATEGY or STRATEGY, where STRATEGY is easy, medium, hard, mcts "
+                             "or module:Class (repeatable, default: easy, medium and hard)")
+    parser.add_argument("--options", action="append", default=[],
+                        help='Constructor options of an entrant as LABEL=JSON, e.g. hard=\'{"node_limit": 2000}\'')
+    parser.add_argument("--mode", choices=[mode.name.lower() for mode in GameMode], action="append",
+                        help="Game mode to play (repeatable, default: all modes)")
+    parser.add_argument("--size", type=int, action="append", help="Board size to play (repeatable, default: 3)")
+    parser.add_argument("--win-length", type=int, default=None, help="Marks in a row to complete a line (default: the size)")
+    parser.add_argument("--games", type=int, default=100, help="Games per pairing, mode and size")
+    parser.add_argument("--seed", type=int, default=0, help="Tournament seed; per-game seeds derive from it")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per CPU)")
+    parser.add_argument("--chunk-size", type=int, default=10, help="Games per worker task")
+    parser.add_argument("--output", default=None, help="Stream game records to this .csv or .jsonl file")
+    parser.add_argument("--format", choices=["csv", "jsonl"], default=None,
+                        help="Format of --output (default: from the file extension)")
+    args = parser.parse_args()
+
+    options = {}
+    for spec in args.options:
+        label, _, value = spec.partition("=")
+        options[label] = json.loads(value)
+    try:
+        entrants = [parse_entrant(spec, options) for spec in args.ai or ["easy", "medium", "hard"]]
+        modes = [GameMode[name.upper()] for name in args.mode] if args.mode else list(GameMode)
+        tasks = schedule(entrants, modes, args.size or [3], args.games, args.seed, args.win_length)
+    except (ImportError, AttributeError, ValueError) as error:
+        parser.error(str(error))
+    if len(entrants) < 2:
+        parser.error("a tournament needs at least two entrants")
+
+    standings = Standings(entrants)
+    writer = ResultWriter(args.output, args.format) if args.output else None
+    workers = args.workers or os.cpu_count()
+    started = time.perf_counter()
+    last_report = [started]
+
+    def on_records(records: List[Dict[str, Any]]):
+        if writer is not None:
+            writer.write(records)
+        now = time.perf_counter()
+        if now - last_report[0] >= 5.0:
+            print(f"{standings.games}/{len(tasks)} games, {now - started:.0f}s", file=sys.stderr)
+            last_report[0] = now
+
+    try:
+        run_tournament(tasks, standings, workers, args.chunk_size, on_records)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"{standings.games} games in {elapsed:.1f}s on {workers} workers")
+    for row in standings.summary():
+        variant = f"{row['mode']} {row['size']}x{row['size']}"
+        if row["win_length"] is not None:
+            variant += f" k={row['win_length']}"
+        rates = "  ".join(
+            f"{name[0].upper()} {row[f'{name}_rate']:6.1%} [{row[f'{name}_interval'][0]:.1%}, {row[f'{name}_interval'][1]:.1%}]"
+            for name in ("win", "draw", "loss")
+        )
+        print(f"{variant}: {row['entrant']} vs {row['opponent']} ({row['games']} games)  {rates}")
+    for label, timing in standings.timing_summary().items():
+        print(f"{label}: {timing['moves']} moves, mean {timing['mean_ms']:.2f} ms, max {timing['max_ms']:.2f} ms")
+
+if __name__ == "__main__":
+    main()